@@ -0,0 +1,251 @@
+"""
+井名别名解析模块
+把各种写法的井号（简称、旧井号、全角数字、带/不带"井"字等）解析为 oil_wells.well_name 标准井名，
+所有接收井号参数的工具通过 common.utils.normalize_well_id() 共用同一个解析器
+"""
+import os
+import re
+import time
+import logging
+import threading
+import unicodedata
+
+from common.db import fetch_columns
+from common.spelling import SymSpellIndex
+
+logger = logging.getLogger(__name__)
+
+# 别名解析配置 - 从环境变量读取
+ALIAS_CONFIG = {
+    'enabled': os.getenv('WELL_ALIAS_ENABLED', 'true').lower() == 'true',
+    'refresh_interval': float(os.getenv('WELL_ALIAS_REFRESH_INTERVAL', '300')),
+    'retry_interval': float(os.getenv('WELL_ALIAS_RETRY_INTERVAL', '30')),
+    # 井名纠错允许的最大编辑距离（SymSpell 删除字典的内存占用随之增长）
+    'suggest_max_distance': int(os.getenv('WELL_SUGGEST_MAX_DISTANCE', '2')),
+}
+
+# 归一化时去掉的分隔符（NFKC 之后全角符号已转为半角）
+_SEPARATORS = re.compile(r"[\s\-_—·./]+")
+
+# 字典树终止标记（字符节点的键都是单个字符，空串不会冲突）
+_END = ""
+
+# 来源优先级：数值越小越优先；同一优先级下指向不同井名的别名视为有歧义，不参与解析
+PRIORITY_WELL_NAME = 0
+PRIORITY_ALIAS_TABLE = 1
+PRIORITY_JH = 2
+PRIORITY_SUFFIX_VARIANT = 3
+
+
+def fold_alias(text: str) -> str:
+    """别名归一化：NFKC（全角转半角）、转小写、去掉空白和分隔符"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _SEPARATORS.sub("", text)
+
+
+class WellAliasResolver:
+    """
+    别名字典树
+
+    键为 fold_alias() 归一化后的别名，按字符逐层展开；解析时对输入归一化后沿树走一遍即可得到标准井名。
+    同时维护标准井名的 SymSpell 纠错词典，解析不到时给出相近井名。
+    数据来源：oil_wells.well_name（标准井名本身）、well_aliases 别名表、oil_wells.jh 井号，
+    以及标准井名加/去"井"字后缀的变体。
+    """
+
+    def __init__(self, suggest_max_distance: int = 2):
+        self._root: dict = {}
+        self.size = 0
+        self.ambiguous = 0
+        # 井名纠错：归一化后的标准井名 -> 标准井名列表
+        self._spelling = SymSpellIndex(max_distance=suggest_max_distance)
+        self._folded_names: dict[str, list[str]] = {}
+
+    def add_well_name(self, well_name: str):
+        """登记标准井名（同时加入纠错词典）"""
+        self.add(well_name, well_name, PRIORITY_WELL_NAME)
+        key = fold_alias(well_name)
+        if not key:
+            return
+        names = self._folded_names.setdefault(key, [])
+        if not names:
+            self._spelling.add(key)
+        if well_name not in names:
+            names.append(well_name)
+
+    def add(self, alias: str, well_name: str, priority: int):
+        key = fold_alias(alias)
+        if not key or not well_name:
+            return
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+
+        existing = node.get(_END)
+        if existing is None:
+            node[_END] = (priority, well_name)
+            self.size += 1
+        elif priority < existing[0]:
+            node[_END] = (priority, well_name)
+        elif priority == existing[0] and existing[1] is not None and existing[1] != well_name:
+            node[_END] = (priority, None)
+            self.ambiguous += 1
+
+    def resolve(self, text: str) -> str | None:
+        node = self._root
+        for ch in fold_alias(text):
+            node = node.get(ch)
+            if node is None:
+                return None
+        entry = node.get(_END)
+        return entry[1] if entry else None
+
+    def suggest(self, text: str, limit: int = 5) -> list[str]:
+        """与输入编辑距离最近的标准井名"""
+        result = []
+        for key, _ in self._spelling.lookup(fold_alias(text), limit):
+            result.extend(self._folded_names[key])
+        return result[:limit]
+
+
+def build_resolver() -> WellAliasResolver:
+    """从数据库构建别名解析器"""
+    resolver = WellAliasResolver(ALIAS_CONFIG['suggest_max_distance'])
+
+    wells = fetch_columns("SELECT well_name, jh FROM oil_wells WHERE is_deleted = false")
+    for well_name in wells["well_name"]:
+        if well_name:
+            resolver.add_well_name(well_name)
+
+    try:
+        aliases = fetch_columns("SELECT alias, well_name FROM well_aliases WHERE is_deleted = false")
+    except Exception as e:
+        # 别名表未创建（未执行迁移 005）时仅使用 oil_wells 中的数据
+        logger.warning(f"⚠️  读取 well_aliases 失败，仅使用 oil_wells 构建别名: {e}")
+        aliases = {"alias": (), "well_name": ()}
+    for alias, well_name in zip(aliases["alias"], aliases["well_name"]):
+        resolver.add(alias, well_name, PRIORITY_ALIAS_TABLE)
+
+    for well_name, jh in zip(wells["well_name"], wells["jh"]):
+        if jh:
+            resolver.add(jh, well_name, PRIORITY_JH)
+
+    for well_name in wells["well_name"]:
+        if not well_name:
+            continue
+        variant = well_name[:-1] if well_name.endswith("井") else well_name + "井"
+        resolver.add(variant, well_name, PRIORITY_SUFFIX_VARIANT)
+
+    return resolver
+
+
+class _AliasRegistry:
+    """进程内共享的解析器：首次使用时加载，过期后在后台线程重建，加载失败时按 retry_interval 重试"""
+
+    def __init__(self, refresh_interval: float, retry_interval: float):
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._resolver: WellAliasResolver | None = None
+        self._loaded_at: float | None = None
+        self._retry_at = 0.0
+        self._error: str | None = None
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def _load(self):
+        start = time.monotonic()
+        try:
+            resolver = build_resolver()
+        except Exception as e:
+            self._error = str(e)
+            self._retry_at = time.monotonic() + self.retry_interval
+            logger.warning(f"⚠️  井名别名加载失败: {e}")
+            return
+        self._resolver = resolver
+        self._loaded_at = time.monotonic()
+        self._error = None
+        logger.info(f"🏷️  井名别名已加载: {resolver.size} 条（歧义 {resolver.ambiguous} 条），"
+                    f"用时 {(time.monotonic() - start) * 1000:.0f}ms")
+
+    def _reload_in_background(self):
+        try:
+            self._load()
+        finally:
+            self._reloading = False
+
+    def _start_reload(self):
+        with self._lock:
+            if not self._reloading:
+                self._reloading = True
+                threading.Thread(target=self._reload_in_background, name="well-alias-reload", daemon=True).start()
+
+    def get(self, load: bool = True) -> WellAliasResolver | None:
+        """
+        返回当前解析器
+
+        load=False 时不在调用线程中同步加载（调用方可能正持有连接池连接），未加载时改为后台加载并返回 None
+        """
+        now = time.monotonic()
+        if self._resolver is None:
+            if now < self._retry_at:
+                return None
+            if not load:
+                self._start_reload()
+                return None
+            with self._lock:
+                if self._resolver is None and time.monotonic() >= self._retry_at:
+                    self._load()
+        elif now - self._loaded_at >= self.refresh_interval and not self._reloading:
+            self._start_reload()
+        return self._resolver
+
+    def invalidate(self):
+        if self._loaded_at is not None:
+            self._loaded_at = float("-inf")
+
+    def status(self) -> dict:
+        resolver = self._resolver
+        return {
+            "ready": resolver is not None,
+            "aliases": resolver.size if resolver else 0,
+            "ambiguous": resolver.ambiguous if resolver else 0,
+            "error": self._error,
+        }
+
+
+_registry = _AliasRegistry(ALIAS_CONFIG['refresh_interval'], ALIAS_CONFIG['retry_interval'])
+
+
+def resolve_well_alias(text: str) -> str | None:
+    """把井号别名解析为标准井名；未启用、未加载或未命中时返回 None"""
+    if not ALIAS_CONFIG['enabled'] or not text:
+        return None
+    resolver = _registry.get()
+    return resolver.resolve(text) if resolver else None
+
+
+def suggest_well_names(text: str, limit: int = 5) -> list[str]:
+    """
+    井名纠错建议（"您是否要找"）；未启用或未加载时返回空列表
+
+    工具在查询无结果时调用，此时可能仍持有连接池连接，因此从不同步加载解析器（启动时由 load_well_aliases() 预热）
+    """
+    if not ALIAS_CONFIG['enabled'] or not text:
+        return []
+    resolver = _registry.get(load=False)
+    return resolver.suggest(text, limit) if resolver else []
+
+
+def load_well_aliases():
+    """服务启动时预热别名解析器和纠错词典（WELL_ALIAS_ENABLED=false 时不加载）"""
+    if ALIAS_CONFIG['enabled']:
+        _registry.get()
+
+
+def invalidate_well_aliases():
+    """井名或别名变更后调用，下一次解析时在后台重建"""
+    _registry.invalidate()
+
+
+def get_alias_status() -> dict:
+    return _registry.status()
@@ -0,0 +1,438 @@
+"""
+油井目录内存索引
+把列表类工具展示的油井主数据（well_name, qk, jx, sjjs, sjrq, ktxm）常驻进程内存，
+search_wells / get_wells_by_block / get_wells_by_project 直接在内存中检索，不再访问数据库
+"""
+import os
+import math
+import time
+import heapq
+import bisect
+import logging
+import threading
+from array import array
+from datetime import datetime, timedelta
+
+from common.db import fetch_columns
+from common.utils import NULL_CREATED_AT
+
+logger = logging.getLogger(__name__)
+
+# 目录配置 - 从环境变量读取
+CATALOG_CONFIG = {
+    'enabled': os.getenv('WELL_CATALOG_ENABLED', 'true').lower() == 'true',
+    'refresh_interval': float(os.getenv('WELL_CATALOG_REFRESH_INTERVAL', '30')),
+    'full_reload_interval': float(os.getenv('WELL_CATALOG_FULL_RELOAD_INTERVAL', '3600')),
+    'watermark_overlap': float(os.getenv('WELL_CATALOG_WATERMARK_OVERLAP', '60')),
+}
+
+# 建立 n-gram / 前缀索引的列
+INDEXED_COLUMNS = ("well_name", "qk", "ktxm")
+
+_SELECT_WELLS = """
+    SELECT id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at, updated_at, is_deleted
+    FROM oil_wells
+"""
+
+
+def _bigrams(text: str) -> list[str]:
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+_EPOCH = datetime(1970, 1, 1)
+# created_at 为 NULL 的行按 NULL_CREATED_AT 排序，与续页令牌和 SQL 键集条件一致
+_NULL_CREATED = (NULL_CREATED_AT - _EPOCH) // timedelta(microseconds=1)
+
+
+def to_micros(value: datetime | None) -> int:
+    """created_at（timestamp without time zone）转换为整数微秒，精确可逆"""
+    if value is None:
+        return _NULL_CREATED
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+class _CatalogState:
+    """
+    目录数据（列式存储）
+
+    每口井占一个行号，标量列存放在 array 中，文本列存放在 list 中；
+    删除的井只清除索引并标记 alive=0，行号在再次出现时复用。
+    n-gram 索引：列 -> {单字或二元组: 行号集合}，子串查询先求二元组行号集合的交集再校验。
+    前缀索引：列 -> 按小写值排序的 (值, 行号) 列表，变更后在下一次前缀查询时重建。
+    """
+
+    def __init__(self):
+        self.ids = array('q')
+        self.sjjs = array('d')
+        self.created = array('q')
+        self.alive = bytearray()
+        self.well_name: list[str | None] = []
+        self.qk: list[str | None] = []
+        self.jx: list[str | None] = []
+        self.ktxm: list[str | None] = []
+        self.sjrq: list = []
+        self.positions: dict[int, int] = {}
+        self.size = 0
+        self.lowered = {column: [] for column in INDEXED_COLUMNS}
+        self.grams = {column: {} for column in INDEXED_COLUMNS}
+        self.prefix: dict[str, list | None] = {column: None for column in INDEXED_COLUMNS}
+        # 区块统计：区块 -> [井数, 设计井深合计, 设计井深非空井数]，随写入增量维护
+        self.blocks: dict[str, list] = {}
+
+    # ---------- 写入 ----------
+
+    def _index(self, column: str, pos: int, text: str):
+        grams = self.grams[column]
+        for gram in set(text) | set(_bigrams(text)):
+            grams.setdefault(gram, set()).add(pos)
+
+    def _unindex(self, column: str, pos: int, text: str):
+        grams = self.grams[column]
+        for gram in set(text) | set(_bigrams(text)):
+            postings = grams.get(gram)
+            if postings is not None:
+                postings.discard(pos)
+                if not postings:
+                    del grams[gram]
+
+    def _tally(self, pos: int, sign: int):
+        block = self.qk[pos]
+        if not block:
+            return
+        entry = self.blocks.setdefault(block, [0, 0.0, 0])
+        entry[0] += sign
+        depth = self.sjjs[pos]
+        if not math.isnan(depth):
+            entry[1] += sign * depth
+            entry[2] += sign
+        if entry[0] <= 0:
+            del self.blocks[block]
+
+    def upsert(self, well_id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at):
+        values = {"well_name": well_name, "qk": qk, "ktxm": ktxm}
+        depth = float(sjjs) if sjjs is not None else math.nan
+        pos = self.positions.get(well_id)
+
+        if pos is None:
+            pos = len(self.ids)
+            self.positions[well_id] = pos
+            self.ids.append(well_id)
+            self.sjjs.append(depth)
+            self.created.append(to_micros(created_at))
+            self.alive.append(1)
+            self.well_name.append(well_name)
+            self.qk.append(qk)
+            self.jx.append(jx)
+            self.ktxm.append(ktxm)
+            self.sjrq.append(sjrq)
+            for column in INDEXED_COLUMNS:
+                text = (values[column] or "").lower()
+                self.lowered[column].append(text)
+                self._index(column, pos, text)
+            self.size += 1
+        else:
+            if self.alive[pos]:
+                self._tally(pos, -1)
+            for column in INDEXED_COLUMNS:
+                old, new = self.lowered[column][pos], (values[column] or "").lower()
+                if old != new or not self.alive[pos]:
+                    self._unindex(column, pos, old)
+                    self._index(column, pos, new)
+                    self.lowered[column][pos] = new
+            self.sjjs[pos] = depth
+            self.created[pos] = to_micros(created_at)
+            self.well_name[pos] = well_name
+            self.qk[pos] = qk
+            self.jx[pos] = jx
+            self.ktxm[pos] = ktxm
+            self.sjrq[pos] = sjrq
+            if not self.alive[pos]:
+                self.alive[pos] = 1
+                self.size += 1
+
+        self._tally(pos, 1)
+        for column in INDEXED_COLUMNS:
+            self.prefix[column] = None
+
+    def delete(self, well_id):
+        pos = self.positions.get(well_id)
+        if pos is None or not self.alive[pos]:
+            return
+        self._tally(pos, -1)
+        for column in INDEXED_COLUMNS:
+            self._unindex(column, pos, self.lowered[column][pos])
+            self.lowered[column][pos] = ""
+            self.prefix[column] = None
+        self.alive[pos] = 0
+        self.size -= 1
+
+    # ---------- 查询 ----------
+
+    def match(self, column: str, keyword: str) -> set[int]:
+        """column ILIKE '%keyword%' 的行号集合"""
+        grams = self.grams[column]
+        if len(keyword) == 1:
+            return set(grams.get(keyword, ()))
+
+        postings = [grams.get(gram) for gram in _bigrams(keyword)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates &= other
+            if not candidates:
+                return candidates
+        if len(keyword) == 2:
+            return candidates
+        lowered = self.lowered[column]
+        return {pos for pos in candidates if keyword in lowered[pos]}
+
+    def prefix_match(self, column: str, prefix: str) -> list[int]:
+        """column ILIKE 'prefix%' 的行号列表"""
+        entries = self.prefix[column]
+        if entries is None:
+            lowered = self.lowered[column]
+            entries = sorted((lowered[pos], pos) for pos in range(len(self.ids)) if self.alive[pos])
+            self.prefix[column] = entries
+        start = bisect.bisect_left(entries, (prefix,))
+        result = []
+        for text, pos in entries[start:]:
+            if not text.startswith(prefix):
+                break
+            result.append(pos)
+        return result
+
+    def top(self, positions, limit: int, after: tuple | None = None) -> list[int]:
+        """
+        按 (created_at, id) DESC 取前 limit 个行号
+
+        after: 键集分页位置 (created_at 微秒, id)，只返回排在它之后的行
+        """
+        created, ids = self.created, self.ids
+        if after is not None:
+            positions = (pos for pos in positions if (created[pos], ids[pos]) < after)
+        return heapq.nlargest(limit, positions, key=lambda pos: (created[pos], ids[pos]))
+
+    def live_positions(self):
+        return (pos for pos, flag in enumerate(self.alive) if flag)
+
+    def row(self, pos: int) -> dict:
+        depth = self.sjjs[pos]
+        created = self.created[pos]
+        return {
+            "id": self.ids[pos],
+            "well_name": self.well_name[pos],
+            "qk": self.qk[pos],
+            "jx": self.jx[pos],
+            "sjjs": None if math.isnan(depth) else depth,
+            "sjrq": self.sjrq[pos],
+            "ktxm": self.ktxm[pos],
+            "created_at": None if created == _NULL_CREATED else _EPOCH + timedelta(microseconds=created),
+        }
+
+
+class WellCatalog:
+    """
+    油井目录
+
+    启动时全量加载未删除的井；之后后台线程按 updated_at 水位增量刷新
+    （查询 updated_at > 水位 - overlap 的行，覆盖提交较晚的长事务），软删除的井在刷新时移出目录。
+    物理删除无法通过水位发现，因此每隔 full_reload_interval 秒做一次全量重载。
+    """
+
+    def __init__(self, refresh_interval: float = 30, full_reload_interval: float = 3600,
+                 watermark_overlap: float = 60):
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.watermark_overlap = timedelta(seconds=watermark_overlap)
+        self._state = _CatalogState()
+        self._lock = threading.Lock()
+        self._watermark: datetime | None = None
+        self._loaded_at: float | None = None
+        self._refreshed_at: str | None = None
+        self._error: str | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded_at is not None
+
+    # ---------- 加载与刷新 ----------
+
+    def load(self):
+        """全量加载"""
+        start = time.monotonic()
+        columns = fetch_columns(_SELECT_WELLS + " WHERE is_deleted = false", readonly=False)
+        state = _CatalogState()
+        for row in zip(columns["id"], columns["well_name"], columns["qk"], columns["jx"],
+                       columns["sjjs"], columns["sjrq"], columns["ktxm"], columns["created_at"]):
+            state.upsert(*row)
+        watermark = max((ts for ts in columns["updated_at"] if ts is not None), default=None)
+
+        with self._lock:
+            self._state = state
+            self._watermark = watermark
+            self._loaded_at = time.monotonic()
+        self._mark_refreshed()
+        logger.info(f"📚 油井目录已加载: {state.size} 口井，用时 {(time.monotonic() - start) * 1000:.0f}ms")
+
+    def refresh(self):
+        """按 updated_at 水位增量刷新；未加载或到达全量重载周期时全量加载"""
+        if (not self.ready or self._watermark is None
+                or time.monotonic() - self._loaded_at >= self.full_reload_interval):
+            self.load()
+            return
+
+        columns = fetch_columns(
+            _SELECT_WELLS + " WHERE updated_at > %s",
+            (self._watermark - self.watermark_overlap,),
+            readonly=False,
+        )
+        with self._lock:
+            state = self._state
+            for row in zip(columns["id"], columns["well_name"], columns["qk"], columns["jx"],
+                           columns["sjjs"], columns["sjrq"], columns["ktxm"], columns["created_at"],
+                           columns["is_deleted"]):
+                if row[-1]:
+                    state.delete(row[0])
+                else:
+                    state.upsert(*row[:-1])
+            self._watermark = max([self._watermark, *(ts for ts in columns["updated_at"] if ts is not None)])
+        self._mark_refreshed()
+
+    def _mark_refreshed(self):
+        self._refreshed_at = datetime.now().isoformat(timespec="seconds")
+        self._error = None
+
+    def request_refresh(self):
+        """唤醒后台线程立即刷新（写入油井数据后调用）"""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="well-catalog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                self._error = str(e)
+                logger.warning(f"⚠️  油井目录刷新失败: {e}")
+
+    # ---------- 查询 ----------
+
+    @property
+    def size(self) -> int:
+        return self._state.size
+
+    @staticmethod
+    def _after(after):
+        # (created_at, id) 分页位置转换为内部排序键
+        return None if after is None else (to_micros(after[0]), after[1])
+
+    def search(self, keywords: list[str], columns=INDEXED_COLUMNS, limit: int = 500,
+               after: tuple | None = None) -> list[dict]:
+        """
+        任一关键词出现在任一列中（ILIKE '%kw%'），按 (created_at, id) DESC 返回前 limit 行
+
+        以 * 结尾的关键词按前缀匹配（ILIKE 'kw%'），走排序前缀索引
+        after: 键集分页位置 (created_at, id)，只返回排在它之后的行
+        """
+        with self._lock:
+            state = self._state
+            matched: set[int] = set()
+            for keyword in keywords:
+                keyword = (keyword or "").lower()
+                prefix = keyword.endswith("*")
+                keyword = keyword.rstrip("*")
+                if not keyword:
+                    continue
+                for column in columns:
+                    if prefix:
+                        matched.update(state.prefix_match(column, keyword))
+                    else:
+                        matched |= state.match(column, keyword)
+            return [state.row(pos) for pos in state.top(matched, limit, self._after(after))]
+
+    def latest(self, limit: int = 500, after: tuple | None = None) -> list[dict]:
+        """最新创建的 limit 口井（after 同 search）"""
+        with self._lock:
+            state = self._state
+            return [state.row(pos) for pos in state.top(state.live_positions(), limit, self._after(after))]
+
+    def block_summary(self, top: int = 10) -> list[tuple]:
+        """按区块统计 [(区块, 井数, 平均设计井深)]，井数降序取前 top 个（读取增量维护的汇总，O(区块数)）"""
+        with self._lock:
+            ranked = heapq.nlargest(top, self._state.blocks.items(), key=lambda item: item[1][0])
+            return [(block, count, round(total / n, 2) if n else 0) for block, (count, total, n) in ranked]
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "wells": self.size,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+            "last_refresh": self._refreshed_at,
+            "error": self._error,
+        }
+
+
+_catalog: WellCatalog | None = None
+
+
+def start_well_catalog():
+    """全量加载油井目录并启动后台刷新（WELL_CATALOG_ENABLED=false 时不启用）"""
+    global _catalog
+    if not CATALOG_CONFIG['enabled']:
+        logger.info("📚 油井目录未启用，列表工具直接查询数据库")
+        return
+    if _catalog is None:
+        _catalog = WellCatalog(
+            refresh_interval=CATALOG_CONFIG['refresh_interval'],
+            full_reload_interval=CATALOG_CONFIG['full_reload_interval'],
+            watermark_overlap=CATALOG_CONFIG['watermark_overlap'],
+        )
+    try:
+        _catalog.load()
+    except Exception as e:
+        # 加载失败时工具回退到数据库查询，后台线程继续重试
+        _catalog._error = str(e)
+        logger.warning(f"⚠️  油井目录加载失败，暂时回退到数据库查询: {e}")
+    _catalog.start()
+
+
+def stop_well_catalog():
+    if _catalog is not None:
+        _catalog.stop()
+
+
+def get_well_catalog() -> WellCatalog | None:
+    """已加载的油井目录；未启用或尚未加载成功时返回 None（调用方回退到数据库查询）"""
+    if _catalog is not None and _catalog.ready:
+        return _catalog
+    return None
+
+
+def request_catalog_refresh():
+    """油井数据写入后通知目录尽快刷新"""
+    if _catalog is not None:
+        _catalog.request_refresh()
+
+
+def get_catalog_status() -> dict:
+    if _catalog is None:
+        return {"ready": False, "enabled": CATALOG_CONFIG['enabled']}
+    return _catalog.status()
@@ -3,8 +3,22 @@
 提供统一的数据库连接和查询接口
 """
 import os
+import re
+import json
+import time
+import uuid
+import asyncio
 import logging
+import threading
+import functools
+import itertools
+import contextlib
+import contextvars
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
+import psycopg2.errors
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
 
 logger = logging.getLogger(__name__)
@@ -18,14 +32,519 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'postgres')
 }
 
-def get_db_connection():
-    """获取PostgreSQL数据库连接"""
+# 连接池配置 - 从环境变量读取
+POOL_CONFIG = {
+    'minconn': int(os.getenv('DB_POOL_MIN', '1')),                  # 启动时预建的连接数
+    'maxconn': int(os.getenv('DB_POOL_MAX', '10')),                 # 连接数上限
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),           # 借出连接的最长等待时间（秒）
+    'check_idle': float(os.getenv('DB_POOL_CHECK_IDLE', '30')),     # 空闲超过该秒数的连接借出前先 SELECT 1（0 表示每次都检查）
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),  # 连接最长存活时间（秒），超过后回收重建
+}
+
+# 只读从库配置 - DB_REPLICAS 为逗号分隔的 host:port 列表（库名/用户/密码与主库相同）
+REPLICA_CONFIG = {
+    'hosts': [h.strip() for h in os.getenv('DB_REPLICAS', '').split(',') if h.strip()],
+    'max_lag': float(os.getenv('DB_REPLICA_MAX_LAG', '10')),                 # 允许的最大复制延迟（秒），超过则回落主库
+    'check_interval': float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '5')),    # 复制延迟检查间隔（秒）
+    'connect_timeout': int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', '3')),    # 从库连接超时（秒）
+}
+
+# 查询时间预算 - 工具未单独配置时使用的 statement_timeout（毫秒）
+QUERY_CONFIG = {
+    'statement_timeout_ms': int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000')),
+    # count_exceeds()：规划器估算值与阈值的相对偏差在此范围内时改做精确计数
+    'count_estimate_margin': float(os.getenv('DB_COUNT_ESTIMATE_MARGIN', '0.5')),
+}
+
+# 健康检查配置
+HEALTH_CONFIG = {
+    'interval': float(os.getenv('DB_HEALTH_INTERVAL', '10')),   # 后台 SELECT 1 探测间隔（秒）
+}
+
+
+class PoolTimeoutError(Exception):
+    """在 timeout 内未能从连接池借到连接"""
+
+
+class QueryCancelledError(Exception):
+    """查询作用域已被取消（如客户端断开连接）"""
+
+
+class PooledConnection:
+    """
+    连接池借出的连接代理
+
+    行为与 psycopg2 连接一致，唯一区别是 close() 会把连接归还连接池而不是断开，
+    因此现有的 `conn = get_db_connection() ... conn.close()` 写法无需修改。
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self._in_use = False
+        self._scope: "QueryScope | None" = None
+        self.prepared: set[str] = set()   # 已在该连接上 PREPARE 的语句名
+        self.statement_timeout_ms: int | None = None   # 会话级 statement_timeout，None 为数据库默认值
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def raw(self):
+        """底层 psycopg2 连接"""
+        return self._raw
+
+    def close(self):
+        """归还连接池"""
+        self._pool.putconn(self)
+
+
+class ConnectionPool:
+    """
+    线程安全的 PostgreSQL 连接池
+
+    - 借出时对长时间空闲的连接做 SELECT 1 健康检查，失效连接直接丢弃重建
+    - 超过 max_lifetime 的连接在借出/归还时回收
+    - 归还时回滚未结束的事务，保证下一个使用者拿到干净的连接
+    """
+
+    def __init__(self, conn_kwargs: dict, minconn: int = 1, maxconn: int = 10,
+                 timeout: float = 10, check_idle: float = 30, max_lifetime: float = 1800):
+        self.conn_kwargs = conn_kwargs
+        self.minconn = max(0, minconn)
+        self.maxconn = max(1, maxconn, self.minconn)
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.max_lifetime = max_lifetime
+
+        self._cond = threading.Condition()
+        self._idle: list[PooledConnection] = []
+        self._size = 0
+        self._closed = False
+        self._stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "opened": 0, "discarded": 0}
+
+    def open(self):
+        """预建 minconn 个连接（失败只记录日志，后续借出时再重试）"""
+        for _ in range(self.minconn - self._size):
+            try:
+                with self._cond:
+                    self._size += 1
+                conn = self._connect()
+            except Exception as e:
+                with self._cond:
+                    self._size -= 1
+                logger.warning(f"⚠️  连接池预建连接失败: {e}")
+                return
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def _connect(self) -> PooledConnection:
+        raw = psycopg2.connect(**self.conn_kwargs, cursor_factory=RealDictCursor)
+        with self._cond:
+            self._stats["opened"] += 1
+        return PooledConnection(self, raw)
+
+    def _expired(self, conn: PooledConnection, now: float) -> bool:
+        return self.max_lifetime > 0 and now - conn.created_at > self.max_lifetime
+
+    def _is_usable(self, conn: PooledConnection) -> bool:
+        now = time.monotonic()
+        if conn.raw.closed or self._expired(conn, now):
+            return False
+        if now - conn.last_used < self.check_idle:
+            return True
+        try:
+            cursor = conn.raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.raw.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️  连接池健康检查失败，丢弃连接: {e}")
+            return False
+
+    def _discard(self, conn: PooledConnection):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def _acquire_slot(self, deadline: float):
+        """取一个空闲连接；返回 None 表示已占用名额、需要新建连接"""
+        with self._cond:
+            waited = False
+            while True:
+                if self._closed:
+                    raise psycopg2.InterfaceError("连接池已关闭")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.maxconn:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(f"等待数据库连接超时（{self.timeout}s，连接数上限 {self.maxconn}）")
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+    def getconn(self) -> PooledConnection:
+        """借出连接"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = self._acquire_slot(deadline)
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn):
+                self._discard(conn)
+                continue
+            conn._in_use = True
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return conn
+
+    def putconn(self, conn: PooledConnection):
+        """归还连接"""
+        if not conn._in_use:
+            return
+        conn._in_use = False
+        if conn._scope is not None:
+            conn._scope.detach(conn)
+            conn._scope = None
+        raw = conn.raw
+        if raw.closed or self._closed or self._expired(conn, time.monotonic()):
+            self._discard(conn)
+            return
+
+        status = raw.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            self._discard(conn)
+            return
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                raw.rollback()
+            except Exception:
+                self._discard(conn)
+                return
+
+        conn.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        """关闭连接池及所有空闲连接（借出中的连接在归还时关闭）"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        """连接池统计信息"""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max": self.maxconn,
+                **self._stats,
+            }
+
+
+class QueryScope:
+    """
+    一次工具调用的查询作用域
+
+    - timeout_ms: 作用域内借出的连接设置会话级 statement_timeout（作用域内提交事务后仍然有效）
+    - cancel(): 向作用域内正在使用的所有后端连接发送取消请求，之后再借连接会抛出 QueryCancelledError
+    """
+
+    def __init__(self, timeout_ms: int | None = None):
+        self.timeout_ms = timeout_ms
+        self.cancelled = False
+        self._active: set[PooledConnection] = set()
+        self._lock = threading.Lock()
+
+    def attach(self, conn: PooledConnection):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledError("查询已取消")
+            self._active.add(conn)
+        conn._scope = self
+
+    def detach(self, conn: PooledConnection):
+        # 与 cancel() 互斥：连接归还后不会再收到本作用域的取消请求
+        with self._lock:
+            self._active.discard(conn)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for conn in self._active:
+                try:
+                    conn.raw.cancel()
+                except Exception as e:
+                    logger.warning(f"⚠️  取消后端查询失败: {e}")
+
+
+_current_scope: contextvars.ContextVar[QueryScope | None] = contextvars.ContextVar("db_query_scope", default=None)
+
+
+@contextlib.contextmanager
+def query_scope(timeout_ms: int | None = None):
+    """
+    为当前上下文中的数据库访问设置时间预算和取消作用域
+
+    嵌套调用共用外层作用域（只调整 timeout_ms），因此 HTTP 层创建的可取消作用域
+    与工具层设置的时间预算可以叠加使用。
+
+    Args:
+        timeout_ms: statement_timeout（毫秒），None 时使用 DB_STATEMENT_TIMEOUT_MS
+    """
+    timeout_ms = timeout_ms or QUERY_CONFIG['statement_timeout_ms']
+    scope = _current_scope.get()
+    if scope is not None:
+        previous, scope.timeout_ms = scope.timeout_ms, timeout_ms
+        try:
+            yield scope
+        finally:
+            scope.timeout_ms = previous
+        return
+
+    scope = QueryScope(timeout_ms)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def _enter_scope(conn: PooledConnection):
+    """把借出的连接纳入当前查询作用域，并按作用域设置 statement_timeout"""
+    scope = _current_scope.get()
+    try:
+        if scope is not None:
+            scope.attach(conn)
+        _apply_statement_timeout(conn)
+    except Exception:
+        conn.close()
+        raise
+
+
+def _apply_statement_timeout(conn: PooledConnection):
+    """
+    按连接所属作用域设置会话级 statement_timeout，不在作用域内借出时恢复数据库默认值
+
+    会话级设置不会随作用域内的提交或回滚失效，整个借出期间（包括分批提交的写入）都受时间预算约束；
+    连接上记录当前值，与本次借出需要的值相同时不再发送，同一预算的连续借出没有额外往返。
+    """
+    scope = conn._scope
+    timeout_ms = int(scope.timeout_ms) if scope is not None and scope.timeout_ms else None
+    if conn.statement_timeout_ms == timeout_ms:
+        return
+    raw = conn.raw
+    # 自动提交模式下执行：不开启事务，调用方之后回滚也不会撤销该设置
+    raw.autocommit = True
     try:
-        conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
-        return conn
+        cursor = raw.cursor()
+        try:
+            if timeout_ms is None:
+                cursor.execute("RESET statement_timeout")
+            else:
+                cursor.execute("SET statement_timeout = %s", (timeout_ms,))
+        finally:
+            cursor.close()
+    finally:
+        raw.autocommit = False
+    conn.statement_timeout_ms = timeout_ms
+
+
+# 从库复制延迟：已追平（收到的 WAL 全部回放）时为 0，否则为最后一次回放事务距今的秒数
+_REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS lag
+"""
+
+
+class ReplicaRouter:
+    """
+    只读查询路由
+
+    在复制延迟不超过 max_lag 的从库之间轮询分配连接；从库不可达或延迟过大时
+    返回 None，由调用方回落到主库。延迟按 check_interval 惰性检查并缓存。
+    """
+
+    def __init__(self, hosts: list[str], max_lag: float = 10, check_interval: float = 5,
+                 connect_timeout: int = 3):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.replicas = []
+        for spec in hosts:
+            host, _, port = spec.partition(':')
+            conn_kwargs = {**DB_CONFIG, 'host': host, 'port': int(port or DB_CONFIG['port']),
+                           'connect_timeout': connect_timeout}
+            self.replicas.append({
+                "name": spec,
+                "pool": ConnectionPool(conn_kwargs, **POOL_CONFIG),
+                "healthy": False,
+                "lag": None,
+                "checked_at": None,
+                "error": None,
+            })
+        self._rr = itertools.count()
+        self._lock = threading.Lock()
+
+    def _check(self, replica: dict):
+        conn = replica["pool"].getconn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_REPLICA_LAG_SQL)
+            lag = float(cursor.fetchone()['lag'])
+            cursor.close()
+        finally:
+            conn.close()
+        replica.update(lag=lag, healthy=lag <= self.max_lag, error=None)
+        if lag > self.max_lag:
+            logger.warning(f"⚠️  从库 {replica['name']} 复制延迟 {lag:.1f}s 超过阈值，只读查询回落主库")
+
+    def _refresh(self):
+        now = time.monotonic()
+        for replica in self.replicas:
+            with self._lock:
+                if replica["checked_at"] is not None and now - replica["checked_at"] < self.check_interval:
+                    continue
+                replica["checked_at"] = now
+            try:
+                self._check(replica)
+            except Exception as e:
+                replica.update(healthy=False, error=str(e))
+                logger.warning(f"⚠️  从库 {replica['name']} 不可用: {e}")
+
+    def getconn(self) -> PooledConnection | None:
+        """从可用从库借出连接；没有可用从库时返回 None"""
+        self._refresh()
+        healthy = [r for r in self.replicas if r["healthy"]]
+        if not healthy:
+            return None
+        start = next(self._rr)
+        for i in range(len(healthy)):
+            replica = healthy[(start + i) % len(healthy)]
+            try:
+                return replica["pool"].getconn()
+            except Exception as e:
+                replica.update(healthy=False, error=str(e))
+                logger.warning(f"⚠️  从库 {replica['name']} 借出连接失败: {e}")
+        return None
+
+    def status(self) -> list[dict]:
+        """各从库的延迟和健康状态"""
+        return [
+            {
+                "name": r["name"],
+                "healthy": r["healthy"],
+                "lag_seconds": r["lag"],
+                "error": r["error"],
+                "pool": r["pool"].stats(),
+            }
+            for r in self.replicas
+        ]
+
+    def close(self):
+        for replica in self.replicas:
+            replica["pool"].close()
+
+
+_pool: ConnectionPool | None = None
+_replica_router: ReplicaRouter | None = None
+_pool_lock = threading.Lock()
+_db_executor: ThreadPoolExecutor | None = None
+
+
+def get_pool() -> ConnectionPool:
+    """获取进程级连接池（首次调用时创建）"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+                pool.open()
+                _pool = pool
+                logger.info(f"🗄️  数据库连接池已创建 (min={pool.minconn}, max={pool.maxconn})")
+    return _pool
+
+
+def get_replica_router() -> ReplicaRouter | None:
+    """获取只读从库路由（未配置 DB_REPLICAS 时返回 None）"""
+    global _replica_router
+    if _replica_router is None and REPLICA_CONFIG['hosts']:
+        with _pool_lock:
+            if _replica_router is None:
+                _replica_router = ReplicaRouter(**REPLICA_CONFIG)
+                logger.info(f"🗄️  只读从库: {', '.join(REPLICA_CONFIG['hosts'])} (最大延迟 {REPLICA_CONFIG['max_lag']}s)")
+    return _replica_router
+
+
+def get_replica_status() -> list[dict]:
+    """各只读从库状态（未配置从库时为空列表）"""
+    router = get_replica_router()
+    return router.status() if router else []
+
+
+def close_pool():
+    """关闭进程级连接池（含从库）和数据库线程池"""
+    global _pool, _replica_router, _db_executor
+    with _pool_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=False, cancel_futures=True)
+            _db_executor = None
+        if _replica_router is not None:
+            _replica_router.close()
+            _replica_router = None
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_db_connection(readonly: bool = False):
+    """
+    从连接池借出PostgreSQL数据库连接（调用 close() 归还）
+
+    Args:
+        readonly: 只读查询传 True，优先路由到复制延迟达标的从库；
+                  未配置从库或从库均不可用时使用主库。写操作必须使用默认值。
+    """
+    try:
+        conn = None
+        if readonly:
+            router = get_replica_router()
+            conn = router.getconn() if router else None
+        if conn is None:
+            conn = get_pool().getconn()
     except Exception as e:
         logger.error(f"数据库连接失败: {e}")
         raise
+    _enter_scope(conn)
+    return conn
 
 def test_db_connection():
     """测试数据库连接"""
@@ -43,18 +562,19 @@ def test_db_connection():
         logger.error(f"❌ 数据库连接测试失败: {e}")
         return False
 
-def execute_query(query: str, params: tuple = None):
+def execute_query(query: str, params: tuple = None, readonly: bool = True):
     """
     执行数据库查询
     
     Args:
         query: SQL查询语句
         params: 查询参数
+        readonly: 是否允许路由到只读从库
         
     Returns:
-        查询结果列表
+        查询结果列表（RealDictRow，可直接按 dict 使用）
     """
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=readonly)
     cursor = conn.cursor()
     
     try:
@@ -62,8 +582,206 @@ def execute_query(query: str, params: tuple = None):
             cursor.execute(query, params)
         else:
             cursor.execute(query)
-        results = cursor.fetchall()
-        return [dict(row) for row in results]
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def iter_query_batches(query: str, params=None, batch_size: int = 500, readonly: bool = True):
+    """
+    使用服务端命名游标分批读取查询结果
+
+    结果集留在 PostgreSQL 端，每次只把 batch_size 行拉到本进程，
+    适合导出和大日期范围的日报查询，内存占用与结果集大小无关。
+    生成器结束（或被提前关闭）时游标关闭、连接归还连接池。
+
+    Args:
+        query: SQL查询语句
+        params: 查询参数
+        batch_size: 每批行数
+        readonly: 是否允许路由到只读从库
+
+    Yields:
+        每批行（RealDictRow 列表）
+    """
+    conn = get_db_connection(readonly=readonly)
+    cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex[:16]}")
+    cursor.itersize = batch_size
+
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        conn.close()
+
+
+def iter_query(query: str, params=None, batch_size: int = 500, readonly: bool = True):
+    """
+    逐行读取查询结果（基于 iter_query_batches）
+
+    Yields:
+        单行结果（RealDictRow）
+    """
+    for rows in iter_query_batches(query, params, batch_size, readonly):
+        yield from rows
+
+
+# psycopg2 对这些类型（int2/int4/int8/float4/float8）返回 int/float，可直接转成 NumPy 数组
+_NUMERIC_OIDS = {20, 21, 23, 700, 701}
+
+
+def columnar_cursor(conn):
+    """在连接上打开返回元组行的游标（不为每行构造 dict），配合 read_columns() 使用"""
+    return conn.cursor(cursor_factory=extensions.cursor)
+
+
+def read_columns(cursor, numeric_arrays: bool = False) -> dict:
+    """
+    把已执行查询的结果按列读取
+
+    Args:
+        cursor: columnar_cursor() 打开的游标（RealDictCursor 也可用，但会多一次逐行取值）
+        numeric_arrays: 为 True 时，不含 NULL 的整数/浮点列转换为 NumPy 数组
+
+    Returns:
+        {列名: 列值序列}，顺序与 SELECT 列一致，可直接传给 pd.DataFrame()
+    """
+    description = cursor.description or []
+    names = [col[0] for col in description]
+    rows = cursor.fetchall()
+
+    if not rows:
+        columns = [() for _ in names]
+    elif isinstance(rows[0], dict):
+        columns = [tuple(row[name] for row in rows) for name in names]
+    else:
+        columns = list(zip(*rows))
+
+    if numeric_arrays and rows:
+        import numpy as np
+        for i, col in enumerate(description):
+            if col[1] in _NUMERIC_OIDS and None not in columns[i]:
+                columns[i] = np.asarray(columns[i])
+
+    return dict(zip(names, columns))
+
+
+def fetch_columns(query: str, params=None, readonly: bool = True, numeric_arrays: bool = False) -> dict:
+    """
+    执行查询并按列返回结果（见 read_columns），适合聚合/统计类查询直接构建 DataFrame
+    """
+    conn = get_db_connection(readonly=readonly)
+    cursor = columnar_cursor(conn)
+
+    try:
+        cursor.execute(query, params)
+        return read_columns(cursor, numeric_arrays=numeric_arrays)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def execute_batch(conn, queries) -> list:
+    """
+    在一次网络往返中执行多条相互独立的查询，返回各自的结果集
+
+    psycopg2 不支持 libpq 的 pipeline 模式，且一次 execute 多条语句时只保留最后一个结果集，
+    因此这里把每条查询作为子查询放进同一条 SELECT，由服务端用 json_agg 把各结果集聚合成 JSON 数组。
+    结果行中的日期/时间为 ISO 字符串、numeric 为 float；子查询内的 ORDER BY 顺序会保留。
+
+    Args:
+        conn: get_db_connection() 借出的连接
+        queries: [(sql, params), ...]，sql 使用 %s 占位符，params 可为 None
+
+    Returns:
+        与 queries 一一对应的结果集列表，每个结果集为 dict 行列表
+    """
+    parts = []
+    params = []
+    for i, (query, query_params) in enumerate(queries):
+        parts.append(f"(SELECT COALESCE(json_agg(q), '[]'::json) FROM ({query.strip().rstrip(';')}) q) AS r{i}")
+        params.extend(query_params or ())
+
+    cursor = columnar_cursor(conn)
+    try:
+        cursor.execute("SELECT " + ",\n       ".join(parts), params)
+        return list(cursor.fetchone())
+    finally:
+        cursor.close()
+
+
+def fetch_batch(queries, readonly: bool = True) -> list:
+    """借出连接执行 execute_batch() 并归还连接"""
+    conn = get_db_connection(readonly=readonly)
+    try:
+        return execute_batch(conn, queries)
+    finally:
+        conn.close()
+
+
+def _estimate_rows(cursor, query: str, params=None) -> int:
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(query: str, params=None, readonly: bool = True) -> int:
+    """
+    用规划器估算查询返回的行数（EXPLAIN，不执行查询）
+
+    估算基于表统计信息（pg_class.reltuples 和列直方图），代价与数据量无关；
+    对 ILIKE 等选择率难以估计的条件可能偏差较大，需要确定结果时使用 count_exceeds()。
+    """
+    conn = get_db_connection(readonly=readonly)
+    cursor = columnar_cursor(conn)
+
+    try:
+        return _estimate_rows(cursor, query, params)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def count_exceeds(query: str, params=None, threshold: int = 200, readonly: bool = True) -> tuple[bool, int, bool]:
+    """
+    判断查询结果是否超过 threshold 行（大结果集保护）
+
+    先取规划器估算值；估算值明显高于或低于阈值（相对偏差超过 DB_COUNT_ESTIMATE_MARGIN）时直接采信，
+    只有接近阈值时才执行精确计数，且计数最多数到 threshold + 1 行。
+
+    Args:
+        query: 不带 ORDER BY / LIMIT 的 SQL 查询
+        params: 查询参数
+        threshold: 行数阈值
+        readonly: 是否允许路由到只读从库
+
+    Returns:
+        (是否超过阈值, 行数, 是否为精确值)；精确计数超过阈值时行数为 threshold + 1
+    """
+    margin = QUERY_CONFIG['count_estimate_margin']
+    conn = get_db_connection(readonly=readonly)
+    cursor = columnar_cursor(conn)
+
+    try:
+        estimate = _estimate_rows(cursor, query, params)
+        if estimate > threshold * (1 + margin):
+            return True, estimate, False
+        if estimate < threshold * (1 - margin):
+            return False, estimate, False
+        cursor.execute(f"SELECT COUNT(*) FROM ({query} LIMIT %s) q", (*(params or ()), threshold + 1))
+        count = cursor.fetchone()[0]
+        return count > threshold, count, True
     finally:
         cursor.close()
         conn.close()
@@ -99,3 +817,265 @@ def execute_write(query: str, params: tuple = None) -> dict:
     finally:
         cursor.close()
         conn.close()
+
+
+# ==========================================
+# 健康检查
+# ==========================================
+
+class HealthProber:
+    """
+    数据库健康探测
+
+    后台线程每隔 interval 秒在池化连接上执行一次 SELECT 1 并缓存结果，
+    /health 端点只读取缓存，不会因为负载均衡器的高频探测给数据库增加负担。
+    """
+
+    def __init__(self, interval: float = 10):
+        self.interval = interval
+        self._state = {"ok": None, "last_check": None, "checked_at": None, "latency_ms": None, "error": None}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-health-prober", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
+
+    def check(self):
+        """执行一次探测并更新缓存"""
+        start = time.monotonic()
+        try:
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+            finally:
+                conn.close()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+            logger.warning(f"⚠️  数据库健康探测失败: {e}")
+        self._state = {
+            "ok": ok,
+            "last_check": datetime.now().isoformat(timespec="seconds"),
+            "checked_at": time.monotonic(),
+            "latency_ms": round((time.monotonic() - start) * 1000, 2),
+            "error": error,
+        }
+
+    def status(self) -> dict:
+        """最近一次探测结果；超过 3 个探测周期未更新视为不健康"""
+        state = self._state
+        stale = state["checked_at"] is None or time.monotonic() - state["checked_at"] > self.interval * 3
+        ok = bool(state["ok"]) and not stale
+        return {
+            "status": "healthy" if ok else "degraded",
+            "database": "connected" if ok else "disconnected",
+            "last_check": state["last_check"],
+            "latency_ms": state["latency_ms"],
+            "error": state["error"] if state["checked_at"] is not None else "尚未完成首次探测",
+        }
+
+
+_health_prober: HealthProber | None = None
+
+
+def start_health_prober():
+    """启动后台健康探测（重复调用无副作用）"""
+    global _health_prober
+    if _health_prober is None:
+        _health_prober = HealthProber(**HEALTH_CONFIG)
+    _health_prober.start()
+
+
+def stop_health_prober():
+    """停止后台健康探测"""
+    if _health_prober is not None:
+        _health_prober.stop()
+
+
+def get_health_status() -> dict:
+    """返回缓存的健康状态及连接池统计（不访问数据库）"""
+    if _health_prober is None:
+        status = {"status": "degraded", "database": "unknown", "last_check": None,
+                  "latency_ms": None, "error": "健康探测未启动"}
+    else:
+        status = _health_prober.status()
+    status["pool"] = _pool.stats() if _pool is not None else None
+    if _replica_router is not None:
+        status["replicas"] = _replica_router.status()
+    return status
+
+
+# ==========================================
+# 预编译语句
+# ==========================================
+#
+# 工具里固定形状的查询在模块加载时通过 register_statement() 注册，
+# 每个池化连接第一次执行时 PREPARE 一次，之后直接 EXECUTE，省去每次解析和规划。
+# 连接被回收重建后预编译语句随之失效，execute_prepared() 会在新连接上重新 PREPARE。
+
+_PREPARED_STATEMENTS: dict[str, str] = {}
+_prepared_stats: dict[str, dict] = {}
+_prepared_lock = threading.Lock()
+
+
+def register_statement(name: str, query: str):
+    """
+    注册命名预编译语句
+
+    Args:
+        name: 语句名（须为合法的 SQL 标识符）
+        query: SQL 语句，参数占位符使用 %s（与 cursor.execute 写法一致）
+    """
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+        raise ValueError(f"非法的预编译语句名: {name}")
+    _PREPARED_STATEMENTS[name] = query
+    with _prepared_lock:
+        _prepared_stats.setdefault(name, {"hits": 0, "prepares": 0, "reprepares": 0})
+
+
+def _count(name: str, key: str):
+    with _prepared_lock:
+        _prepared_stats[name][key] += 1
+
+
+def _prepare(cursor, name: str):
+    query = _PREPARED_STATEMENTS[name]
+    index = iter(range(1, query.count("%s") + 1))
+    body = re.sub(r"%s", lambda _: f"${next(index)}", query)
+    cursor.execute(f"PREPARE {name} AS {body}")
+
+
+def execute_prepared(conn, cursor, name: str, params=()):
+    """
+    按名称执行预编译语句，结果通过 cursor.fetch*() 读取
+
+    Args:
+        conn: get_db_connection() 借出的连接
+        cursor: 该连接上的游标
+        name: register_statement() 注册的语句名
+        params: 查询参数
+    """
+    params = tuple(params)
+    if not isinstance(conn, PooledConnection):
+        # 非池化连接不维护预编译状态，直接执行原始 SQL
+        cursor.execute(_PREPARED_STATEMENTS[name], params)
+        return
+
+    execute_sql = f"EXECUTE {name}" + (f" ({', '.join(['%s'] * len(params))})" if params else "")
+
+    if name in conn.prepared:
+        try:
+            cursor.execute(execute_sql, params)
+            _count(name, "hits")
+            return
+        except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported) as e:
+            # 服务端已丢失该语句（连接被重置等），或表结构变更导致缓存计划失效：回滚后重新 PREPARE
+            conn.rollback()
+            conn.prepared.discard(name)
+            if isinstance(e, psycopg2.errors.FeatureNotSupported):
+                cursor.execute(f"DEALLOCATE {name}")
+            _count(name, "reprepares")
+            logger.warning(f"⚠️  预编译语句 {name} 已失效，重新 PREPARE: {e}")
+
+    try:
+        _prepare(cursor, name)
+    except psycopg2.errors.DuplicatePreparedStatement:
+        conn.rollback()
+    conn.prepared.add(name)
+    _count(name, "prepares")
+    cursor.execute(execute_sql, params)
+
+
+def fetch_prepared(name: str, params=(), readonly: bool = True):
+    """借出连接执行预编译语句并返回全部结果行"""
+    conn = get_db_connection(readonly=readonly)
+    cursor = conn.cursor()
+
+    try:
+        execute_prepared(conn, cursor, name, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_prepared_statement_stats() -> dict:
+    """各预编译语句的命中统计（hits: 直接 EXECUTE 次数, prepares: PREPARE 次数, reprepares: 失效后重建次数）"""
+    with _prepared_lock:
+        return {name: dict(stats) for name, stats in _prepared_stats.items()}
+
+
+# ==========================================
+# 异步访问接口
+# ==========================================
+#
+# psycopg2 没有 asyncio 驱动，这里用一个与连接池同样大小的专用线程池承载阻塞的
+# 数据库调用：每个工作线程最多占用一个连接，事件循环只负责等待结果，
+# 多个 SSE 客户端的工具调用因此可以并发执行各自的数据库 I/O。
+
+def _get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _pool_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(
+                    max_workers=POOL_CONFIG['maxconn'],
+                    thread_name_prefix="db-worker",
+                )
+    return _db_executor
+
+
+async def run_db_call(func, *args, **kwargs):
+    """
+    在数据库线程池中执行阻塞的数据库函数，不阻塞事件循环
+
+    调用方的 contextvars（如用户上下文）会被复制到工作线程中。
+
+    Args:
+        func: 同步函数（通常是工具函数或 execute_* 辅助函数）
+        *args, **kwargs: 透传给 func 的参数
+
+    Returns:
+        func 的返回值
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_db_executor(), call)
+
+
+async def cancel_on_disconnect(coro, is_disconnected, scope: QueryScope, poll_interval: float = 0.5):
+    """
+    执行协程，期间轮询客户端连接状态；客户端断开时取消作用域内的后端查询
+
+    Args:
+        coro: 要执行的协程（通常是 handle_call_tool(...)）
+        is_disconnected: 返回客户端是否已断开的异步函数（如 starlette 的 request.is_disconnected）
+        scope: query_scope() 创建的查询作用域
+        poll_interval: 轮询间隔（秒）
+
+    Raises:
+        QueryCancelledError: 客户端已断开
+    """
+    task = asyncio.ensure_future(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return task.result()
+        if await is_disconnected():
+            scope.cancel()
+            task.cancel()
+            raise QueryCancelledError("客户端已断开，已取消正在执行的查询")
@@ -0,0 +1,119 @@
+"""
+最新状态快照模块
+缓存日报表中每口井最近一天的记录（DISTINCT ON (jh) ... ORDER BY jh, rq DESC，走 (jh, rq DESC) 部分覆盖索引），
+供"所有井的最新状态"类查询一次返回；写入工具写入某井不早于快照日期的日报时只标记该井，下次读取时单独重查
+"""
+import os
+import time
+import logging
+import threading
+from datetime import date
+
+from common.db import iter_query
+
+logger = logging.getLogger(__name__)
+
+# 最新状态快照配置 - 从环境变量读取
+LATEST_SNAPSHOT_CONFIG = {
+    # 快照最长使用时间（秒）；导入脚本等其他进程的写入在过期后全量重载时体现
+    'ttl': float(os.getenv('LATEST_SNAPSHOT_TTL', '300')),
+}
+
+
+def _parse_date(value) -> date | None:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class LatestRowSnapshot:
+    """
+    单张日报表的最新行快照：井号 -> 该井最近一天的记录
+
+    快照和单井重查都读主库，避免从库延迟导致刚写入的日报在下一次重载前不可见。
+    """
+
+    def __init__(self, table: str, columns: str, ttl: float):
+        self.table = table
+        self.columns = columns
+        self.ttl = ttl
+        self._rows: dict[str, dict] | None = None
+        self._loaded_at = 0.0
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+        self.full_loads = 0
+        self.partial_loads = 0
+
+    def _query(self, wells: list[str] | None = None) -> dict[str, dict]:
+        query = f"SELECT DISTINCT ON (jh) {self.columns} FROM {self.table} WHERE is_deleted = false AND jh IS NOT NULL"
+        params = []
+        if wells is not None:
+            query += " AND jh = ANY(%s)"
+            params.append(wells)
+        query += " ORDER BY jh, rq DESC"
+        return {row['jh']: dict(row) for row in iter_query(query, params, readonly=False)}
+
+    def rows(self) -> dict[str, dict]:
+        """返回快照（按井号排序）；过期时全量重载，有被标记的井时只重查这些井"""
+        with self._lock:
+            if self._rows is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._dirty.clear()
+                self._rows = self._query()
+                self._loaded_at = time.monotonic()
+                self.full_loads += 1
+                logger.info(f"📌 {self.table} 最新状态快照已加载: {len(self._rows)} 口井")
+            elif self._dirty:
+                wells = self._dirty
+                self._dirty = set()
+                # 被标记的井整体替换（查不到时说明该井日报已全部删除，从快照中去掉）
+                rows = {jh: row for jh, row in self._rows.items() if jh not in wells}
+                rows.update(self._query(sorted(wells)))
+                self._rows = dict(sorted(rows.items()))
+                self.partial_loads += 1
+            return self._rows
+
+    def note_write(self, jh: str, rq):
+        """写入某井日报后调用；日期不早于快照中该井的最新日期时标记该井"""
+        with self._lock:
+            if self._rows is None:
+                return
+            cached = self._rows.get(jh)
+            written = _parse_date(rq)
+            if cached is None or written is None or written >= cached['rq']:
+                self._dirty.add(jh)
+
+    def status(self) -> dict:
+        return {
+            "loaded": self._rows is not None,
+            "wells": len(self._rows) if self._rows is not None else 0,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._rows is not None else None,
+            "pending_wells": len(self._dirty),
+            "full_loads": self.full_loads,
+            "partial_loads": self.partial_loads,
+        }
+
+
+_snapshots: dict[str, LatestRowSnapshot] = {}
+
+
+def register_latest_snapshot(table: str, columns: str):
+    """登记需要最新状态快照的日报表（columns 须包含 jh 和 rq）"""
+    _snapshots[table] = LatestRowSnapshot(table, columns, LATEST_SNAPSHOT_CONFIG['ttl'])
+
+
+def get_latest_rows(table: str) -> dict[str, dict]:
+    return _snapshots[table].rows()
+
+
+def note_daily_write(table: str, jh: str, rq):
+    """日报写入成功后调用；表未登记快照时为空操作"""
+    snapshot = _snapshots.get(table)
+    if snapshot:
+        snapshot.note_write(jh, rq)
+
+
+def get_latest_snapshot_status() -> dict:
+    return {table: snapshot.status() for table, snapshot in _snapshots.items()}
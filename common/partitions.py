@@ -0,0 +1,90 @@
+"""
+日报表月分区维护
+drilling_daily / key_well_daily 按 rq 月度范围分区（database/migrations/008_partition_daily_tables.sql），
+分区由数据库函数 ensure_monthly_partitions() 创建；本模块在服务启动时预建未来月份的分区，
+并在写入前确认目标月份的分区存在（已确认的月份缓存在进程内，不重复访问数据库）
+"""
+import os
+import logging
+import threading
+from datetime import date
+
+from common.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# 分区配置 - 从环境变量读取
+PARTITION_CONFIG = {
+    'months_ahead': int(os.getenv('DAILY_PARTITION_MONTHS_AHEAD', '3')),   # 启动时预建的未来月份数
+}
+
+# 按 rq 月度分区的表
+PARTITIONED_TABLES = ("drilling_daily", "key_well_daily")
+
+_ensured: set[tuple[str, date]] = set()
+_lock = threading.Lock()
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_partitions(table: str, start: date, end: date | None = None) -> int:
+    """
+    确保 table 覆盖 [start 所在月, end 所在月] 的分区存在，返回新建的分区数
+
+    表尚未分区（未执行迁移 008）时返回 0 且不缓存这些月份，迁移在服务运行期间执行后，
+    下一次写入会重新检查并补建分区。
+    """
+    first = start.replace(day=1)
+    last = (end or start).replace(day=1)
+    months = []
+    month = first
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+
+    with _lock:
+        missing = [m for m in months if (table, m) not in _ensured]
+    if not missing:
+        return 0
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT relkind = 'p' AS partitioned FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+        row = cursor.fetchone()
+        if not row or not row["partitioned"]:
+            conn.rollback()
+            return 0
+        cursor.execute(
+            "SELECT ensure_monthly_partitions(%s, %s, %s) AS created",
+            (table, missing[0], missing[-1]),
+        )
+        created = cursor.fetchone()["created"]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    # 只缓存分区表上已确认的月份
+    with _lock:
+        _ensured.update((table, m) for m in months)
+    if created:
+        logger.info(f"🗓️  {table} 新建月分区 {created} 个（{first:%Y-%m} ~ {last:%Y-%m}）")
+    return created
+
+
+def ensure_future_partitions():
+    """为所有分区表预建当月及之后 months_ahead 个月的分区（服务启动时调用）"""
+    today = date.today()
+    end = _add_months(today.replace(day=1), PARTITION_CONFIG['months_ahead'])
+    for table in PARTITIONED_TABLES:
+        try:
+            ensure_partitions(table, today, end)
+        except Exception as e:
+            logger.warning(f"⚠️  {table} 预建分区失败: {e}")
@@ -0,0 +1,100 @@
+"""
+拼写纠错模块
+基于 SymSpell 删除字典的近似匹配，用于井名输入错误时给出"您是否要找"建议
+"""
+import heapq
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    受限 Damerau-Levenshtein 距离（相邻字符交换计为 1 次编辑）
+
+    超过 max_distance 时提前返回 max_distance + 1。
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SymSpellIndex:
+    """
+    SymSpell 删除字典
+
+    建索引时为每个词生成删除至多 max_distance 个字符后的所有变体（只取前 prefix_length 个字符），
+    查询时对输入做同样的删除，在字典中求交即得到候选词，再用编辑距离校验。
+    查询代价只与输入长度有关，与词典规模无关。
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: list[str] = []
+        # 删除变体 -> 词序号（只有一个词时存 int，多个时存 list，减少内存）
+        self._deletes: dict[str, int | list[int]] = {}
+
+    def _variant_levels(self, word: str) -> list[set[str]]:
+        """按删除字符数分层的变体：第 d 层为删除 d 个字符后的结果"""
+        frontier = {word[:self.prefix_length]}
+        levels = [frontier]
+        for _ in range(self.max_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            levels.append(frontier)
+        return levels
+
+    def add(self, word: str):
+        if not word:
+            return
+        index = len(self.words)
+        self.words.append(word)
+        for variant in set().union(*self._variant_levels(word)):
+            existing = self._deletes.get(variant)
+            if existing is None:
+                self._deletes[variant] = index
+            elif isinstance(existing, list):
+                existing.append(index)
+            else:
+                self._deletes[variant] = [existing, index]
+
+    def lookup(self, text: str, limit: int = 5) -> list[tuple[str, int]]:
+        """返回至多 limit 个 (词, 编辑距离)，按距离、长度差排序"""
+        if not text:
+            return []
+        # 输入删除 d 个字符后命中的词，与输入的编辑距离至少为 d；
+        # 因此逐层处理，已有 limit 个距离不超过当前层数的结果时即可停止
+        checked: set[int] = set()
+        matches = []
+        for level, variants in enumerate(self._variant_levels(text)):
+            if len(matches) >= limit and heapq.nsmallest(limit, matches)[-1][0] < level:
+                break
+            for variant in variants:
+                found = self._deletes.get(variant)
+                if found is None:
+                    continue
+                for index in (found if isinstance(found, list) else (found,)):
+                    if index in checked:
+                        continue
+                    checked.add(index)
+                    word = self.words[index]
+                    distance = edit_distance(text, word, self.max_distance)
+                    if distance <= self.max_distance:
+                        matches.append((distance, abs(len(word) - len(text)), word))
+        return [(word, distance) for distance, _, word in heapq.nsmallest(limit, matches)]
@@ -0,0 +1,141 @@
+"""
+统计物化视图刷新模块
+get_statistics 读取按区块/项目/井型分组的物化视图（database/migrations/007_well_stats_matviews.sql），
+本模块在后台线程中定时执行 refresh_well_stats_views()，油井数据写入后提前触发刷新
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+from common.db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# 刷新配置 - 从环境变量读取
+STATS_VIEW_CONFIG = {
+    'enabled': os.getenv('WELL_STATS_REFRESH_ENABLED', 'true').lower() == 'true',
+    'refresh_interval': float(os.getenv('WELL_STATS_REFRESH_INTERVAL', '600')),
+    # 写入触发的刷新至少间隔这么多秒，连续写入只合并为一次刷新
+    'min_interval': float(os.getenv('WELL_STATS_REFRESH_MIN_INTERVAL', '30')),
+}
+
+# get_statistics 的 group_by -> 物化视图
+STATS_VIEWS = {
+    "block": "mv_well_stats_block",
+    "project": "mv_well_stats_project",
+    "well_type": "mv_well_stats_well_type",
+}
+
+
+class StatsViewRefresher:
+    """
+    物化视图刷新线程
+
+    每隔 refresh_interval 秒刷新一次；request_refresh() 唤醒线程提前刷新，
+    但距上次刷新不足 min_interval 秒时先等待，避免批量写入时反复刷新。
+    刷新使用 REFRESH MATERIALIZED VIEW CONCURRENTLY，不阻塞 get_statistics 的读取。
+    """
+
+    def __init__(self, refresh_interval: float = 600, min_interval: float = 30):
+        self.refresh_interval = refresh_interval
+        self.min_interval = min_interval
+        self._last_refresh: float | None = None
+        self._refreshed_at: str | None = None
+        self._duration_ms: float | None = None
+        self._error: str | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh(self):
+        start = time.monotonic()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT refresh_well_stats_views()")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        self._last_refresh = time.monotonic()
+        self._duration_ms = round((self._last_refresh - start) * 1000, 1)
+        self._refreshed_at = datetime.now().isoformat(timespec="seconds")
+        self._error = None
+        logger.info(f"📊 统计物化视图已刷新，用时 {self._duration_ms:.0f}ms")
+
+    def request_refresh(self):
+        """唤醒后台线程尽快刷新（写入油井数据后调用）"""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="well-stats-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._last_refresh is not None:
+                remaining = self._last_refresh + self.min_interval - time.monotonic()
+                if remaining > 0 and self._stop.wait(remaining):
+                    break
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                self._error = str(e)
+                logger.warning(f"⚠️  统计物化视图刷新失败: {e}")
+
+    def status(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "last_refresh": self._refreshed_at,
+            "duration_ms": self._duration_ms,
+            "error": self._error,
+        }
+
+
+_refresher: StatsViewRefresher | None = None
+
+
+def start_stats_view_refresher():
+    """启动物化视图定时刷新（WELL_STATS_REFRESH_ENABLED=false 时由外部计划任务负责刷新）"""
+    global _refresher
+    if not STATS_VIEW_CONFIG['enabled']:
+        logger.info("📊 统计物化视图自动刷新未启用")
+        return
+    if _refresher is None:
+        _refresher = StatsViewRefresher(
+            refresh_interval=STATS_VIEW_CONFIG['refresh_interval'],
+            min_interval=STATS_VIEW_CONFIG['min_interval'],
+        )
+    _refresher.start()
+
+
+def stop_stats_view_refresher():
+    if _refresher is not None:
+        _refresher.stop()
+
+
+def request_stats_view_refresh():
+    """油井数据写入后通知刷新物化视图"""
+    if _refresher is not None:
+        _refresher.request_refresh()
+
+
+def get_stats_view_status() -> dict:
+    if _refresher is None:
+        return {"running": False, "enabled": STATS_VIEW_CONFIG['enabled']}
+    return _refresher.status()
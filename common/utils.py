@@ -3,9 +3,14 @@
 提供通用的数据处理和转换函数
 """
 import re
+import json
+import base64
+import hashlib
 import pandas as pd
 from datetime import date, datetime, timedelta
-from typing import Tuple
+from typing import Callable, Iterable, Tuple
+
+from common.aliases import resolve_well_alias, suggest_well_names
 
 def df_to_markdown(df: pd.DataFrame) -> str:
     """将DataFrame转换为Markdown表格"""
@@ -14,8 +19,24 @@ def df_to_markdown(df: pd.DataFrame) -> str:
     return df.to_markdown(index=False)
 
 def normalize_well_id(well_id: str) -> str:
-    """归一化井号（处理中文井号和各种别名）"""
-    return well_id.strip()
+    """归一化井号（处理中文井号和各种别名）：命中别名解析器时返回标准井名，否则返回去除空白后的原值"""
+    well_id = well_id.strip()
+    return resolve_well_alias(well_id) or well_id
+
+def well_name_suggestions(well_id: str, permitted: Callable[[list], Iterable[str]], limit: int = 5) -> str:
+    """
+    井名未命中时的"您是否要找"提示；没有相近井名时返回空串
+
+    permitted: 调用方工具的权限规则，输入候选井名列表，返回当前用户可见的井名（保证提示与工具本身的可见范围一致）
+    """
+    if not well_id or resolve_well_alias(well_id):
+        return ""
+    candidates = suggest_well_names(well_id, limit * 2)
+    visible = set(permitted(candidates)) if candidates else set()
+    names = [name for name in candidates if name in visible][:limit]
+    if not names:
+        return ""
+    return f"\n💡 您是否要找：{'、'.join(names)}"
 
 def normalize_date(time_desc: str) -> str:
     """归一化日期描述为ISO格式"""
@@ -73,3 +94,106 @@ def parse_date_range(time_desc: str) -> Tuple[str, str]:
         return str(start), str(end)
     
     return str(today), str(today)
+
+def _tsquery_lexeme(gram: str) -> str:
+    """把 n-gram 转为带引号的 tsquery 词项（转义反斜杠和单引号）"""
+    return "'" + gram.replace("\\", "\\\\").replace("'", "''") + "'"
+
+def ngram_tsquery(keywords) -> str:
+    """
+    把关键词转换为匹配 well_ngram_tsvector() 的 tsquery 文本
+
+    与数据库端的切分方式一致：转小写、按字切分为二元组，单字关键词使用单字词项。
+    同一关键词内的二元组用 <-> 要求相邻（等价于子串匹配），空白分隔的片段之间为 &，
+    多个关键词之间为 |。没有有效关键词时返回空字符串。
+    """
+    clauses = []
+    for keyword in keywords or []:
+        parts = []
+        for word in (keyword or "").lower().split():
+            if len(word) == 1:
+                parts.append(_tsquery_lexeme(word))
+            else:
+                parts.append(" <-> ".join(_tsquery_lexeme(word[i:i + 2]) for i in range(len(word) - 1)))
+        if parts:
+            clauses.append("(" + " & ".join(f"({part})" for part in parts) + ")")
+    return " | ".join(clauses)
+
+def _page_scope_hash(scope: str) -> str:
+    return hashlib.sha1(scope.encode("utf-8")).hexdigest()[:8]
+
+# created_at 为 NULL 的行在分页键中的取值：ORDER BY created_at DESC 时 NULL 排在最前，因此取最大时间。
+# 续页令牌、键集条件中的 COALESCE 和内存油井目录使用同一个值，翻过这类行时既不跳过也不重复
+NULL_CREATED_AT = datetime.max
+
+def encode_page_token(created_at, row_id: int, scope: str) -> str:
+    """
+    生成键集分页的续页令牌
+
+    Args:
+        created_at: 本页最后一行的 created_at（datetime 或 ISO 字符串；None 时使用 NULL_CREATED_AT）
+        row_id: 本页最后一行的 id
+        scope: 查询条件标识（工具名 + 参数），令牌只能用于同一查询
+    """
+    if created_at is None:
+        created_at = NULL_CREATED_AT
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps({"c": created_at, "i": row_id, "s": _page_scope_hash(scope)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_page_token(token: str, scope: str) -> Tuple[datetime, int]:
+    """
+    解析续页令牌，返回 (created_at, id)
+
+    Raises:
+        ValueError: 令牌格式错误，或不属于当前查询
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at, row_id, token_scope = datetime.fromisoformat(payload["c"]), int(payload["i"]), payload["s"]
+    except Exception:
+        raise ValueError("无效的分页令牌")
+    if token_scope != _page_scope_hash(scope):
+        raise ValueError("分页令牌与当前查询条件不匹配")
+    return created_at, row_id
+
+def lttb(points, threshold: int) -> list:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（升序，始终包含首尾两点）
+
+    把中间的点均分为 threshold - 2 个桶，每个桶保留与"上一个保留点"和"下一个桶平均点"
+    构成三角形面积最大的点，在点数大幅减少时仍保留峰谷形状。
+
+    Args:
+        points: [(x, y), ...]，按 x 升序
+        threshold: 目标点数；不小于点数或小于 3 时原样返回全部下标
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    sampled = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # 下一个桶的平均点
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = points[avg_start:avg_end]
+        avg_x = sum(p[0] for p in span) / len(span)
+        avg_y = sum(p[1] for p in span) / len(span)
+
+        # 当前桶中与上一个保留点、下一个桶平均点构成最大三角形的点
+        ax, ay = points[a]
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(best)
+        a = best
+    sampled.append(n - 1)
+    return sampled
@@ -70,12 +70,22 @@ CREATE INDEX IF NOT EXISTS idx_sjrq ON oil_wells(sjrq);
 CREATE INDEX IF NOT EXISTS idx_jx ON oil_wells(jx);
 CREATE INDEX IF NOT EXISTS idx_ktxm ON oil_wells(ktxm);
 CREATE INDEX IF NOT EXISTS idx_created_at ON oil_wells(created_at);
+CREATE INDEX IF NOT EXISTS idx_updated_at ON oil_wells(updated_at);
+-- 列表工具按 (created_at, id) 键集分页
+CREATE INDEX IF NOT EXISTS idx_oil_wells_created_id ON oil_wells(created_at DESC, id DESC) WHERE is_deleted = false;
 CREATE INDEX IF NOT EXISTS idx_is_deleted ON oil_wells(is_deleted);
 
 -- 创建复合索引
 CREATE INDEX IF NOT EXISTS idx_qk_jx ON oil_wells(qk, jx);
 CREATE INDEX IF NOT EXISTS idx_ktxm_ktzxm ON oil_wells(ktxm, ktzxm);
 
+-- 三元组(trigram) GIN 索引：支持 search_wells / get_wells_by_* 的 ILIKE '%关键词%' 子串查询
+-- 已有数据库请执行 migrations/001_oil_wells_trgm_indexes.sql（CONCURRENTLY 建索引，不锁表）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_well_name_trgm ON oil_wells USING gin (well_name gin_trgm_ops) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_qk_trgm ON oil_wells USING gin (qk gin_trgm_ops) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_ktxm_trgm ON oil_wells USING gin (ktxm gin_trgm_ops) WHERE is_deleted = false;
+
 -- 添加列注释
 COMMENT ON TABLE oil_wells IS '油井基础信息表 - 存储油井的完整勘探和设计数据';
 COMMENT ON COLUMN oil_wells.id IS '主键ID';
@@ -130,3 +140,204 @@ CREATE TRIGGER update_oil_wells_updated_at
     BEFORE UPDATE ON oil_wells 
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
+
+
+-- 按月范围分区维护（drilling_daily / key_well_daily 按 rq 分区）
+-- 为 parent 创建覆盖 [from_date 所在月, to_date 所在月] 的缺失月分区，分区名为 <表名>_pYYYYMM；
+-- parent 不是分区表（尚未执行迁移 008）时不做任何操作。返回新建的分区数。
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent regclass, from_date date, to_date date)
+RETURNS integer AS $$
+DECLARE
+    month date := date_trunc('month', from_date)::date;
+    part_name text;
+    created integer := 0;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = parent) <> 'p' THEN
+        RETURN 0;
+    END IF;
+    WHILE month <= to_date LOOP
+        part_name := format('%s_p%s', parent::text, to_char(month, 'YYYYMM'));
+        IF to_regclass(part_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                           part_name, parent, month, (month + INTERVAL '1 month')::date);
+            created := created + 1;
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- 中文 n-gram 全文检索
+-- 默认解析器不切分中文，这里把文本按字切分为单字和二元组（位置为起始字序号），
+-- 生成带权重的 tsvector：井名 A，区块/勘探项目 B，勘探子项目 C，设计目的层/钻探目的 D。
+-- 查询端由 common/utils.py 的 ngram_tsquery() 生成对应的 tsquery。
+CREATE OR REPLACE FUNCTION well_ngram_tsvector(doc text, weight "char")
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(COALESCE(string_agg(
+               '''' || replace(replace(g.gram, '\', '\\'), '''', '''''') || ''':' || g.pos, ' '
+           )::tsvector, ''::tsvector), weight)
+    FROM (
+        SELECT i AS pos, substr(lower(doc), i, n) AS gram
+        FROM generate_series(1, length(doc)) AS i, (VALUES (1), (2)) AS v(n)
+        WHERE i + n - 1 <= length(doc)
+    ) g
+    WHERE g.gram !~ '\s'
+$$;
+
+ALTER TABLE oil_wells ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    well_ngram_tsvector(well_name, 'A')
+    || well_ngram_tsvector(qk, 'B')
+    || well_ngram_tsvector(ktxm, 'B')
+    || well_ngram_tsvector(ktzxm, 'C')
+    || well_ngram_tsvector(sjmdc, 'D')
+    || well_ngram_tsvector(ztmd, 'D')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_oil_wells_search_tsv ON oil_wells USING gin (search_tsv) WHERE is_deleted = false;
+COMMENT ON COLUMN oil_wells.search_tsv IS '全文检索向量（n-gram，自动生成）';
+
+
+-- 区块统计汇总表（search_wells 无关键词时的统计摘要直接读取此表）
+-- 由 oil_wells 上的行级触发器增量维护，未删除的井按区块累计井数及设计井深的合计/计数；
+-- 区块为空的井记在 qk = '' 下，总井数 = SUM(well_count)。
+CREATE TABLE IF NOT EXISTS oil_well_block_stats (
+    qk VARCHAR(50) PRIMARY KEY,
+    well_count BIGINT NOT NULL DEFAULT 0,
+    sjjs_sum NUMERIC NOT NULL DEFAULT 0,      -- 设计井深合计（只计非空值）
+    sjjs_count BIGINT NOT NULL DEFAULT 0,     -- 设计井深非空的井数
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE oil_well_block_stats IS '油井区块统计汇总（触发器维护）';
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_apply(block text, sign integer, depth numeric)
+RETURNS void AS $$
+BEGIN
+    INSERT INTO oil_well_block_stats AS s (qk, well_count, sjjs_sum, sjjs_count)
+    VALUES (COALESCE(block, ''), sign, COALESCE(depth, 0) * sign, CASE WHEN depth IS NULL THEN 0 ELSE sign END)
+    ON CONFLICT (qk) DO UPDATE SET
+        well_count = s.well_count + EXCLUDED.well_count,
+        sjjs_sum = s.sjjs_sum + EXCLUDED.sjjs_sum,
+        sjjs_count = s.sjjs_count + EXCLUDED.sjjs_count,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_deleted IS FALSE THEN
+        PERFORM oil_well_block_stats_apply(OLD.qk, -1, OLD.sjjs);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_deleted IS FALSE THEN
+        PERFORM oil_well_block_stats_apply(NEW.qk, 1, NEW.sjjs);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM oil_well_block_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 全量重建（批量导入时禁用触发器后、或怀疑汇总不一致时执行）
+CREATE OR REPLACE FUNCTION rebuild_oil_well_block_stats()
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE oil_wells IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM oil_well_block_stats;
+    INSERT INTO oil_well_block_stats (qk, well_count, sjjs_sum, sjjs_count)
+    SELECT COALESCE(qk, ''), COUNT(*), COALESCE(SUM(sjjs), 0), COUNT(sjjs)
+    FROM oil_wells
+    WHERE is_deleted = false
+    GROUP BY COALESCE(qk, '');
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS oil_wells_block_stats_write ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_write
+    AFTER INSERT OR DELETE ON oil_wells
+    FOR EACH ROW
+    EXECUTE FUNCTION oil_well_block_stats_trigger();
+
+-- 只有区块、设计井深或删除标记变化时才需要调整汇总
+DROP TRIGGER IF EXISTS oil_wells_block_stats_update ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_update
+    AFTER UPDATE OF qk, sjjs, is_deleted ON oil_wells
+    FOR EACH ROW
+    WHEN (OLD.qk IS DISTINCT FROM NEW.qk OR OLD.sjjs IS DISTINCT FROM NEW.sjjs
+          OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+    EXECUTE FUNCTION oil_well_block_stats_trigger();
+
+DROP TRIGGER IF EXISTS oil_wells_block_stats_truncate ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_truncate
+    AFTER TRUNCATE ON oil_wells
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION oil_well_block_stats_truncate();
+
+-- 回填（已有数据时保证汇总与明细一致；空表时为空操作）
+SELECT rebuild_oil_well_block_stats();
+
+
+-- get_statistics 分组统计物化视图
+-- 每种分组一个视图，唯一索引用于 REFRESH MATERIALIZED VIEW CONCURRENTLY（刷新期间不阻塞读取）；
+-- 刷新统一通过 refresh_well_stats_views()，刷新时间记录在 well_stats_refresh_log 中，供工具输出数据时效。
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_block AS
+    SELECT qk AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND qk IS NOT NULL
+    GROUP BY qk;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_block ON mv_well_stats_block(name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_project AS
+    SELECT ktxm AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND ktxm IS NOT NULL
+    GROUP BY ktxm;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_project ON mv_well_stats_project(name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_well_type AS
+    SELECT jx AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND jx IS NOT NULL
+    GROUP BY jx;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_well_type ON mv_well_stats_well_type(name);
+
+CREATE TABLE IF NOT EXISTS well_stats_refresh_log (
+    view_name VARCHAR(63) PRIMARY KEY,
+    refreshed_at TIMESTAMPTZ NOT NULL,       -- 带时区，工具在数据库端计算距今时长
+    duration_ms INTEGER
+);
+
+COMMENT ON TABLE well_stats_refresh_log IS '统计物化视图最近一次刷新时间';
+
+CREATE OR REPLACE FUNCTION refresh_well_stats_views()
+RETURNS void AS $$
+DECLARE
+    view_name text;
+    started timestamptz;
+BEGIN
+    FOREACH view_name IN ARRAY ARRAY['mv_well_stats_block', 'mv_well_stats_project', 'mv_well_stats_well_type'] LOOP
+        started := clock_timestamp();
+        EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', view_name);
+        INSERT INTO well_stats_refresh_log (view_name, refreshed_at, duration_ms)
+        VALUES (view_name, now(), (EXTRACT(EPOCH FROM clock_timestamp() - started) * 1000)::integer)
+        ON CONFLICT (view_name) DO UPDATE SET
+            refreshed_at = EXCLUDED.refreshed_at,
+            duration_ms = EXCLUDED.duration_ms;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 初次刷新并写入刷新时间
+SELECT refresh_well_stats_views();
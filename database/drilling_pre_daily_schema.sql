@@ -39,11 +39,15 @@ CREATE INDEX IF NOT EXISTS idx_dpd_jh ON drilling_pre_daily(jh);
 CREATE INDEX IF NOT EXISTS idx_dpd_ktxm ON drilling_pre_daily(ktxm);
 CREATE INDEX IF NOT EXISTS idx_dpd_ssnd ON drilling_pre_daily(ssnd);
 CREATE INDEX IF NOT EXISTS idx_dpd_created_at ON drilling_pre_daily(created_at);
-CREATE INDEX IF NOT EXISTS idx_dpd_is_deleted ON drilling_pre_daily(is_deleted);
 
 -- 创建复合索引
 CREATE INDEX IF NOT EXISTS idx_dpd_ktxm_ssnd ON drilling_pre_daily(ktxm, ssnd);
-CREATE INDEX IF NOT EXISTS idx_dpd_jh_ssnd ON drilling_pre_daily(jh, ssnd);
+
+-- 查询路径：get_drilling_pre_daily 按 ssnd DESC, ktxm 排序，部分覆盖索引 INCLUDE 输出的时间节点列
+CREATE INDEX IF NOT EXISTS idx_dpd_live_jh_ssnd ON drilling_pre_daily(jh, ssnd DESC, ktxm)
+    INCLUDE (jwzysj, zjgcsjspsj, hpxdsj, bjkssj, bjjssj) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_dpd_live_ssnd ON drilling_pre_daily(ssnd DESC, ktxm)
+    INCLUDE (jh, jwzysj, zjgcsjspsj, hpxdsj, bjkssj, bjjssj) WHERE is_deleted = false;
 
 -- 添加注释
 COMMENT ON TABLE drilling_pre_daily IS '钻前工程日报数据表';
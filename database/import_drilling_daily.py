@@ -187,6 +187,50 @@ def prepare_insert_data(df):
     return data, db_columns
 
 
+def ensure_partitions(cursor, data):
+    """按导入数据的日期范围补建 drilling_daily 月分区（表未分区时为空操作）"""
+    dates = [pd.Timestamp(record['rq']).date() for record in data if record.get('rq') is not None]
+    if not dates:
+        return
+    cursor.execute("SAVEPOINT ensure_partitions")
+    try:
+        cursor.execute("SELECT ensure_monthly_partitions('drilling_daily', %s, %s)", (min(dates), max(dates)))
+    except psycopg2.errors.UndefinedFunction:
+        # 未执行迁移 008（表未分区）时跳过
+        cursor.execute("ROLLBACK TO SAVEPOINT ensure_partitions")
+        print("  ⚠️  未找到 ensure_monthly_partitions()，跳过月分区检查")
+        return
+    created = cursor.fetchone()[0]
+    cursor.execute("RELEASE SAVEPOINT ensure_partitions")
+    if created:
+        print(f"✓ 新建月分区 {created} 个")
+
+
+def refresh_monthly_rollup(cursor, records):
+    """
+    重算一批导入数据涉及的 (井号, 月份) 的月度汇总 drilling_daily_monthly
+
+    在提交该批数据之前调用，与插入处于同一事务；失败时回滚到保存点（已插入的日报保留）并返回 False。
+    """
+    keys = {(record['jh'], pd.Timestamp(record['rq']).date().replace(day=1))
+            for record in records if record.get('jh') and record.get('rq') is not None}
+    if not keys:
+        return True
+    jhs, months = zip(*sorted(keys))
+    cursor.execute("SAVEPOINT monthly_rollup")
+    try:
+        cursor.execute(
+            "SELECT refresh_drilling_daily_monthly(k.jh, k.month) FROM unnest(%s::text[], %s::date[]) AS k(jh, month)",
+            (list(jhs), list(months)),
+        )
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT monthly_rollup")
+        print(f"  ❌ 月度汇总更新失败: {e}")
+        return False
+    cursor.execute("RELEASE SAVEPOINT monthly_rollup")
+    return True
+
+
 def insert_data_to_db(data, columns, db_config):
     """将数据插入数据库"""
     print("\n💾 插入数据到数据库...")
@@ -196,6 +240,10 @@ def insert_data_to_db(data, columns, db_config):
         cursor = conn.cursor()
         print(f"✓ 数据库连接成功")
         
+        # 按日期范围补建分区
+        ensure_partitions(cursor, data)
+        conn.commit()
+        
         # 构建插入SQL
         insert_query = sql.SQL("""
             INSERT INTO drilling_daily ({})
@@ -208,15 +256,22 @@ def insert_data_to_db(data, columns, db_config):
         # 批量插入
         inserted_count = 0
         error_count = 0
+        # 当前批次已插入的记录：提交前在同一事务中重算其月度汇总；汇总更新失败一次后不再尝试
+        batch = []
+        rollup_ok = True
         
         for record in data:
             try:
                 values = [record.get(col) for col in columns]
                 cursor.execute(insert_query, values)
                 inserted_count += 1
+                batch.append(record)
                 
                 # 每1000条提交一次
                 if inserted_count % 1000 == 0:
+                    if rollup_ok:
+                        rollup_ok = refresh_monthly_rollup(cursor, batch)
+                    batch = []
                     conn.commit()
                     print(f"  进度: {inserted_count}/{len(data)}")
                     
@@ -225,11 +280,17 @@ def insert_data_to_db(data, columns, db_config):
                 if error_count <= 5:  # 只打印前5个错误
                     print(f"  ⚠️  插入错误: {e} - 井号: {record.get('jh', 'N/A')}")
         
+        if rollup_ok:
+            rollup_ok = refresh_monthly_rollup(cursor, batch)
         conn.commit()
         
         print(f"✓ 成功插入 {inserted_count} 条数据")
         if error_count > 0:
             print(f"  ⚠️  失败 {error_count} 条数据")
+        if rollup_ok:
+            print("✓ 月度汇总 drilling_daily_monthly 已同步更新")
+        else:
+            print("  ❌ 月度汇总未完整更新（未执行迁移 010？），请执行 SELECT rebuild_drilling_daily_monthly(); 重建")
         
         cursor.close()
         conn.close()
@@ -172,6 +172,25 @@ def prepare_insert_data(df):
     return data, db_columns
 
 
+def ensure_partitions(cursor, data):
+    """按导入数据的日期范围补建 key_well_daily 月分区（表未分区时为空操作）"""
+    dates = [pd.Timestamp(record['rq']).date() for record in data if record.get('rq') is not None]
+    if not dates:
+        return
+    cursor.execute("SAVEPOINT ensure_partitions")
+    try:
+        cursor.execute("SELECT ensure_monthly_partitions('key_well_daily', %s, %s)", (min(dates), max(dates)))
+    except psycopg2.errors.UndefinedFunction:
+        # 未执行迁移 008（表未分区）时跳过
+        cursor.execute("ROLLBACK TO SAVEPOINT ensure_partitions")
+        print("  ⚠️  未找到 ensure_monthly_partitions()，跳过月分区检查")
+        return
+    created = cursor.fetchone()[0]
+    cursor.execute("RELEASE SAVEPOINT ensure_partitions")
+    if created:
+        print(f"✓ 新建月分区 {created} 个")
+
+
 def insert_data_to_db(data, columns, db_config):
     """将数据插入数据库"""
     print("\n💾 插入数据到数据库...")
@@ -181,6 +200,10 @@ def insert_data_to_db(data, columns, db_config):
         cursor = conn.cursor()
         print(f"✓ 数据库连接成功")
         
+        # 按日期范围补建分区
+        ensure_partitions(cursor, data)
+        conn.commit()
+        
         # 构建插入SQL
         insert_query = sql.SQL("""
             INSERT INTO key_well_daily ({})
@@ -187,6 +187,16 @@ class WellDataImporter:
             logger.error(f"数据插入失败: {e}")
             raise
     
+    def refresh_stats_views(self):
+        """刷新 get_statistics 使用的统计物化视图（未执行迁移 007 时跳过）"""
+        try:
+            self.cursor.execute("SELECT refresh_well_stats_views()")
+            self.conn.commit()
+            logger.info("统计物化视图已刷新")
+        except psycopg2.errors.UndefinedFunction:
+            self.conn.rollback()
+            logger.warning("未找到 refresh_well_stats_views()，跳过统计物化视图刷新")
+    
     def import_from_excel(self, excel_path, sheet_name=0):
         """
         从Excel导入数据的完整流程
@@ -207,6 +217,9 @@ class WellDataImporter:
             # 插入数据
             self.insert_data(df)
             
+            # 刷新统计物化视图
+            self.refresh_stats_views()
+            
             logger.info("数据导入完成！")
             
         except Exception as e:
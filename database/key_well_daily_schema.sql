@@ -2,8 +2,8 @@
 -- 基于key_well_daily.xlsx数据结构设计
 
 CREATE TABLE IF NOT EXISTS key_well_daily (
-    -- 主键
-    id SERIAL PRIMARY KEY,
+    -- 主键（分区表的主键须包含分区键，见表尾 PRIMARY KEY (id, rq)）
+    id SERIAL,
     
     -- 井基本信息（井号关联oil_wells表）
     jh VARCHAR(50) NOT NULL,  -- 井号
@@ -49,21 +49,31 @@ CREATE TABLE IF NOT EXISTS key_well_daily (
     -- 审计字段
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    is_deleted BOOLEAN DEFAULT FALSE
-);
+    is_deleted BOOLEAN DEFAULT FALSE,
+    
+    PRIMARY KEY (id, rq)
+) PARTITION BY RANGE (rq);
+
+-- 按月分区（key_well_daily_pYYYYMM）：查询都带 rq 范围并按 rq DESC 排序，分区裁剪后只扫描涉及的月份。
+-- 这里预建当月及之后 3 个月的分区；MCP Server 启动时继续向后预建，写入和导入前按日期补建缺失的分区。
+-- ensure_monthly_partitions() 定义在 database_schema.sql 中。
+SELECT ensure_monthly_partitions('key_well_daily', CURRENT_DATE, (CURRENT_DATE + INTERVAL '3 months')::date);
 
--- 创建索引优化查询性能
-CREATE INDEX IF NOT EXISTS idx_kwd_jh ON key_well_daily(jh);
-CREATE INDEX IF NOT EXISTS idx_kwd_rq ON key_well_daily(rq);
-CREATE INDEX IF NOT EXISTS idx_kwd_qk ON key_well_daily(qk);
+-- 创建索引优化查询性能（分区表上的索引自动在每个分区上创建）
 CREATE INDEX IF NOT EXISTS idx_kwd_zt ON key_well_daily(zt);
 CREATE INDEX IF NOT EXISTS idx_kwd_created_at ON key_well_daily(created_at);
-CREATE INDEX IF NOT EXISTS idx_kwd_is_deleted ON key_well_daily(is_deleted);
 
--- 创建复合索引
+-- 写入路径（save_key_well_daily 按 jh + rq 定位已有行，不带 is_deleted 条件）
 CREATE INDEX IF NOT EXISTS idx_kwd_jh_rq ON key_well_daily(jh, rq);
 CREATE INDEX IF NOT EXISTS idx_kwd_qk_rq ON key_well_daily(qk, rq);
 
+-- 查询路径：部分覆盖索引，只索引未删除的行，INCLUDE get_key_well_daily 输出的列，
+-- 单井查询和按日期/区块查询都走仅索引扫描（区块 ILIKE 条件在索引元组上过滤）
+CREATE INDEX IF NOT EXISTS idx_kwd_live_jh_rq ON key_well_daily(jh, rq DESC)
+    INCLUDE (qk, cw, zt, rcql, hs, yz, yysx, yyxx, tysx, tyxx, hysx, hyxx) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_kwd_live_rq ON key_well_daily(rq DESC)
+    INCLUDE (jh, qk, cw, zt, rcql, hs, yz, yysx, yyxx, tysx, tyxx, hysx, hyxx) WHERE is_deleted = false;
+
 -- 添加列注释
 COMMENT ON TABLE key_well_daily IS '重点井试采日报数据表 - 存储重点井每日生产数据';
 COMMENT ON COLUMN key_well_daily.id IS '主键ID';
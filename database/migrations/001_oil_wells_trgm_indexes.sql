@@ -0,0 +1,26 @@
+-- 迁移 001：为 oil_wells 的井名/区块/勘探项目添加三元组(trigram) GIN 索引
+--
+-- search_wells 对每个关键词执行 well_name/qk/ktxm ILIKE '%关键词%'，
+-- 原有 btree 索引（idx_well_name/idx_qk/idx_ktxm）无法用于前后都带通配符的模式，只能全表扫描。
+-- pg_trgm 的 GIN 索引可以直接服务这类子串查询。
+--
+-- 执行方式（CREATE INDEX CONCURRENTLY 不能在事务块中执行，不要加 -1 / --single-transaction）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/001_oil_wells_trgm_indexes.sql
+--
+-- 注意：
+--   1. 中文按字符切分三元组依赖数据库的 LC_CTYPE 把汉字识别为字母（如 zh_CN.UTF-8 / en_US.UTF-8）；
+--      LC_CTYPE=C 时汉字会被忽略，索引对中文关键词无效。可用 SELECT show_trgm('高平1井'); 检查。
+--   2. 少于 3 个字符的关键词无法提取三元组，此时规划器会回退到顺序扫描。
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_well_name_trgm
+    ON oil_wells USING gin (well_name gin_trgm_ops) WHERE is_deleted = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_qk_trgm
+    ON oil_wells USING gin (qk gin_trgm_ops) WHERE is_deleted = false;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ktxm_trgm
+    ON oil_wells USING gin (ktxm gin_trgm_ops) WHERE is_deleted = false;
+
+ANALYZE oil_wells;
@@ -0,0 +1,9 @@
+-- 迁移 002：为 oil_wells.updated_at 添加索引
+--
+-- MCP Server 的内存油井目录（common/catalog.py）每隔 WELL_CATALOG_REFRESH_INTERVAL 秒
+-- 查询 updated_at > 水位 的行做增量刷新，没有索引时每次刷新都是全表扫描。
+--
+-- 执行方式（不要在事务块中执行）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/002_oil_wells_updated_at_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_updated_at ON oil_wells(updated_at);
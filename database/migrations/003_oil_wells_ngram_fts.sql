@@ -0,0 +1,41 @@
+-- 迁移 003：油井中文 n-gram 全文检索（search_wells 的 ranked 模式）
+--
+-- 添加 well_ngram_tsvector() 函数、生成列 oil_wells.search_tsv 及其 GIN 索引。
+-- 注意：添加 STORED 生成列会重写整张表并持有 ACCESS EXCLUSIVE 锁，请在低峰期执行。
+--
+-- 执行方式（CREATE INDEX CONCURRENTLY 不能在事务块中执行）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/003_oil_wells_ngram_fts.sql
+
+-- 中文 n-gram 全文检索
+-- 默认解析器不切分中文，这里把文本按字切分为单字和二元组（位置为起始字序号），
+-- 生成带权重的 tsvector：井名 A，区块/勘探项目 B，勘探子项目 C，设计目的层/钻探目的 D。
+-- 查询端由 common/utils.py 的 ngram_tsquery() 生成对应的 tsquery。
+CREATE OR REPLACE FUNCTION well_ngram_tsvector(doc text, weight "char")
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(COALESCE(string_agg(
+               '''' || replace(replace(g.gram, '\', '\\'), '''', '''''') || ''':' || g.pos, ' '
+           )::tsvector, ''::tsvector), weight)
+    FROM (
+        SELECT i AS pos, substr(lower(doc), i, n) AS gram
+        FROM generate_series(1, length(doc)) AS i, (VALUES (1), (2)) AS v(n)
+        WHERE i + n - 1 <= length(doc)
+    ) g
+    WHERE g.gram !~ '\s'
+$$;
+
+ALTER TABLE oil_wells ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    well_ngram_tsvector(well_name, 'A')
+    || well_ngram_tsvector(qk, 'B')
+    || well_ngram_tsvector(ktxm, 'B')
+    || well_ngram_tsvector(ktzxm, 'C')
+    || well_ngram_tsvector(sjmdc, 'D')
+    || well_ngram_tsvector(ztmd, 'D')
+) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_oil_wells_search_tsv
+    ON oil_wells USING gin (search_tsv) WHERE is_deleted = false;
+
+COMMENT ON COLUMN oil_wells.search_tsv IS '全文检索向量（n-gram，自动生成）';
+
+ANALYZE oil_wells;
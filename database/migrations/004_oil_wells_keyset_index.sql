@@ -0,0 +1,10 @@
+-- 迁移 004：oil_wells 键集分页索引
+--
+-- search_wells / get_wells_by_block / get_wells_by_project 按 (created_at, id) 倒序分页，
+-- 翻页条件为 (created_at, id) < (上一页最后一行)，该索引使每一页都是一次索引范围扫描。
+--
+-- 执行方式（不要在事务块中执行）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/004_oil_wells_keyset_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_oil_wells_created_id
+    ON oil_wells(created_at DESC, id DESC) WHERE is_deleted = false;
@@ -0,0 +1,92 @@
+-- 迁移 006：区块统计汇总表 oil_well_block_stats
+--
+-- search_wells 无关键词时（最常见的"列出所有井"请求）返回统计摘要，原先每次都对 oil_wells
+-- 做 COUNT(*) 和 GROUP BY qk；现在由触发器增量维护每个区块的井数和设计井深合计，
+-- 摘要只需读取 O(区块数) 行。内容与 database_schema.sql 末尾相同。
+--
+-- 迁移在一个事务中创建触发器并回填，回填期间阻塞 oil_wells 写入（读不受影响）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -1 -f database/migrations/006_oil_well_block_stats.sql
+
+-- 区块统计汇总表（search_wells 无关键词时的统计摘要直接读取此表）
+-- 由 oil_wells 上的行级触发器增量维护，未删除的井按区块累计井数及设计井深的合计/计数；
+-- 区块为空的井记在 qk = '' 下，总井数 = SUM(well_count)。
+CREATE TABLE IF NOT EXISTS oil_well_block_stats (
+    qk VARCHAR(50) PRIMARY KEY,
+    well_count BIGINT NOT NULL DEFAULT 0,
+    sjjs_sum NUMERIC NOT NULL DEFAULT 0,      -- 设计井深合计（只计非空值）
+    sjjs_count BIGINT NOT NULL DEFAULT 0,     -- 设计井深非空的井数
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE oil_well_block_stats IS '油井区块统计汇总（触发器维护）';
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_apply(block text, sign integer, depth numeric)
+RETURNS void AS $$
+BEGIN
+    INSERT INTO oil_well_block_stats AS s (qk, well_count, sjjs_sum, sjjs_count)
+    VALUES (COALESCE(block, ''), sign, COALESCE(depth, 0) * sign, CASE WHEN depth IS NULL THEN 0 ELSE sign END)
+    ON CONFLICT (qk) DO UPDATE SET
+        well_count = s.well_count + EXCLUDED.well_count,
+        sjjs_sum = s.sjjs_sum + EXCLUDED.sjjs_sum,
+        sjjs_count = s.sjjs_count + EXCLUDED.sjjs_count,
+        updated_at = CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_deleted IS FALSE THEN
+        PERFORM oil_well_block_stats_apply(OLD.qk, -1, OLD.sjjs);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_deleted IS FALSE THEN
+        PERFORM oil_well_block_stats_apply(NEW.qk, 1, NEW.sjjs);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION oil_well_block_stats_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM oil_well_block_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 全量重建（批量导入时禁用触发器后、或怀疑汇总不一致时执行）
+CREATE OR REPLACE FUNCTION rebuild_oil_well_block_stats()
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE oil_wells IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM oil_well_block_stats;
+    INSERT INTO oil_well_block_stats (qk, well_count, sjjs_sum, sjjs_count)
+    SELECT COALESCE(qk, ''), COUNT(*), COALESCE(SUM(sjjs), 0), COUNT(sjjs)
+    FROM oil_wells
+    WHERE is_deleted = false
+    GROUP BY COALESCE(qk, '');
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS oil_wells_block_stats_write ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_write
+    AFTER INSERT OR DELETE ON oil_wells
+    FOR EACH ROW
+    EXECUTE FUNCTION oil_well_block_stats_trigger();
+
+-- 只有区块、设计井深或删除标记变化时才需要调整汇总
+DROP TRIGGER IF EXISTS oil_wells_block_stats_update ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_update
+    AFTER UPDATE OF qk, sjjs, is_deleted ON oil_wells
+    FOR EACH ROW
+    WHEN (OLD.qk IS DISTINCT FROM NEW.qk OR OLD.sjjs IS DISTINCT FROM NEW.sjjs
+          OR OLD.is_deleted IS DISTINCT FROM NEW.is_deleted)
+    EXECUTE FUNCTION oil_well_block_stats_trigger();
+
+DROP TRIGGER IF EXISTS oil_wells_block_stats_truncate ON oil_wells;
+CREATE TRIGGER oil_wells_block_stats_truncate
+    AFTER TRUNCATE ON oil_wells
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION oil_well_block_stats_truncate();
+
+SELECT rebuild_oil_well_block_stats();
@@ -0,0 +1,61 @@
+-- 迁移 007：get_statistics 分组统计物化视图
+--
+-- get_statistics 原先每次调用都对 oil_wells 做一次全表 GROUP BY。现在按区块/项目/井型各建一个物化视图，
+-- 由油井基础数据 MCP Server 的后台线程定时刷新（WELL_STATS_REFRESH_INTERVAL），save_well_data
+-- 和 import_well_data.py 写入后也会触发刷新。内容与 database_schema.sql 末尾相同。
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/007_well_stats_matviews.sql
+
+-- get_statistics 分组统计物化视图
+-- 每种分组一个视图，唯一索引用于 REFRESH MATERIALIZED VIEW CONCURRENTLY（刷新期间不阻塞读取）；
+-- 刷新统一通过 refresh_well_stats_views()，刷新时间记录在 well_stats_refresh_log 中，供工具输出数据时效。
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_block AS
+    SELECT qk AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND qk IS NOT NULL
+    GROUP BY qk;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_block ON mv_well_stats_block(name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_project AS
+    SELECT ktxm AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND ktxm IS NOT NULL
+    GROUP BY ktxm;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_project ON mv_well_stats_project(name);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_well_stats_well_type AS
+    SELECT jx AS name, COUNT(*) AS well_count,
+           COALESCE(ROUND(AVG(sjjs)::numeric, 2), 0)::float8 AS avg_sjjs
+    FROM oil_wells
+    WHERE is_deleted = false AND jx IS NOT NULL
+    GROUP BY jx;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_well_stats_well_type ON mv_well_stats_well_type(name);
+
+CREATE TABLE IF NOT EXISTS well_stats_refresh_log (
+    view_name VARCHAR(63) PRIMARY KEY,
+    refreshed_at TIMESTAMP NOT NULL,
+    duration_ms INTEGER
+);
+
+COMMENT ON TABLE well_stats_refresh_log IS '统计物化视图最近一次刷新时间';
+
+CREATE OR REPLACE FUNCTION refresh_well_stats_views()
+RETURNS void AS $$
+DECLARE
+    view_name text;
+    started timestamptz;
+BEGIN
+    FOREACH view_name IN ARRAY ARRAY['mv_well_stats_block', 'mv_well_stats_project', 'mv_well_stats_well_type'] LOOP
+        started := clock_timestamp();
+        EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', view_name);
+        INSERT INTO well_stats_refresh_log (view_name, refreshed_at, duration_ms)
+        VALUES (view_name, LOCALTIMESTAMP, (EXTRACT(EPOCH FROM clock_timestamp() - started) * 1000)::integer)
+        ON CONFLICT (view_name) DO UPDATE SET
+            refreshed_at = EXCLUDED.refreshed_at,
+            duration_ms = EXCLUDED.duration_ms;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_well_stats_views();
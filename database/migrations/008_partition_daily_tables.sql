@@ -0,0 +1,272 @@
+-- 迁移 008：drilling_daily / key_well_daily 按月范围分区
+--
+-- 两张日报表每口井每天一行、只增不减，所有查询都带 rq 范围并按 rq DESC 排序。改为按 rq 月度范围分区后，
+-- 带日期条件的查询只扫描涉及的月份分区，不带日期条件的 ORDER BY rq DESC LIMIT n 从最新的分区开始读。
+--
+-- 步骤（每张表）：旧表连同主键、序列、索引改名为 *_legacy → 创建分区表（建表语句内联于本文件，
+-- 为本迁移时的表结构，后续迁移对 *_schema.sql 的修改不影响本迁移）
+-- → 按旧数据的日期范围创建月分区 → 复制数据并接续 id 序列 → 删除旧表。
+-- 要求 PostgreSQL 13 及以上（分区表上的行级 BEFORE 触发器）；旧表列顺序须与下方建表语句一致。
+--
+-- 必须加 -1 在单个事务中执行（任一步失败整体回滚），迁移期间两张表不可读写：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -1 -f database/migrations/008_partition_daily_tables.sql
+
+-- 按月范围分区维护（drilling_daily / key_well_daily 按 rq 分区）
+-- 为 parent 创建覆盖 [from_date 所在月, to_date 所在月] 的缺失月分区，分区名为 <表名>_pYYYYMM；
+-- parent 不是分区表（尚未执行迁移 008）时不做任何操作。返回新建的分区数。
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent regclass, from_date date, to_date date)
+RETURNS integer AS $$
+DECLARE
+    month date := date_trunc('month', from_date)::date;
+    part_name text;
+    created integer := 0;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = parent) <> 'p' THEN
+        RETURN 0;
+    END IF;
+    WHILE month <= to_date LOOP
+        part_name := format('%s_p%s', parent::text, to_char(month, 'YYYYMM'));
+        IF to_regclass(part_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+                           part_name, parent, month, (month + INTERVAL '1 month')::date);
+            created := created + 1;
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ---------- drilling_daily ----------
+ALTER TABLE drilling_daily RENAME TO drilling_daily_legacy;
+ALTER TABLE drilling_daily_legacy RENAME CONSTRAINT drilling_daily_pkey TO drilling_daily_legacy_pkey;
+ALTER SEQUENCE drilling_daily_id_seq RENAME TO drilling_daily_legacy_id_seq;
+DROP TRIGGER IF EXISTS update_drilling_daily_updated_at ON drilling_daily_legacy;
+DO $$
+DECLARE
+    idx text;
+BEGIN
+    -- 旧表索引改名，给分区表的同名索引让位
+    FOR idx IN SELECT indexname FROM pg_indexes WHERE tablename = 'drilling_daily_legacy' AND indexname LIKE 'idx\_%' LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', idx, idx || '_legacy');
+    END LOOP;
+END $$;
+
+CREATE TABLE IF NOT EXISTS drilling_daily (
+    -- 主键（分区表的主键须包含分区键，见表尾 PRIMARY KEY (id, rq)）
+    id SERIAL,
+    
+    -- 基本信息
+    rq DATE NOT NULL,                      -- 日期
+    jh VARCHAR(50),                        -- 井号（关联oil_wells.well_name，允许为空）
+    kzrq DATE,                             -- 开钻日期
+    
+    -- 钻井参数
+    drjs DECIMAL(10, 2),                   -- 当日井深（米）
+    zjrjc DECIMAL(10, 2),                  -- 日进尺（米）
+    
+    -- 钻头信息
+    ztlx VARCHAR(50),                      -- 钻头类型
+    ztzj DECIMAL(10, 2),                   -- 钻头直径（毫米）
+    
+    -- 钻井工艺参数
+    zy DECIMAL(10, 2),                     -- 钻压（千牛）
+    zs DECIMAL(10, 2),                     -- 钻速（米/小时）
+    bya DECIMAL(10, 2),                    -- 泵压（兆帕）
+    bpl DECIMAL(10, 2),                    -- 排量（升/秒）
+    
+    -- 钻井液参数
+    zjymd DECIMAL(10, 2),                  -- 钻井液密度（克/立方厘米）
+    zjynd DECIMAL(10, 2),                  -- 钻井液粘度（秒）
+    
+    -- 工作时间与内容
+    czjljsj DECIMAL(10, 2),                -- 纯钻进累计时间（小时）
+    brzygz TEXT,                           -- 本日主要工作
+    
+    -- 审计字段
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_deleted BOOLEAN DEFAULT FALSE,
+    
+    PRIMARY KEY (id, rq)
+) PARTITION BY RANGE (rq);
+
+-- 创建索引优化查询性能（分区表上的索引自动在每个分区上创建）
+CREATE INDEX IF NOT EXISTS idx_dd_jh ON drilling_daily(jh);
+CREATE INDEX IF NOT EXISTS idx_dd_rq ON drilling_daily(rq);
+CREATE INDEX IF NOT EXISTS idx_dd_kzrq ON drilling_daily(kzrq);
+CREATE INDEX IF NOT EXISTS idx_dd_created_at ON drilling_daily(created_at);
+CREATE INDEX IF NOT EXISTS idx_dd_is_deleted ON drilling_daily(is_deleted);
+
+-- 创建复合索引
+CREATE INDEX IF NOT EXISTS idx_dd_jh_rq ON drilling_daily(jh, rq);
+
+-- 添加列注释
+COMMENT ON TABLE drilling_daily IS '钻井工程日报数据表 - 存储钻井每日作业数据';
+COMMENT ON COLUMN drilling_daily.id IS '主键ID';
+COMMENT ON COLUMN drilling_daily.rq IS '日期';
+COMMENT ON COLUMN drilling_daily.jh IS '井号（关联oil_wells.well_name）';
+COMMENT ON COLUMN drilling_daily.kzrq IS '开钻日期';
+COMMENT ON COLUMN drilling_daily.drjs IS '当日井深（米）';
+COMMENT ON COLUMN drilling_daily.zjrjc IS '日进尺（米）';
+COMMENT ON COLUMN drilling_daily.ztlx IS '钻头类型';
+COMMENT ON COLUMN drilling_daily.ztzj IS '钻头直径（毫米）';
+COMMENT ON COLUMN drilling_daily.zy IS '钻压（千牛）';
+COMMENT ON COLUMN drilling_daily.zs IS '钻速（米/小时）';
+COMMENT ON COLUMN drilling_daily.bya IS '泵压（兆帕）';
+COMMENT ON COLUMN drilling_daily.bpl IS '排量（升/秒）';
+COMMENT ON COLUMN drilling_daily.zjymd IS '钻井液密度（克/立方厘米）';
+COMMENT ON COLUMN drilling_daily.zjynd IS '钻井液粘度（秒）';
+COMMENT ON COLUMN drilling_daily.czjljsj IS '纯钻进累计时间（小时）';
+COMMENT ON COLUMN drilling_daily.brzygz IS '本日主要工作';
+COMMENT ON COLUMN drilling_daily.created_at IS '创建时间';
+COMMENT ON COLUMN drilling_daily.updated_at IS '更新时间';
+COMMENT ON COLUMN drilling_daily.is_deleted IS '软删除标记';
+
+-- 创建更新时间触发器
+DROP TRIGGER IF EXISTS update_drilling_daily_updated_at ON drilling_daily;
+CREATE TRIGGER update_drilling_daily_updated_at 
+    BEFORE UPDATE ON drilling_daily 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+SELECT ensure_monthly_partitions(
+    'drilling_daily',
+    COALESCE((SELECT MIN(rq) FROM drilling_daily_legacy), CURRENT_DATE),
+    GREATEST((SELECT MAX(rq) FROM drilling_daily_legacy), (CURRENT_DATE + INTERVAL '3 months')::date)
+);
+
+INSERT INTO drilling_daily SELECT * FROM drilling_daily_legacy;
+SELECT setval(pg_get_serial_sequence('drilling_daily', 'id'), COALESCE((SELECT MAX(id) FROM drilling_daily), 0) + 1, false);
+
+DROP TABLE drilling_daily_legacy;
+ANALYZE drilling_daily;
+
+-- ---------- key_well_daily ----------
+ALTER TABLE key_well_daily RENAME TO key_well_daily_legacy;
+ALTER TABLE key_well_daily_legacy RENAME CONSTRAINT key_well_daily_pkey TO key_well_daily_legacy_pkey;
+ALTER SEQUENCE key_well_daily_id_seq RENAME TO key_well_daily_legacy_id_seq;
+DROP TRIGGER IF EXISTS update_key_well_daily_updated_at ON key_well_daily_legacy;
+DO $$
+DECLARE
+    idx text;
+BEGIN
+    -- 旧表索引改名，给分区表的同名索引让位
+    FOR idx IN SELECT indexname FROM pg_indexes WHERE tablename = 'key_well_daily_legacy' AND indexname LIKE 'idx\_%' LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', idx, idx || '_legacy');
+    END LOOP;
+END $$;
+
+CREATE TABLE IF NOT EXISTS key_well_daily (
+    -- 主键（分区表的主键须包含分区键，见表尾 PRIMARY KEY (id, rq)）
+    id SERIAL,
+    
+    -- 井基本信息（井号关联oil_wells表）
+    jh VARCHAR(50) NOT NULL,  -- 井号
+    qk VARCHAR(50),            -- 区块
+    cw VARCHAR(50),            -- 层位
+    cxh VARCHAR(50),           -- 层序号
+    
+    -- 深度信息
+    djsd1 DECIMAL(10, 2),      -- 顶界深度1
+    djsd2 DECIMAL(10, 2),      -- 底界深度2
+    
+    -- 日报基本信息
+    rq DATE NOT NULL,          -- 日期
+    zt VARCHAR(50),            -- 状态
+    cyfs VARCHAR(50),          -- 采油方式
+    yz VARCHAR(50),            -- 油嘴
+    
+    -- 工作信息
+    gzsj VARCHAR(100),         -- 工作时间
+    gzzd VARCHAR(50),          -- 工作制度
+    rcql DECIMAL(10, 2),       -- 日产气量（万方）
+    hs DECIMAL(10, 2),         -- 含水（%）
+    
+    -- 压力信息 - 油压
+    yysx DECIMAL(10, 4),       -- 油压上限（兆帕）
+    yyxx DECIMAL(10, 4),       -- 油压下限（兆帕）
+    
+    -- 压力信息 - 套压
+    tysx DECIMAL(10, 4),       -- 套压上限（兆帕）
+    tyxx DECIMAL(10, 4),       -- 套压下限（兆帕）
+    
+    -- 压力信息 - 回压
+    hysx DECIMAL(10, 4),       -- 回压上限（兆帕）
+    hyxx DECIMAL(10, 4),       -- 回压下限（兆帕）
+    
+    -- 其他压力信息
+    d_ly DECIMAL(10, 4),       -- 流压
+    d_jy DECIMAL(10, 4),       -- 静压
+    
+    -- 备注
+    d_bz TEXT,                 -- 施工内容/备注
+    
+    -- 审计字段
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_deleted BOOLEAN DEFAULT FALSE,
+    
+    PRIMARY KEY (id, rq)
+) PARTITION BY RANGE (rq);
+
+-- 创建索引优化查询性能（分区表上的索引自动在每个分区上创建）
+CREATE INDEX IF NOT EXISTS idx_kwd_jh ON key_well_daily(jh);
+CREATE INDEX IF NOT EXISTS idx_kwd_rq ON key_well_daily(rq);
+CREATE INDEX IF NOT EXISTS idx_kwd_qk ON key_well_daily(qk);
+CREATE INDEX IF NOT EXISTS idx_kwd_zt ON key_well_daily(zt);
+CREATE INDEX IF NOT EXISTS idx_kwd_created_at ON key_well_daily(created_at);
+CREATE INDEX IF NOT EXISTS idx_kwd_is_deleted ON key_well_daily(is_deleted);
+
+-- 创建复合索引
+CREATE INDEX IF NOT EXISTS idx_kwd_jh_rq ON key_well_daily(jh, rq);
+CREATE INDEX IF NOT EXISTS idx_kwd_qk_rq ON key_well_daily(qk, rq);
+
+-- 添加列注释
+COMMENT ON TABLE key_well_daily IS '重点井试采日报数据表 - 存储重点井每日生产数据';
+COMMENT ON COLUMN key_well_daily.id IS '主键ID';
+COMMENT ON COLUMN key_well_daily.jh IS '井号（关联oil_wells表）';
+COMMENT ON COLUMN key_well_daily.qk IS '区块';
+COMMENT ON COLUMN key_well_daily.cw IS '层位';
+COMMENT ON COLUMN key_well_daily.cxh IS '层序号';
+COMMENT ON COLUMN key_well_daily.djsd1 IS '顶界深度1';
+COMMENT ON COLUMN key_well_daily.djsd2 IS '底界深度2';
+COMMENT ON COLUMN key_well_daily.rq IS '日期';
+COMMENT ON COLUMN key_well_daily.zt IS '状态';
+COMMENT ON COLUMN key_well_daily.cyfs IS '采油方式';
+COMMENT ON COLUMN key_well_daily.yz IS '油嘴';
+COMMENT ON COLUMN key_well_daily.gzsj IS '工作时间';
+COMMENT ON COLUMN key_well_daily.gzzd IS '工作制度';
+COMMENT ON COLUMN key_well_daily.rcql IS '日产气量（万方）';
+COMMENT ON COLUMN key_well_daily.hs IS '含水（%）';
+COMMENT ON COLUMN key_well_daily.yysx IS '油压上限（兆帕）';
+COMMENT ON COLUMN key_well_daily.yyxx IS '油压下限（兆帕）';
+COMMENT ON COLUMN key_well_daily.tysx IS '套压上限（兆帕）';
+COMMENT ON COLUMN key_well_daily.tyxx IS '套压下限（兆帕）';
+COMMENT ON COLUMN key_well_daily.hysx IS '回压上限（兆帕）';
+COMMENT ON COLUMN key_well_daily.hyxx IS '回压下限（兆帕）';
+COMMENT ON COLUMN key_well_daily.d_ly IS '流压';
+COMMENT ON COLUMN key_well_daily.d_jy IS '静压';
+COMMENT ON COLUMN key_well_daily.d_bz IS '施工内容/备注';
+COMMENT ON COLUMN key_well_daily.created_at IS '创建时间';
+COMMENT ON COLUMN key_well_daily.updated_at IS '更新时间';
+COMMENT ON COLUMN key_well_daily.is_deleted IS '软删除标记';
+
+-- 创建更新时间触发器
+DROP TRIGGER IF EXISTS update_key_well_daily_updated_at ON key_well_daily;
+CREATE TRIGGER update_key_well_daily_updated_at 
+    BEFORE UPDATE ON key_well_daily 
+    FOR EACH ROW 
+    EXECUTE FUNCTION update_updated_at_column();
+
+SELECT ensure_monthly_partitions(
+    'key_well_daily',
+    COALESCE((SELECT MIN(rq) FROM key_well_daily_legacy), CURRENT_DATE),
+    GREATEST((SELECT MAX(rq) FROM key_well_daily_legacy), (CURRENT_DATE + INTERVAL '3 months')::date)
+);
+
+INSERT INTO key_well_daily SELECT * FROM key_well_daily_legacy;
+SELECT setval(pg_get_serial_sequence('key_well_daily', 'id'), COALESCE((SELECT MAX(id) FROM key_well_daily), 0) + 1, false);
+
+DROP TABLE key_well_daily_legacy;
+ANALYZE key_well_daily;
@@ -0,0 +1,53 @@
+-- 迁移 009：按日报查询形状重建索引
+--
+-- 日报工具的查询都是 is_deleted = false AND jh = %s（或日期范围）ORDER BY rq DESC LIMIT n，
+-- 原有的单列索引需要回表取列，而 is_deleted 这类低基数索引从不被查询使用、只增加写入开销。
+-- 改为只索引未删除行的部分覆盖索引，INCLUDE 工具输出的列，查询走仅索引扫描；
+-- 写入路径（按 jh + rq 定位已有行）继续使用原有的 (jh, rq) 复合索引。
+-- 执行后可用 database/verify_index_plans.py 检查各查询的执行计划。
+--
+-- drilling_daily / key_well_daily 是分区表（迁移 008），其索引不能 CONCURRENTLY 创建，建索引期间阻塞写入；
+-- 其余表使用 CONCURRENTLY。不要在事务块中执行（不要加 -1）：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -f database/migrations/009_daily_covering_indexes.sql
+
+-- ---------- drilling_daily ----------
+CREATE INDEX IF NOT EXISTS idx_dd_live_jh_rq ON drilling_daily(jh, rq DESC)
+    INCLUDE (drjs, zjrjc, ztlx, zs, bya, zjymd) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_dd_live_rq ON drilling_daily(rq DESC)
+    INCLUDE (jh, drjs, zjrjc, ztlx, zs, bya, zjymd) WHERE is_deleted = false;
+DROP INDEX IF EXISTS idx_dd_jh;
+DROP INDEX IF EXISTS idx_dd_rq;
+DROP INDEX IF EXISTS idx_dd_is_deleted;
+
+-- ---------- key_well_daily ----------
+CREATE INDEX IF NOT EXISTS idx_kwd_live_jh_rq ON key_well_daily(jh, rq DESC)
+    INCLUDE (qk, cw, zt, rcql, hs, yz, yysx, yyxx, tysx, tyxx, hysx, hyxx) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_kwd_live_rq ON key_well_daily(rq DESC)
+    INCLUDE (jh, qk, cw, zt, rcql, hs, yz, yysx, yyxx, tysx, tyxx, hysx, hyxx) WHERE is_deleted = false;
+DROP INDEX IF EXISTS idx_kwd_jh;
+DROP INDEX IF EXISTS idx_kwd_rq;
+DROP INDEX IF EXISTS idx_kwd_qk;
+DROP INDEX IF EXISTS idx_kwd_is_deleted;
+
+-- ---------- drilling_pre_daily ----------
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dpd_live_jh_ssnd ON drilling_pre_daily(jh, ssnd DESC, ktxm)
+    INCLUDE (jwzysj, zjgcsjspsj, hpxdsj, bjkssj, bjjssj) WHERE is_deleted = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dpd_live_ssnd ON drilling_pre_daily(ssnd DESC, ktxm)
+    INCLUDE (jh, jwzysj, zjgcsjspsj, hpxdsj, bjkssj, bjjssj) WHERE is_deleted = false;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dpd_jh_ssnd;
+DROP INDEX CONCURRENTLY IF EXISTS idx_dpd_is_deleted;
+
+-- ---------- 其他表：去掉低基数的 is_deleted 索引，以及被 (jh, 日期) 复合索引前缀覆盖的单列 jh 索引 ----------
+DROP INDEX CONCURRENTLY IF EXISTS idx_pr_jh;
+DROP INDEX CONCURRENTLY IF EXISTS idx_pr_is_deleted;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wr_jh;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wr_is_deleted;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wa_jh;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wa_is_deleted;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wd_is_deleted;
+DROP INDEX CONCURRENTLY IF EXISTS idx_wss_is_deleted;
+
+-- 仅索引扫描依赖可见性映射，建完索引后 VACUUM 一次（之后由 autovacuum 维护）
+VACUUM (ANALYZE) drilling_daily;
+VACUUM (ANALYZE) key_well_daily;
+VACUUM (ANALYZE) drilling_pre_daily;
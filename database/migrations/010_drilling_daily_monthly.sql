@@ -0,0 +1,89 @@
+-- 迁移 010：钻井日报月度汇总表 drilling_daily_monthly
+--
+-- "每月进尺、平均钻速、月末井深"类问题原先每次都对 drilling_daily 原始行聚合。现在按 (井号, 月份)
+-- 维护汇总行：save_drilling_daily 在写入日报的事务中、import_drilling_daily.py 在提交每批数据前重算受影响的月份，
+-- get_drilling_monthly 直接读取月度行（年度汇总对月度行再聚合）。内容与 drilling_daily_schema.sql 相同，
+-- 末尾回填已有数据：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -1 -f database/migrations/010_drilling_daily_monthly.sql
+
+-- 钻井日报月度汇总（get_drilling_monthly 读取此表，不再对 drilling_daily 原始行做聚合）
+-- 每口井每月一行；save_drilling_daily 在写入日报的事务中、import_drilling_daily.py 在提交每批数据前
+-- 调用 refresh_drilling_daily_monthly() 重算受影响的 (jh, 月份)，只读取该井当月的日报（最多 31 行）。
+-- 重算失败时两者都保留日报并报告（服务端记录警告，导入脚本提示重建），可执行 rebuild_drilling_daily_monthly() 修复。
+-- 日平均钻速等派生值由合计和计数求得，年度汇总直接对月度行再聚合。
+CREATE TABLE IF NOT EXISTS drilling_daily_monthly (
+    jh VARCHAR(50) NOT NULL,                 -- 井号
+    month DATE NOT NULL,                     -- 月份（当月 1 日）
+    report_count INTEGER NOT NULL DEFAULT 0, -- 日报条数
+    zjrjc_sum NUMERIC,                       -- 进尺合计（米）
+    zs_sum NUMERIC,                          -- 钻速合计（米/小时，平均钻速 = zs_sum / zs_count）
+    zs_count INTEGER NOT NULL DEFAULT 0,     -- 钻速非空的日报条数
+    drjs_max NUMERIC,                        -- 当月最大井深（米）
+    czjljsj_max NUMERIC,                     -- 月末纯钻进累计时间（小时，czjljsj 为累计值，取当月最大）
+    first_rq DATE,                           -- 当月首条日报日期
+    last_rq DATE,                            -- 当月末条日报日期
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (jh, month)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ddm_month ON drilling_daily_monthly(month DESC);
+
+COMMENT ON TABLE drilling_daily_monthly IS '钻井日报按井按月汇总（写入路径增量维护）';
+
+-- 重算一口井一个月的汇总；该月已无未删除的日报时删除汇总行
+CREATE OR REPLACE FUNCTION refresh_drilling_daily_monthly(p_jh text, p_rq date)
+RETURNS void AS $$
+DECLARE
+    p_month date := date_trunc('month', p_rq)::date;
+BEGIN
+    IF p_jh IS NULL OR p_rq IS NULL THEN
+        RETURN;
+    END IF;
+    -- 同一 (jh, 月份) 的重算串行执行，后执行的一方能看到先提交的日报，避免并发写入时汇总丢行
+    PERFORM pg_advisory_xact_lock(hashtext('drilling_daily_monthly'), hashtext(p_jh || '|' || p_month));
+
+    INSERT INTO drilling_daily_monthly AS m
+        (jh, month, report_count, zjrjc_sum, zs_sum, zs_count, drjs_max, czjljsj_max, first_rq, last_rq)
+    SELECT jh, p_month, COUNT(*), SUM(zjrjc), SUM(zs), COUNT(zs), MAX(drjs), MAX(czjljsj), MIN(rq), MAX(rq)
+    FROM drilling_daily
+    WHERE is_deleted = false AND jh = p_jh
+      AND rq >= p_month AND rq < (p_month + INTERVAL '1 month')::date
+    GROUP BY jh
+    ON CONFLICT (jh, month) DO UPDATE SET
+        report_count = EXCLUDED.report_count,
+        zjrjc_sum = EXCLUDED.zjrjc_sum,
+        zs_sum = EXCLUDED.zs_sum,
+        zs_count = EXCLUDED.zs_count,
+        drjs_max = EXCLUDED.drjs_max,
+        czjljsj_max = EXCLUDED.czjljsj_max,
+        first_rq = EXCLUDED.first_rq,
+        last_rq = EXCLUDED.last_rq,
+        updated_at = CURRENT_TIMESTAMP;
+
+    IF NOT FOUND THEN
+        DELETE FROM drilling_daily_monthly WHERE jh = p_jh AND month = p_month;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 全量重建（直接改库、批量软删除后或怀疑汇总不一致时执行），返回汇总行数
+CREATE OR REPLACE FUNCTION rebuild_drilling_daily_monthly()
+RETURNS bigint AS $$
+DECLARE
+    n bigint;
+BEGIN
+    LOCK TABLE drilling_daily IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM drilling_daily_monthly;
+    INSERT INTO drilling_daily_monthly
+        (jh, month, report_count, zjrjc_sum, zs_sum, zs_count, drjs_max, czjljsj_max, first_rq, last_rq)
+    SELECT jh, date_trunc('month', rq)::date, COUNT(*), SUM(zjrjc), SUM(zs), COUNT(zs),
+           MAX(drjs), MAX(czjljsj), MIN(rq), MAX(rq)
+    FROM drilling_daily
+    WHERE is_deleted = false AND jh IS NOT NULL
+    GROUP BY jh, date_trunc('month', rq)::date;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_drilling_daily_monthly();
@@ -0,0 +1,26 @@
+-- 迁移 011：well_stats_refresh_log.refreshed_at 改为 timestamptz
+--
+-- 迁移 007 用 LOCALTIMESTAMP 记录刷新时间，get_statistics 在应用端与 datetime.now() 比较计算数据时效；
+-- 应用主机与数据库会话时区不同时相差数小时。改为带时区的时间，时效由数据库端 now() - refreshed_at 计算。
+-- 已有记录按执行迁移的会话时区解释。内容与 database_schema.sql 相同：
+--   psql -h $DB_HOST -U $DB_USER -d $DB_NAME -1 -f database/migrations/011_well_stats_refresh_timestamptz.sql
+
+ALTER TABLE well_stats_refresh_log ALTER COLUMN refreshed_at TYPE TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION refresh_well_stats_views()
+RETURNS void AS $$
+DECLARE
+    view_name text;
+    started timestamptz;
+BEGIN
+    FOREACH view_name IN ARRAY ARRAY['mv_well_stats_block', 'mv_well_stats_project', 'mv_well_stats_well_type'] LOOP
+        started := clock_timestamp();
+        EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', view_name);
+        INSERT INTO well_stats_refresh_log (view_name, refreshed_at, duration_ms)
+        VALUES (view_name, now(), (EXTRACT(EPOCH FROM clock_timestamp() - started) * 1000)::integer)
+        ON CONFLICT (view_name) DO UPDATE SET
+            refreshed_at = EXCLUDED.refreshed_at,
+            duration_ms = EXCLUDED.duration_ms;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
@@ -35,13 +35,12 @@ CREATE TABLE IF NOT EXISTS perforation_records (
     is_deleted BOOLEAN DEFAULT FALSE
 );
 
-CREATE INDEX IF NOT EXISTS idx_pr_jh ON perforation_records(jh);
 CREATE INDEX IF NOT EXISTS idx_pr_sksj ON perforation_records(sksj);
 CREATE INDEX IF NOT EXISTS idx_pr_cw ON perforation_records(cw);
+-- 按井号查询使用 (jh, sksj) 的前缀，无需单列 jh 索引
 CREATE INDEX IF NOT EXISTS idx_pr_jh_sksj ON perforation_records(jh, sksj);
 CREATE INDEX IF NOT EXISTS idx_pr_zccs_rq ON perforation_records(zccs_rq);
 CREATE INDEX IF NOT EXISTS idx_pr_source_file ON perforation_records(source_file);
-CREATE INDEX IF NOT EXISTS idx_pr_is_deleted ON perforation_records(is_deleted);
 
 -- 兼容已存在表：补充新增字段
 ALTER TABLE perforation_records ADD COLUMN IF NOT EXISTS zccs_rq DATE;
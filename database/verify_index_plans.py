@@ -0,0 +1,132 @@
+"""
+日报查询执行计划检查
+对日报工具的各类查询执行 EXPLAIN，确认都走部分覆盖索引的仅索引扫描（迁移 009）
+
+用法（在项目根目录执行，数据库连接读取 DB_* 环境变量）：
+    python database/verify_index_plans.py
+
+检查时关闭顺序扫描和位图扫描，只验证索引能否覆盖查询，不受测试库数据量影响；
+任一查询的扫描节点不是 Index Only Scan 时以非零状态退出。
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.db import get_db_connection, close_pool
+from oilfield_dailyreports_mcp import (
+    DRILLING_DAILY_COLUMNS, KEY_WELL_DAILY_COLUMNS, DRILLING_PRE_DAILY_COLUMNS, MULTI_WELL_QUERY,
+)
+
+
+def sample_value(cursor, table, column):
+    """取表中一个真实值作为查询参数，表为空时用占位值"""
+    cursor.execute(f"SELECT {column} AS value FROM {table} WHERE is_deleted = false AND {column} IS NOT NULL LIMIT 1")
+    row = cursor.fetchone()
+    return row["value"] if row else "__none__"
+
+
+def build_cases(cursor):
+    jh_dd = sample_value(cursor, "drilling_daily", "jh")
+    jh_kwd = sample_value(cursor, "key_well_daily", "jh")
+    jh_dpd = sample_value(cursor, "drilling_pre_daily", "jh")
+    return [
+        ("钻井日报 - 单井", "drilling_daily", f"""
+            SELECT {DRILLING_DAILY_COLUMNS} FROM drilling_daily
+            WHERE is_deleted = false AND jh = %s
+              AND rq >= COALESCE(%s::date, '-infinity'::date)
+              AND rq <= COALESCE(%s::date, 'infinity'::date)
+            ORDER BY rq DESC LIMIT 100
+        """, (jh_dd, None, None)),
+        ("钻井日报 - 日期范围", "drilling_daily", f"""
+            SELECT {DRILLING_DAILY_COLUMNS} FROM drilling_daily
+            WHERE is_deleted = false AND rq >= %s::date AND rq <= %s::date
+            ORDER BY rq DESC LIMIT 100
+        """, ("2024-01-01", "2024-03-31")),
+        ("重点井日报 - 单井", "key_well_daily", f"""
+            SELECT {KEY_WELL_DAILY_COLUMNS} FROM key_well_daily
+            WHERE is_deleted = false AND jh = %s
+              AND rq >= COALESCE(%s::date, '-infinity'::date)
+              AND rq <= COALESCE(%s::date, 'infinity'::date)
+            ORDER BY rq DESC LIMIT 100
+        """, (jh_kwd, None, None)),
+        ("重点井日报 - 区块 + 日期范围", "key_well_daily", f"""
+            SELECT {KEY_WELL_DAILY_COLUMNS} FROM key_well_daily
+            WHERE is_deleted = false AND qk ILIKE %s AND rq >= %s::date
+            ORDER BY rq DESC LIMIT 100
+        """, ("%区块%", "2024-01-01")),
+        ("钻井日报 - 各井最新", "drilling_daily", f"""
+            SELECT DISTINCT ON (jh) {DRILLING_DAILY_COLUMNS} FROM drilling_daily
+            WHERE is_deleted = false AND jh IS NOT NULL
+            ORDER BY jh, rq DESC
+        """, ()),
+        ("重点井日报 - 各井最新", "key_well_daily", f"""
+            SELECT DISTINCT ON (jh) {KEY_WELL_DAILY_COLUMNS} FROM key_well_daily
+            WHERE is_deleted = false AND jh IS NOT NULL
+            ORDER BY jh, rq DESC
+        """, ()),
+        ("钻井日报 - 多井每井最近 N 条", "drilling_daily",
+         MULTI_WELL_QUERY.format(columns=DRILLING_DAILY_COLUMNS, table="drilling_daily"),
+         ([jh_dd], None, None, 10)),
+        ("重点井日报 - 多井每井最近 N 条", "key_well_daily",
+         MULTI_WELL_QUERY.format(columns=KEY_WELL_DAILY_COLUMNS, table="key_well_daily"),
+         ([jh_kwd], None, None, 10)),
+        ("钻前日报 - 单井", "drilling_pre_daily", f"""
+            SELECT {DRILLING_PRE_DAILY_COLUMNS} FROM drilling_pre_daily
+            WHERE is_deleted = false AND jh = %s
+            ORDER BY ssnd DESC, ktxm LIMIT 50
+        """, (jh_dpd,)),
+        ("钻前日报 - 年度", "drilling_pre_daily", f"""
+            SELECT {DRILLING_PRE_DAILY_COLUMNS} FROM drilling_pre_daily
+            WHERE is_deleted = false AND ssnd = %s
+            ORDER BY ssnd DESC, ktxm LIMIT 50
+        """, (2024,)),
+    ]
+
+
+def scan_nodes(plan, table):
+    """计划树中访问 table（或其分区 table_pYYYYMM）的扫描节点"""
+    nodes = []
+    relation = plan.get("Relation Name")
+    if relation == table or (relation or "").startswith(f"{table}_p"):
+        nodes.append(plan)
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child, table))
+    return nodes
+
+
+def main():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    failed = 0
+    try:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+        for name, table, query, params in build_cases(cursor):
+            cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cursor.fetchone()["QUERY PLAN"][0]["Plan"]
+            nodes = scan_nodes(plan, table)
+            if not nodes:
+                print(f"⏭️  {name}: 没有需要扫描的分区，跳过")
+                continue
+            bad = [n for n in nodes if n["Node Type"] != "Index Only Scan"]
+            if bad:
+                failed += 1
+                detail = ", ".join(f"{n['Node Type']} on {n['Relation Name']}" for n in bad)
+                print(f"❌ {name}: {detail}")
+            else:
+                indexes = sorted({n.get("Index Name", "") for n in nodes})
+                print(f"✅ {name}: Index Only Scan（{', '.join(indexes)}）")
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        close_pool()
+
+    print()
+    print("全部通过" if not failed else f"{failed} 个查询未走仅索引扫描")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
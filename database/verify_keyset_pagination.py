@@ -0,0 +1,119 @@
+"""
+键集分页检查
+用一组包含 created_at 为 NULL、created_at 相同的样例行逐页翻页，确认内存油井目录和 SQL 键集条件
+（KEYSET_CONDITION）翻过每一页后拼出的顺序与一次性排序完全相同，既不跳过也不重复
+
+用法（在项目根目录执行，数据库连接读取 DB_* 环境变量）：
+    python database/verify_keyset_pagination.py
+
+SQL 检查只读取 VALUES 构造的样例行，不写入任何表；任一检查不通过时以非零状态退出。
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.db import get_db_connection, close_pool
+from common.catalog import WellCatalog
+from common.utils import decode_page_token
+from oilfield_wells_mcp import KEYSET_CONDITION, keyset_params, _paginate
+
+SCOPE = "verify_keyset_pagination"
+
+# (id, created_at)：NULL 行排在最前，且分布在页边界两侧
+SAMPLE_ROWS = [
+    (1, datetime(2024, 1, 1, 8, 0)),
+    (2, None),
+    (3, datetime(2024, 1, 2, 8, 0)),
+    (4, datetime(2024, 1, 2, 8, 0)),
+    (5, None),
+    (6, datetime(2023, 12, 31, 23, 59, 59, 999999)),
+    (7, None),
+    (8, datetime(2024, 1, 1, 8, 0)),
+]
+
+
+def expected_order():
+    """ORDER BY created_at DESC, id DESC（NULL 排在最前）"""
+    nulls = sorted((row for row in SAMPLE_ROWS if row[1] is None), key=lambda row: row[0], reverse=True)
+    dated = sorted((row for row in SAMPLE_ROWS if row[1] is not None), key=lambda row: (row[1], row[0]), reverse=True)
+    return [row_id for row_id, _ in nulls + dated]
+
+
+def paginate(fetch_page, limit):
+    """按工具的方式逐页读取（多取一行判断下一页，续页令牌编码/解码），返回依次读到的 id"""
+    seen = []
+    after = None
+    for _ in range(len(SAMPLE_ROWS) + 1):
+        page, token = _paginate(fetch_page(after, limit + 1), limit, SCOPE)
+        seen.extend(row['id'] for row in page)
+        if not token:
+            return seen
+        after = decode_page_token(token, SCOPE)
+    raise RuntimeError("翻页未结束")
+
+
+def catalog_pages():
+    catalog = WellCatalog()
+    for row_id, created_at in SAMPLE_ROWS:
+        catalog._state.upsert(row_id, f"W{row_id}", "区块", "直井", None, None, "项目", created_at)
+    return lambda after, limit: catalog.latest(limit, after=after)
+
+
+def sql_pages(cursor):
+    values = ", ".join("(%s::integer, %s::timestamp)" for _ in SAMPLE_ROWS)
+    sample_params = [value for row in SAMPLE_ROWS for value in row]
+
+    def fetch_page(after, limit):
+        conditions = ["true"]
+        params = list(sample_params)
+        if after is not None:
+            conditions.append(KEYSET_CONDITION)
+            params.extend(keyset_params(after))
+        params.append(limit)
+        cursor.execute(f"""
+            WITH oil_wells(id, created_at) AS (VALUES {values})
+            SELECT id, created_at FROM oil_wells
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """, params)
+        return cursor.fetchall()
+
+    return fetch_page
+
+
+def check(name, fetch_page):
+    expected = expected_order()
+    failed = 0
+    for limit in range(1, len(SAMPLE_ROWS) + 1):
+        seen = paginate(fetch_page, limit)
+        if seen != expected:
+            failed += 1
+            print(f"❌ {name}（每页 {limit} 行）: 得到 {seen}，期望 {expected}")
+    if not failed:
+        print(f"✅ {name}: 每页 1～{len(SAMPLE_ROWS)} 行翻页均无跳过、无重复")
+    return failed
+
+
+def main():
+    failed = check("内存油井目录", catalog_pages())
+
+    conn = get_db_connection(readonly=True)
+    cursor = conn.cursor()
+    try:
+        failed += check("SQL 键集条件", sql_pages(cursor))
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        close_pool()
+
+    print()
+    print("全部通过" if not failed else f"{failed} 项检查未通过")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,27 @@
+-- 井名别名表
+-- 把常用简称、旧井号、口语化写法（如 "中102"、"102井"）映射到 oil_wells.well_name 标准井名，
+-- 由 common/aliases.py 加载到内存别名解析器，所有接收井号参数的工具共用
+
+CREATE TABLE IF NOT EXISTS well_aliases (
+    id SERIAL PRIMARY KEY,
+    alias VARCHAR(100) NOT NULL,         -- 别名（原样保存，加载时做 NFKC/大小写/分隔符归一化）
+    well_name VARCHAR(100) NOT NULL,     -- 标准井名（oil_wells.well_name）
+    source VARCHAR(50),                  -- 来源（人工维护/导入脚本等）
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_deleted BOOLEAN DEFAULT FALSE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_well_aliases_alias ON well_aliases(alias) WHERE is_deleted = false;
+CREATE INDEX IF NOT EXISTS idx_well_aliases_well_name ON well_aliases(well_name);
+
+COMMENT ON TABLE well_aliases IS '井名别名表 - 别名到标准井名的映射';
+COMMENT ON COLUMN well_aliases.alias IS '别名';
+COMMENT ON COLUMN well_aliases.well_name IS '标准井名';
+COMMENT ON COLUMN well_aliases.source IS '来源';
+
+DROP TRIGGER IF EXISTS update_well_aliases_updated_at ON well_aliases;
+CREATE TRIGGER update_well_aliases_updated_at
+    BEFORE UPDATE ON well_aliases
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
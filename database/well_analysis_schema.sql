@@ -69,11 +69,10 @@ CREATE TABLE IF NOT EXISTS well_analysis (
     is_deleted BOOLEAN DEFAULT FALSE
 );
 
-CREATE INDEX IF NOT EXISTS idx_wa_jh ON well_analysis(jh);
 CREATE INDEX IF NOT EXISTS idx_wa_qyrq ON well_analysis(qyrq);
 CREATE INDEX IF NOT EXISTS idx_wa_yplx ON well_analysis(yplx);
+-- 按井号查询使用 (jh, qyrq) 的前缀，无需单列 jh 索引
 CREATE INDEX IF NOT EXISTS idx_wa_jh_qyrq ON well_analysis(jh, qyrq);
-CREATE INDEX IF NOT EXISTS idx_wa_is_deleted ON well_analysis(is_deleted);
 
 -- 兼容已存在表：补充新增字段
 ALTER TABLE well_analysis ADD COLUMN IF NOT EXISTS bgbh VARCHAR(100);
@@ -30,7 +30,6 @@ CREATE INDEX IF NOT EXISTS idx_wd_jh ON wellbore_diagrams(jh);
 CREATE INDEX IF NOT EXISTS idx_wd_file_id ON wellbore_diagrams(file_id);
 CREATE INDEX IF NOT EXISTS idx_wd_diagram_type ON wellbore_diagrams(diagram_type);
 CREATE INDEX IF NOT EXISTS idx_wd_image_ref_id ON wellbore_diagrams(image_ref_id);
-CREATE INDEX IF NOT EXISTS idx_wd_is_deleted ON wellbore_diagrams(is_deleted);
 
 -- 兼容已存在表：补充新增字段
 ALTER TABLE wellbore_diagrams ADD COLUMN IF NOT EXISTS image_ref_id VARCHAR(120);
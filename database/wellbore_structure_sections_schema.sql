@@ -40,7 +40,6 @@ CREATE INDEX IF NOT EXISTS idx_wss_jh ON wellbore_structure_sections(jh);
 CREATE INDEX IF NOT EXISTS idx_wss_casing_type ON wellbore_structure_sections(casing_type);
 CREATE INDEX IF NOT EXISTS idx_wss_run_depth_m ON wellbore_structure_sections(run_depth_m);
 CREATE INDEX IF NOT EXISTS idx_wss_source_file ON wellbore_structure_sections(source_file);
-CREATE INDEX IF NOT EXISTS idx_wss_is_deleted ON wellbore_structure_sections(is_deleted);
 
 COMMENT ON TABLE wellbore_structure_sections IS '井身结构（套管）明细表 - 结构化存储井史卡片中的套管信息';
 COMMENT ON COLUMN wellbore_structure_sections.jh IS '井号';
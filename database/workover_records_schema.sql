@@ -31,12 +31,11 @@ CREATE TABLE IF NOT EXISTS workover_records (
     is_deleted BOOLEAN DEFAULT FALSE
 );
 
-CREATE INDEX IF NOT EXISTS idx_wr_jh ON workover_records(jh);
 CREATE INDEX IF NOT EXISTS idx_wr_kssj ON workover_records(kssj);
 CREATE INDEX IF NOT EXISTS idx_wr_azlx ON workover_records(azlx);
+-- 按井号查询使用 (jh, kssj) 的前缀，无需单列 jh 索引
 CREATE INDEX IF NOT EXISTS idx_wr_jh_kssj ON workover_records(jh, kssj);
 CREATE INDEX IF NOT EXISTS idx_wr_source_file ON workover_records(source_file);
-CREATE INDEX IF NOT EXISTS idx_wr_is_deleted ON workover_records(is_deleted);
 
 -- 兼容已存在表：补充新增字段
 ALTER TABLE workover_records ADD COLUMN IF NOT EXISTS rgjd NUMERIC(10, 2);
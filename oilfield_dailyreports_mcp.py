@@ -12,6 +12,7 @@ import json
 import logging
 import pandas as pd
 from typing import Optional
+from datetime import date
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Header, Request
@@ -21,9 +22,17 @@ from pydantic import BaseModel
 import uvicorn
 
 # 导入共享模块
-from common.db import get_db_connection, test_db_connection, execute_write, DB_CONFIG
-from common.permissions import PermissionService, DEV_MODE
-from common.utils import df_to_markdown
+from common.db import (
+    get_db_connection, test_db_connection, close_pool, run_db_call, iter_query, execute_write, DB_CONFIG,
+    start_health_prober, stop_health_prober, get_health_status,
+    query_scope, cancel_on_disconnect, QueryCancelledError,
+    register_statement, fetch_prepared, get_prepared_statement_stats, get_replica_status,
+)
+from common.partitions import PARTITIONED_TABLES, ensure_partitions, ensure_future_partitions
+from common.latest_status import register_latest_snapshot, get_latest_rows, note_daily_write, get_latest_snapshot_status
+from common.permissions import PermissionService, DEV_MODE, filter_wells_by_permission
+from common.aliases import load_well_aliases
+from common.utils import df_to_markdown, normalize_well_id, well_name_suggestions, lttb
 from common.audit import AuditLog
 
 WRITE_ALLOWED_ROLES = {"ADMIN", "ENGINEER"}
@@ -75,7 +84,12 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("⚠️  数据库连接失败")
     
+    start_health_prober()
+    ensure_future_partitions()
+    load_well_aliases()
     yield
+    stop_health_prober()
+    close_pool()
     logger.info("👋 MCP Server 关闭")
 
 app = FastAPI(
@@ -103,15 +117,19 @@ async def root():
         "service": "油井日报系统 MCP Server",
         "version": "1.1.0",
         "status": "running",
-        "tools": 6
+        "tools": 8
     }
 
 @app.get("/health")
 async def health_check():
-    db_ok = test_db_connection()
+    return get_health_status()
+
+@app.get("/stats")
+async def db_stats():
     return {
-        "status": "healthy" if db_ok else "degraded",
-        "database": "connected" if db_ok else "disconnected"
+        "prepared_statements": get_prepared_statement_stats(),
+        "replicas": get_replica_status(),
+        "latest_snapshots": get_latest_snapshot_status(),
     }
 
 # ==========================================
@@ -183,7 +201,13 @@ async def handle_sse_post(request: Request):
         
         elif method == "tools/call":
             params = body_json.get("params", {})
-            result = await handle_call_tool(params.get("name"), params.get("arguments", {}))
+            # 客户端断开时取消仍在执行的后端查询
+            with query_scope() as scope:
+                result = await cancel_on_disconnect(
+                    handle_call_tool(params.get("name"), params.get("arguments", {})),
+                    request.is_disconnected,
+                    scope,
+                )
             # 将 TextContent 对象转换为可序列化的字典
             serializable_result = [
                 {"type": item.type, "text": item.text}
@@ -202,6 +226,9 @@ async def handle_sse_post(request: Request):
                 "error": {"code": -32601, "message": f"Method not found: {method}"}
             })
     
+    except QueryCancelledError as e:
+        logger.warning(f"🔌 {e}")
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"❌ SSE POST错误: {e}", exc_info=True)
         return JSONResponse(status_code=500, content={
@@ -219,7 +246,7 @@ async def handle_list_tools():
     return [
         Tool(
             name="get_drilling_daily",
-            description="查询钻井工程日报数据 - 支持按井号、日期范围查询钻井作业信息",
+            description="查询钻井工程日报数据 - 支持按井号（单井或多井对比）、日期范围查询钻井作业信息",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -227,6 +254,11 @@ async def handle_list_tools():
                         "type": "string",
                         "description": "井号"
                     },
+                    "well_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "多口井对比时的井号列表（最多 50 口），返回每口井最近 limit 条并按井分组（合计最多 500 条）；指定后忽略 well_id"
+                    },
                     "start_date": {
                         "type": "string",
                         "description": "开始日期（YYYY-MM-DD格式）"
@@ -244,6 +276,35 @@ async def handle_list_tools():
                 "required": []
             }
         ),
+        Tool(
+            name="get_drilling_monthly",
+            description="查询钻井月度/年度汇总 - 按井统计每月（或每年）的进尺合计、平均钻速、最大井深、纯钻进累计时间和日报天数，适合回答\"每月进尺多少\"、\"今年钻到多深\"等问题",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "well_id": {
+                        "type": "string",
+                        "description": "井号，不填时汇总所有井"
+                    },
+                    "year": {
+                        "type": "integer",
+                        "description": "年份，如 2024"
+                    },
+                    "period": {
+                        "type": "string",
+                        "enum": ["month", "year"],
+                        "default": "month",
+                        "description": "汇总粒度：month 按月，year 按年"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 100,
+                        "description": "返回结果数量限制"
+                    }
+                },
+                "required": []
+            }
+        ),
         Tool(
             name="get_drilling_pre_daily",
             description="查询钻前工程日报数据 - 支持按项目、年度、井号查询钻前准备工作信息",
@@ -281,6 +342,11 @@ async def handle_list_tools():
                         "type": "string",
                         "description": "井号"
                     },
+                    "well_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "多口井对比时的井号列表（最多 50 口），返回每口井最近 limit 条并按井分组（合计最多 500 条）；指定后忽略 well_id 和 block，不能与趋势模式同时使用"
+                    },
                     "start_date": {
                         "type": "string",
                         "description": "开始日期（YYYY-MM-DD格式）"
@@ -297,6 +363,41 @@ async def handle_list_tools():
                         "type": "integer",
                         "default": 100,
                         "description": "返回结果数量限制"
+                    },
+                    "bucket": {
+                        "type": "string",
+                        "enum": ["day", "week", "month"],
+                        "description": "趋势模式：按日/周/月汇总单井的日产气量、含水、油压、套压（每个时段的最小/平均/最大值），需指定井号，不能与 block 同时使用；查看长时间趋势时使用"
+                    },
+                    "max_points": {
+                        "type": "integer",
+                        "minimum": SERIES_MIN_POINTS,
+                        "description": "趋势模式下最多返回的时段数（至少 3，首尾两个时段始终保留），超过时用 LTTB 算法降采样（保留峰谷），如 30"
+                    }
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_latest_well_status",
+            description="查询所有井的最新状态 - 一次返回每口井最近一天的重点井试采日报（状态、日产气量、含水、油压、套压）和钻井日报（井深、日进尺、钻速），用于\"各井目前情况\"类问题，无需逐井查询",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "report": {
+                        "type": "string",
+                        "enum": ["all", "key_well", "drilling"],
+                        "default": "all",
+                        "description": "返回哪类日报的最新状态：all 两类都返回，key_well 重点井试采，drilling 钻井"
+                    },
+                    "block": {
+                        "type": "string",
+                        "description": "区块名称（重点井试采日报的区块字段，指定时只返回重点井试采状态）"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "default": 200,
+                        "description": "每类日报最多返回的井数"
                     }
                 },
                 "required": []
@@ -391,6 +492,18 @@ async def handle_list_tools():
         )
     ]
 
+# 各工具的查询时间预算（毫秒），未列出的工具使用 DB_STATEMENT_TIMEOUT_MS
+TOOL_TIMEOUTS_MS = {
+    "get_drilling_daily": 10000,
+    "get_drilling_monthly": 10000,
+    "get_drilling_pre_daily": 10000,
+    "get_key_well_daily": 10000,
+    "get_latest_well_status": 10000,
+    "save_drilling_daily": 10000,
+    "save_drilling_pre_daily": 10000,
+    "save_key_well_daily": 10000,
+}
+
 @mcp_server.call_tool()
 async def handle_call_tool(name: str, arguments: dict):
     """处理工具调用"""
@@ -404,60 +517,92 @@ async def handle_call_tool(name: str, arguments: dict):
     try:
         result = None
         
-        if name == "get_drilling_daily":
-            result = get_drilling_daily(
-                well_id=arguments.get('well_id', ''),
-                start_date=arguments.get('start_date', ''),
-                end_date=arguments.get('end_date', ''),
-                limit=arguments.get('limit', 100),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_drilling_pre_daily":
-            result = get_drilling_pre_daily(
-                project=arguments.get('project', ''),
-                year=arguments.get('year'),
-                well_id=arguments.get('well_id', ''),
-                limit=arguments.get('limit', 50),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_key_well_daily":
-            result = get_key_well_daily(
-                well_id=arguments.get('well_id', ''),
-                start_date=arguments.get('start_date', ''),
-                end_date=arguments.get('end_date', ''),
-                block=arguments.get('block', ''),
-                limit=arguments.get('limit', 100),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "save_drilling_daily":
-            result = save_drilling_daily(
-                data=arguments,
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "save_drilling_pre_daily":
-            result = save_drilling_pre_daily(
-                data=arguments,
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "save_key_well_daily":
-            result = save_key_well_daily(
-                data=arguments,
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        else:
-            raise ValueError(f"未知工具: {name}")
+        with query_scope(TOOL_TIMEOUTS_MS.get(name)):
+            if name == "get_drilling_daily":
+                result = await run_db_call(
+                    get_drilling_daily,
+                    well_id=arguments.get('well_id', ''),
+                    start_date=arguments.get('start_date', ''),
+                    end_date=arguments.get('end_date', ''),
+                    limit=arguments.get('limit', 100),
+                    well_ids=arguments.get('well_ids'),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_drilling_monthly":
+                result = await run_db_call(
+                    get_drilling_monthly,
+                    well_id=arguments.get('well_id', ''),
+                    year=arguments.get('year'),
+                    period=arguments.get('period', 'month'),
+                    limit=arguments.get('limit', 100),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_drilling_pre_daily":
+                result = await run_db_call(
+                    get_drilling_pre_daily,
+                    project=arguments.get('project', ''),
+                    year=arguments.get('year'),
+                    well_id=arguments.get('well_id', ''),
+                    limit=arguments.get('limit', 50),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_key_well_daily":
+                result = await run_db_call(
+                    get_key_well_daily,
+                    well_id=arguments.get('well_id', ''),
+                    start_date=arguments.get('start_date', ''),
+                    end_date=arguments.get('end_date', ''),
+                    block=arguments.get('block', ''),
+                    limit=arguments.get('limit', 100),
+                    bucket=arguments.get('bucket', ''),
+                    max_points=arguments.get('max_points', 0),
+                    well_ids=arguments.get('well_ids'),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_latest_well_status":
+                result = await run_db_call(
+                    get_latest_well_status,
+                    report=arguments.get('report', 'all'),
+                    block=arguments.get('block', ''),
+                    limit=arguments.get('limit', 200),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "save_drilling_daily":
+                result = await run_db_call(
+                    save_drilling_daily,
+                    data=arguments,
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "save_drilling_pre_daily":
+                result = await run_db_call(
+                    save_drilling_pre_daily,
+                    data=arguments,
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "save_key_well_daily":
+                result = await run_db_call(
+                    save_key_well_daily,
+                    data=arguments,
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            else:
+                raise ValueError(f"未知工具: {name}")
         
         logger.info(f"✅ 工具执行成功: {name}")
         return [TextContent(type="text", text=result)]
@@ -470,80 +615,273 @@ async def handle_call_tool(name: str, arguments: dict):
 # 业务逻辑函数
 # ==========================================
 
+# 各日报工具输出的列，与 *_schema.sql 中部分覆盖索引的 INCLUDE 列一致，
+# 查询只取这些列即可走仅索引扫描（迁移 009，验证脚本 database/verify_index_plans.py）
+DRILLING_DAILY_COLUMNS = "rq, jh, drjs, zjrjc, ztlx, zs, bya, zjymd"
+KEY_WELL_DAILY_COLUMNS = "rq, jh, qk, cw, zt, rcql, hs, yz, yysx, yyxx, tysx, tyxx, hysx, hyxx"
+DRILLING_PRE_DAILY_COLUMNS = "jh, ktxm, ssnd, jwzysj, zjgcsjspsj, hpxdsj, bjkssj, bjjssj"
+
+def _drilling_daily_record(row) -> dict:
+    return {
+        "日期": str(row['rq']) if row['rq'] else '',
+        "井号": row['jh'] or '未记录',
+        "当日井深(m)": float(row['drjs']) if row['drjs'] else '',
+        "日进尺(m)": float(row['zjrjc']) if row['zjrjc'] else '',
+        "钻头类型": row['ztlx'] or '',
+        "钻速(m/h)": float(row['zs']) if row['zs'] else '',
+        "泵压(MPa)": float(row['bya']) if row['bya'] else '',
+        "钻井液密度": float(row['zjymd']) if row['zjymd'] else ''
+    }
+
+def _key_well_daily_record(row) -> dict:
+    """重点井日报输出行 - 包括生产数据和压力参数"""
+    pressure_info = []
+    if row['yysx'] is not None or row['yyxx'] is not None:
+        pressure_info.append(f"油压: {row['yysx']}-{row['yyxx']}MPa")
+    if row['tysx'] is not None or row['tyxx'] is not None:
+        pressure_info.append(f"套压: {row['tysx']}-{row['tyxx']}MPa")
+    if row['hysx'] is not None or row['hyxx'] is not None:
+        pressure_info.append(f"回压: {row['hysx']}-{row['hyxx']}MPa")
+    
+    return {
+        "日期": str(row['rq']) if row['rq'] else '',
+        "井号": row['jh'] or '未记录',
+        "区块": row['qk'] or '',
+        "层位": row['cw'] or '',
+        "状态": row['zt'] or '',
+        "日产气量(万方)": float(row['rcql']) if row['rcql'] else '',
+        "含水(%)": float(row['hs']) if row['hs'] else '',
+        "油嘴": row['yz'] or '',
+        "压力参数": ' | '.join(pressure_info) if pressure_info else '—'
+    }
+
+# 多井对比：一次查询取每口井最近 N 条（row_number() 按井分组编号，走 (jh, rq DESC) 部分覆盖索引）
+MULTI_WELL_QUERY = """
+    SELECT {columns} FROM (
+        SELECT {columns}, row_number() OVER (PARTITION BY jh ORDER BY rq DESC) AS rn
+        FROM {table}
+        WHERE is_deleted = false AND jh = ANY(%s)
+          AND rq >= COALESCE(%s::date, '-infinity'::date)
+          AND rq <= COALESCE(%s::date, 'infinity'::date)
+    ) latest
+    WHERE rn <= %s
+    ORDER BY jh, rq DESC
+"""
+register_statement("drilling_daily_by_wells",
+                   MULTI_WELL_QUERY.format(columns=DRILLING_DAILY_COLUMNS, table="drilling_daily"))
+register_statement("key_well_daily_by_wells",
+                   MULTI_WELL_QUERY.format(columns=KEY_WELL_DAILY_COLUMNS, table="key_well_daily"))
+
+# 多井查询一次最多的井数，以及所有井合计最多输出的行数（超过时按井数压低每井条数）
+MAX_WELLS_PER_QUERY = 50
+MULTI_WELL_MAX_ROWS = 500
+
+def _accessible_wells(wells, user_role: str) -> list:
+    """日报工具的井级权限规则：逐井 check_well_access，返回有权访问的井号（保持输入顺序）"""
+    return [jh for jh in wells if PermissionService.check_well_access(user_role, jh)]
+
+def _multi_well_report(statement: str, well_ids: list, start_date: str, end_date: str, limit: int,
+                       record, title: str, user_role: str, user_id: str, user_email: str) -> str:
+    """多井日报：逐井做与单井查询相同的权限检查，一次查询每口井最近 limit 条，按输入顺序分井输出"""
+    wells = []
+    for well_id in well_ids:
+        well_id = normalize_well_id(str(well_id).strip()) if well_id else ""
+        if well_id and well_id not in wells:
+            wells.append(well_id)
+    if not wells:
+        return "❌ 井号列表（well_ids）为空。"
+    if len(wells) > MAX_WELLS_PER_QUERY:
+        return f"❌ 一次最多查询 {MAX_WELLS_PER_QUERY} 口井，当前 {len(wells)} 口，请分批查询。"
+    
+    allowed = _accessible_wells(wells, user_role)
+    denied = [jh for jh in wells if jh not in allowed]
+    wells = allowed
+    
+    # 总行数上限：每井条数压到 MULTI_WELL_MAX_ROWS / 井数 以内
+    clamped = bool(wells) and len(wells) * limit > MULTI_WELL_MAX_ROWS
+    if clamped:
+        limit = max(1, MULTI_WELL_MAX_ROWS // len(wells))
+    
+    grouped = {jh: [] for jh in wells}
+    if wells:
+        for row in fetch_prepared(statement, (wells, start_date or None, end_date or None, limit)):
+            grouped[row['jh']].append(record(row))
+    
+    if start_date or end_date:
+        title += f" ({start_date or '—'} 至 {end_date or '—'})"
+    total = sum(len(records) for records in grouped.values())
+    parts = [f"### {title}\n\n**{len(wells)} 口井，共 {total} 条记录（每井最近 {limit} 条）**"]
+    if clamped:
+        parts.append(f"⚠️ 多井查询合计最多输出 {MULTI_WELL_MAX_ROWS} 条，已将每井条数限制为 {limit}；"
+                     f"需要更多记录时请减少井数或缩小日期范围。")
+    missing = []
+    for jh, records in grouped.items():
+        if records:
+            parts.append(f"#### {jh}（{len(records)} 条）\n\n{df_to_markdown(pd.DataFrame(records))}")
+        else:
+            missing.append(jh)
+    if missing:
+        parts.append(f"❌ 未找到日报数据的井：{'、'.join(missing)}")
+    if denied:
+        parts.append(f"🚫 无权访问的井：{'、'.join(denied)}")
+    return "\n\n".join(parts)
+
+# 单井查询形状固定，注册为预编译语句；日期为空时传 NULL。
+# 日期边界显式转为 date：即使走通用计划，执行器启动时也能按参数值裁剪月分区（迁移 008）
+register_statement("drilling_daily_by_well", f"""
+    SELECT {DRILLING_DAILY_COLUMNS} FROM drilling_daily
+    WHERE is_deleted = false AND jh = %s
+      AND rq >= COALESCE(%s::date, '-infinity'::date)
+      AND rq <= COALESCE(%s::date, 'infinity'::date)
+    ORDER BY rq DESC LIMIT %s
+""")
+
 @AuditLog.trace("get_drilling_daily")
 def get_drilling_daily(well_id: str = "", start_date: str = "", end_date: str = "", limit: int = 100, 
+                       well_ids: list = None,
                        user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """查询钻井工程日报数据"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if well_ids:
+        return _multi_well_report("drilling_daily_by_wells", well_ids, start_date, end_date, limit,
+                                  _drilling_daily_record, "🔨 钻井工程日报 - 多井对比",
+                                  user_role, user_id, user_email)
     
-    try:
-        query = "SELECT * FROM drilling_daily WHERE is_deleted = false"
+    well_id = normalize_well_id(well_id) if well_id else well_id
+    if well_id:
+        if not PermissionService.check_well_access(user_role, well_id):
+            return f"🚫 权限拒绝：无权访问井号 {well_id} 的日报数据。"
+        rows = fetch_prepared("drilling_daily_by_well", (well_id, start_date or None, end_date or None, limit))
+    else:
+        query = f"SELECT {DRILLING_DAILY_COLUMNS} FROM drilling_daily WHERE is_deleted = false"
         params = []
         
-        # 井号过滤
-        if well_id:
-            if not PermissionService.check_well_access(user_role, well_id):
-                return f"🚫 权限拒绝：无权访问井号 {well_id} 的日报数据。"
-            query += " AND jh = %s"
-            params.append(well_id)
-        
         # 日期范围过滤
         if start_date:
-            query += " AND rq >= %s"
+            query += " AND rq >= %s::date"
             params.append(start_date)
         
         if end_date:
-            query += " AND rq <= %s"
+            query += " AND rq <= %s::date"
             params.append(end_date)
         
         query += " ORDER BY rq DESC LIMIT %s"
         params.append(limit)
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        
-        if not results:
-            well_filter = f"井号 '{well_id}'" if well_id else ""
-            date_filter = f"日期 {start_date} 到 {end_date}" if start_date or end_date else ""
-            filter_str = " & ".join([f for f in [well_filter, date_filter] if f])
-            return f"❌ 未找到匹配条件的钻井日报数据。（{filter_str}）"
-        
-        # 格式化输出
-        data = []
-        for row in results:
-            data.append({
-                "日期": str(row['rq']) if row['rq'] else '',
-                "井号": row['jh'] or '未记录',
-                "当日井深(m)": float(row['drjs']) if row['drjs'] else '',
-                "日进尺(m)": float(row['zjrjc']) if row['zjrjc'] else '',
-                "钻头类型": row['ztlx'] or '',
-                "钻速(m/h)": float(row['zs']) if row['zs'] else '',
-                "泵压(MPa)": float(row['bya']) if row['bya'] else '',
-                "钻井液密度": float(row['zjymd']) if row['zjymd'] else ''
-            })
-        
-        title = f"🔨 钻井工程日报"
-        if well_id:
-            title += f" - 井号: {well_id}"
-        if start_date or end_date:
-            title += f" ({start_date} 至 {end_date})"
-        
-        return f"### {title}\n\n**共 {len(data)} 条记录**\n\n{df_to_markdown(pd.DataFrame(data))}"
+        # 服务端游标分批读取
+        rows = iter_query(query, params)
     
-    finally:
-        cursor.close()
-        conn.close()
+    data = [_drilling_daily_record(row) for row in rows]
+    
+    if not data:
+        well_filter = f"井号 '{well_id}'" if well_id else ""
+        date_filter = f"日期 {start_date} 到 {end_date}" if start_date or end_date else ""
+        filter_str = " & ".join([f for f in [well_filter, date_filter] if f])
+        return f"❌ 未找到匹配条件的钻井日报数据。（{filter_str}）{well_name_suggestions(well_id, lambda names: _accessible_wells(names, user_role))}"
+    
+    title = f"🔨 钻井工程日报"
+    if well_id:
+        title += f" - 井号: {well_id}"
+    if start_date or end_date:
+        title += f" ({start_date} 至 {end_date})"
+    
+    return f"### {title}\n\n**共 {len(data)} 条记录**\n\n{df_to_markdown(pd.DataFrame(data))}"
+
+# 月度汇总直接读 drilling_daily_monthly；年度汇总对月度行再聚合（平均钻速按日报加权）
+DRILLING_MONTHLY_QUERY = """
+    SELECT jh, month AS period, report_count, zjrjc_sum,
+           zs_sum / NULLIF(zs_count, 0) AS zs_avg, drjs_max, czjljsj_max, first_rq, last_rq
+    FROM drilling_daily_monthly
+    WHERE true{filters}
+    ORDER BY month DESC, jh
+    LIMIT %s
+"""
+
+DRILLING_YEARLY_QUERY = """
+    SELECT jh, date_trunc('year', month)::date AS period, SUM(report_count) AS report_count,
+           SUM(zjrjc_sum) AS zjrjc_sum, SUM(zs_sum) / NULLIF(SUM(zs_count), 0) AS zs_avg,
+           MAX(drjs_max) AS drjs_max, MAX(czjljsj_max) AS czjljsj_max,
+           MIN(first_rq) AS first_rq, MAX(last_rq) AS last_rq
+    FROM drilling_daily_monthly
+    WHERE true{filters}
+    GROUP BY jh, date_trunc('year', month)
+    ORDER BY period DESC, jh
+    LIMIT %s
+"""
+
+@AuditLog.trace("get_drilling_monthly")
+def get_drilling_monthly(well_id: str = "", year: int = None, period: str = "month", limit: int = 100,
+                         user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
+    """查询钻井月度/年度汇总"""
+    if period not in ("month", "year"):
+        return "❌ period 仅支持 month / year"
+    
+    well_id = normalize_well_id(well_id) if well_id else well_id
+    if well_id and not PermissionService.check_well_access(user_role, well_id):
+        return f"🚫 权限拒绝：无权访问井号 {well_id} 的日报数据。"
+    
+    filters = ""
+    params = []
+    if well_id:
+        filters += " AND jh = %s"
+        params.append(well_id)
+    if year:
+        try:
+            year = int(year)
+        except (ValueError, TypeError):
+            return f"❌ 年份格式错误: {year}"
+        filters += " AND month >= %s AND month < %s"
+        params.extend([date(year, 1, 1), date(year + 1, 1, 1)])
+    params.append(limit)
+    
+    template = DRILLING_MONTHLY_QUERY if period == "month" else DRILLING_YEARLY_QUERY
+    rows = iter_query(template.format(filters=filters), params)
+    
+    if not well_id:
+        rows = list(rows)
+        visible = filter_wells_by_permission([{"well_name": jh} for jh in {row['jh'] for row in rows}],
+                                             user_role, user_id, user_email)
+        allowed = {well["well_name"] for well in visible}
+        rows = [row for row in rows if row['jh'] in allowed]
+    
+    def num(value):
+        return round(float(value), 2) if value is not None else ''
+    
+    data = []
+    for row in rows:
+        data.append({
+            "月份" if period == "month" else "年份": row['period'].strftime("%Y-%m" if period == "month" else "%Y"),
+            "井号": row['jh'],
+            "日报天数": row['report_count'],
+            "进尺合计(m)": num(row['zjrjc_sum']),
+            "平均钻速(m/h)": num(row['zs_avg']),
+            "最大井深(m)": num(row['drjs_max']),
+            "纯钻进累计时间(h)": num(row['czjljsj_max']),
+            "日报起止": f"{row['first_rq']} 至 {row['last_rq']}",
+        })
+    
+    if not data:
+        filters_text = " & ".join(f for f in [f"井号 '{well_id}'" if well_id else "", f"{year} 年" if year else ""] if f)
+        suggestions = well_name_suggestions(well_id, lambda names: _accessible_wells(names, user_role)) if well_id else ""
+        return f"❌ 未找到匹配条件的钻井汇总数据。（{filters_text or '全部'}）{suggestions}"
+    
+    title = f"📅 钻井{'月度' if period == 'month' else '年度'}汇总"
+    if well_id:
+        title += f" - 井号: {well_id}"
+    if year:
+        title += f" ({year} 年)"
+    
+    return f"### {title}\n\n**共 {len(data)} 条记录**\n\n{df_to_markdown(pd.DataFrame(data))}"
 
 @AuditLog.trace("get_drilling_pre_daily")
 def get_drilling_pre_daily(project: str = "", year: int = None, well_id: str = "", limit: int = 50, 
                            user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """查询钻前工程日报数据"""
-    conn = get_db_connection()
+    well_id = normalize_well_id(well_id) if well_id else well_id
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
     
     try:
-        query = "SELECT * FROM drilling_pre_daily WHERE is_deleted = false"
+        query = f"SELECT {DRILLING_PRE_DAILY_COLUMNS} FROM drilling_pre_daily WHERE is_deleted = false"
         params = []
         
         # 项目过滤
@@ -610,98 +948,231 @@ def get_drilling_pre_daily(project: str = "", year: int = None, well_id: str = "
         cursor.close()
         conn.close()
 
+register_statement("key_well_daily_by_well", f"""
+    SELECT {KEY_WELL_DAILY_COLUMNS} FROM key_well_daily
+    WHERE is_deleted = false AND jh = %s
+      AND rq >= COALESCE(%s::date, '-infinity'::date)
+      AND rq <= COALESCE(%s::date, 'infinity'::date)
+    ORDER BY rq DESC LIMIT %s
+""")
+
+# 趋势模式：单井按日/周/月分桶汇总（走 idx_kwd_live_jh_rq 仅索引扫描）
+register_statement("key_well_daily_series", """
+    SELECT date_trunc(%s, rq::timestamp)::date AS bucket,
+           COUNT(*) AS days,
+           MIN(rcql) AS rcql_min, AVG(rcql) AS rcql_avg, MAX(rcql) AS rcql_max,
+           MIN(hs) AS hs_min, AVG(hs) AS hs_avg, MAX(hs) AS hs_max,
+           MIN(LEAST(yysx, yyxx)) AS yy_min, AVG((COALESCE(yysx, yyxx) + COALESCE(yyxx, yysx)) / 2) AS yy_avg,
+           MAX(GREATEST(yysx, yyxx)) AS yy_max,
+           MIN(LEAST(tysx, tyxx)) AS ty_min, AVG((COALESCE(tysx, tyxx) + COALESCE(tyxx, tysx)) / 2) AS ty_avg,
+           MAX(GREATEST(tysx, tyxx)) AS ty_max
+    FROM key_well_daily
+    WHERE is_deleted = false AND jh = %s
+      AND rq >= COALESCE(%s::date, '-infinity'::date)
+      AND rq <= COALESCE(%s::date, 'infinity'::date)
+    GROUP BY 1
+    ORDER BY 1
+""")
+
+SERIES_BUCKETS = {"day": "日", "week": "周", "month": "月"}
+
+# LTTB 保留首尾两点，中间至少一个桶
+SERIES_MIN_POINTS = 3
+
+def _key_well_series(well_id: str, start_date: str, end_date: str, bucket: str, max_points: int) -> str:
+    """重点井生产趋势：数据库端分桶汇总，可选 LTTB 降采样"""
+    rows = fetch_prepared("key_well_daily_series", (bucket, well_id, start_date or None, end_date or None))
+    if not rows:
+        return f"❌ 未找到井号 '{well_id}' 的重点井日报数据。"
+    
+    total = len(rows)
+    if max_points and max_points < total:
+        # 以平均日产气量为主序列选点，时段缺少产气数据时按 0 处理
+        points = [(row['bucket'].toordinal(), float(row['rcql_avg'] or 0)) for row in rows]
+        rows = [rows[i] for i in lttb(points, max_points)]
+    
+    def num(value):
+        return round(float(value), 2) if value is not None else ''
+    
+    def triple(row, prefix):
+        return f"{num(row[prefix + '_min'])} / {num(row[prefix + '_avg'])} / {num(row[prefix + '_max'])}"
+    
+    data = [{
+        "时段": str(row['bucket']),
+        "天数": row['days'],
+        "日产气量(万方) 最小/平均/最大": triple(row, 'rcql'),
+        "含水(%) 最小/平均/最大": triple(row, 'hs'),
+        "油压(MPa) 最小/平均/最大": triple(row, 'yy'),
+        "套压(MPa) 最小/平均/最大": triple(row, 'ty'),
+    } for row in rows]
+    
+    title = f"📈 重点井生产趋势 (井号: {well_id} | 按{SERIES_BUCKETS[bucket]}汇总"
+    if start_date or end_date:
+        title += f" | 日期: {start_date or '—'} 至 {end_date or '—'}"
+    title += ")"
+    summary = f"**共 {total} 个时段**"
+    if len(rows) < total:
+        summary += f"，按平均日产气量降采样为 {len(rows)} 个（LTTB，保留峰谷）"
+    return f"### {title}\n\n{summary}\n\n{df_to_markdown(pd.DataFrame(data))}"
+
 @AuditLog.trace("get_key_well_daily")
 def get_key_well_daily(well_id: str = "", start_date: str = "", end_date: str = "", block: str = "", limit: int = 100, 
+                       bucket: str = "", max_points: int = 0, well_ids: list = None,
                        user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """查询重点井试采日报数据"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if well_ids and (bucket or max_points):
+        return "❌ 趋势模式（bucket / max_points）只支持单井，请用 well_id 指定井号，不要同时传入 well_ids"
+    if block and (bucket or max_points):
+        return "❌ 趋势模式（bucket / max_points）按单井聚合，不支持区块过滤，请去掉 block 参数"
+    if well_ids:
+        return _multi_well_report("key_well_daily_by_wells", well_ids, start_date, end_date, limit,
+                                  _key_well_daily_record, "⛽ 重点井试采日报 - 多井对比",
+                                  user_role, user_id, user_email)
     
-    try:
-        query = "SELECT * FROM key_well_daily WHERE is_deleted = false"
+    well_id = normalize_well_id(well_id) if well_id else well_id
+    
+    # 井号过滤
+    if well_id and not PermissionService.check_well_access(user_role, well_id):
+        return f"🚫 权限拒绝：无权访问井号 {well_id} 的重点井日报数据。"
+    
+    # 区块过滤
+    if block and not PermissionService.check_block_access(user_role, block):
+        return f"🚫 权限拒绝：无权访问区块 {block} 的重点井日报数据。"
+    
+    # 趋势模式
+    if bucket or max_points:
+        bucket = bucket or "day"
+        if bucket not in SERIES_BUCKETS:
+            return "❌ bucket 仅支持 day / week / month"
+        if max_points and max_points < SERIES_MIN_POINTS:
+            return f"❌ max_points 至少为 {SERIES_MIN_POINTS}（降采样始终保留首尾两个时段）"
+        if not well_id:
+            return "❌ 趋势模式需要指定井号（well_id）"
+        return _key_well_series(well_id, start_date, end_date, bucket, max_points)
+    
+    if well_id and not block:
+        rows = fetch_prepared("key_well_daily_by_well", (well_id, start_date or None, end_date or None, limit))
+    else:
+        query = f"SELECT {KEY_WELL_DAILY_COLUMNS} FROM key_well_daily WHERE is_deleted = false"
         params = []
         
-        # 井号过滤
         if well_id:
-            if not PermissionService.check_well_access(user_role, well_id):
-                return f"🚫 权限拒绝：无权访问井号 {well_id} 的重点井日报数据。"
             query += " AND jh = %s"
             params.append(well_id)
         
-        # 区块过滤
         if block:
-            if not PermissionService.check_block_access(user_role, block):
-                return f"🚫 权限拒绝：无权访问区块 {block} 的重点井日报数据。"
             query += " AND qk ILIKE %s"
             params.append(f"%{block}%")
         
         # 日期范围过滤
         if start_date:
-            query += " AND rq >= %s"
+            query += " AND rq >= %s::date"
             params.append(start_date)
         
         if end_date:
-            query += " AND rq <= %s"
+            query += " AND rq <= %s::date"
             params.append(end_date)
         
         query += " ORDER BY rq DESC LIMIT %s"
         params.append(limit)
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        
-        if not results:
-            filter_items = []
-            if well_id:
-                filter_items.append(f"井号 '{well_id}'")
-            if block:
-                filter_items.append(f"区块 '{block}'")
-            if start_date or end_date:
-                date_range = f"{start_date or '—'} 到 {end_date or '—'}"
-                filter_items.append(f"日期 {date_range}")
-            filter_str = " & ".join(filter_items) if filter_items else "条件"
-            return f"❌ 未找到匹配 {filter_str} 的重点井日报数据。"
-        
-        # 格式化输出 - 包括生产数据和压力参数
-        data = []
-        for row in results:
-            pressure_info = []
-            if row['yysx'] is not None or row['yyxx'] is not None:
-                pressure_info.append(f"油压: {row['yysx']}-{row['yyxx']}MPa")
-            if row['tysx'] is not None or row['tyxx'] is not None:
-                pressure_info.append(f"套压: {row['tysx']}-{row['tyxx']}MPa")
-            if row['hysx'] is not None or row['hyxx'] is not None:
-                pressure_info.append(f"回压: {row['hysx']}-{row['hyxx']}MPa")
-            
-            data.append({
-                "日期": str(row['rq']) if row['rq'] else '',
-                "井号": row['jh'] or '未记录',
-                "区块": row['qk'] or '',
-                "层位": row['cw'] or '',
-                "状态": row['zt'] or '',
-                "日产气量(万方)": float(row['rcql']) if row['rcql'] else '',
-                "含水(%)": float(row['hs']) if row['hs'] else '',
-                "油嘴": row['yz'] or '',
-                "压力参数": ' | '.join(pressure_info) if pressure_info else '—'
-            })
-        
-        title = "⛽ 重点井试采日报"
-        filters = []
+        # 服务端游标分批读取
+        rows = iter_query(query, params)
+    
+    data = [_key_well_daily_record(row) for row in rows]
+    
+    if not data:
+        filter_items = []
         if well_id:
-            filters.append(f"井号: {well_id}")
+            filter_items.append(f"井号 '{well_id}'")
         if block:
-            filters.append(f"区块: {block}")
+            filter_items.append(f"区块 '{block}'")
         if start_date or end_date:
-            date_range = f"{start_date or '—'} 至 {end_date or '—'}"
-            filters.append(f"日期: {date_range}")
-        if filters:
-            title += f" ({' | '.join(filters)})"
-        
-        return f"### {title}\n\n**共 {len(data)} 条记录**\n\n{df_to_markdown(pd.DataFrame(data))}"
+            date_range = f"{start_date or '—'} 到 {end_date or '—'}"
+            filter_items.append(f"日期 {date_range}")
+        filter_str = " & ".join(filter_items) if filter_items else "条件"
+        return f"❌ 未找到匹配 {filter_str} 的重点井日报数据。{well_name_suggestions(well_id, lambda names: _accessible_wells(names, user_role))}"
     
-    finally:
-        cursor.close()
-        conn.close()
+    title = "⛽ 重点井试采日报"
+    filters = []
+    if well_id:
+        filters.append(f"井号: {well_id}")
+    if block:
+        filters.append(f"区块: {block}")
+    if start_date or end_date:
+        date_range = f"{start_date or '—'} 至 {end_date or '—'}"
+        filters.append(f"日期: {date_range}")
+    if filters:
+        title += f" ({' | '.join(filters)})"
+    
+    return f"### {title}\n\n**共 {len(data)} 条记录**\n\n{df_to_markdown(pd.DataFrame(data))}"
+
+# 每口井最近一天的日报（DISTINCT ON (jh) ... ORDER BY jh, rq DESC，走 idx_*_live_jh_rq 仅索引扫描），
+# 缓存为进程内快照；save_* 写入不早于快照日期的日报时只重查该井
+register_latest_snapshot("key_well_daily", KEY_WELL_DAILY_COLUMNS)
+register_latest_snapshot("drilling_daily", DRILLING_DAILY_COLUMNS)
+
+@AuditLog.trace("get_latest_well_status")
+def get_latest_well_status(report: str = "all", block: str = "", limit: int = 200,
+                           user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
+    """查询每口井的最新日报状态"""
+    if report not in ("all", "key_well", "drilling"):
+        return "❌ report 仅支持 all / key_well / drilling"
+    if block and not PermissionService.check_block_access(user_role, block):
+        return f"🚫 权限拒绝：无权访问区块 {block} 的重点井日报数据。"
+    
+    key_rows = list(get_latest_rows("key_well_daily").values()) if report in ("all", "key_well") else []
+    if block:
+        # 与 get_key_well_daily 的 qk ILIKE '%block%' 一致：不区分大小写的子串匹配
+        block_lower = block.lower()
+        key_rows = [row for row in key_rows if block_lower in (row['qk'] or '').lower()]
+    drilling_rows = list(get_latest_rows("drilling_daily").values()) if report in ("all", "drilling") and not block else []
+    
+    # 与单井/多井日报查询使用同一井级权限规则（逐井 check_well_access）
+    wells = {row['jh'] for row in key_rows} | {row['jh'] for row in drilling_rows}
+    allowed = set(_accessible_wells(wells, user_role))
+    key_rows = [row for row in key_rows if row['jh'] in allowed]
+    drilling_rows = [row for row in drilling_rows if row['jh'] in allowed]
+    
+    def num(value):
+        return float(value) if value is not None else ''
+    
+    def pressure(upper, lower):
+        return f"{num(lower)}-{num(upper)}" if upper is not None or lower is not None else ''
+    
+    sections = []
+    if key_rows:
+        data = [{
+            "井号": row['jh'],
+            "最新日期": str(row['rq']),
+            "区块": row['qk'] or '',
+            "状态": row['zt'] or '',
+            "日产气量(万方)": num(row['rcql']),
+            "含水(%)": num(row['hs']),
+            "油压(MPa)": pressure(row['yysx'], row['yyxx']),
+            "套压(MPa)": pressure(row['tysx'], row['tyxx']),
+        } for row in key_rows[:limit]]
+        sections.append(f"#### 🛢️ 重点井试采（{len(key_rows)} 口井"
+                        f"{f'，显示前 {limit} 口' if len(key_rows) > limit else ''}）\n\n{df_to_markdown(pd.DataFrame(data))}")
+    if drilling_rows:
+        data = [{
+            "井号": row['jh'],
+            "最新日期": str(row['rq']),
+            "当日井深(m)": num(row['drjs']),
+            "日进尺(m)": num(row['zjrjc']),
+            "钻头类型": row['ztlx'] or '',
+            "钻速(m/h)": num(row['zs']),
+        } for row in drilling_rows[:limit]]
+        sections.append(f"#### 🔨 钻井（{len(drilling_rows)} 口井"
+                        f"{f'，显示前 {limit} 口' if len(drilling_rows) > limit else ''}）\n\n{df_to_markdown(pd.DataFrame(data))}")
+    
+    if not sections:
+        return f"❌ 未找到日报数据。{f'（区块: {block}）' if block else ''}"
+    
+    title = "📌 各井最新状态"
+    if block:
+        title += f" (区块: {block})"
+    return f"### {title}\n\n" + "\n\n".join(sections)
 
 def _check_write_permission(user_role: str) -> str | None:
     """Return an error message string if write is not allowed, else None."""
@@ -723,9 +1194,44 @@ def _parse_number(value: object) -> float | None:
     return None
 
 
+def _ensure_partition_for(table: str, fields: dict):
+    """分区表写入前确认 rq 所在月份的分区存在"""
+    if table not in PARTITIONED_TABLES:
+        return
+    try:
+        ensure_partitions(table, date.fromisoformat(str(fields.get("rq"))[:10]))
+    except ValueError:
+        # 日期格式不合法时交给数据库报错
+        pass
+    except Exception as e:
+        # 并发写入时分区可能已被其他进程创建，继续写入
+        logger.warning(f"⚠️  {table} 分区检查失败: {e}")
+
+
+# 写入后在同一事务中重算的汇总表（迁移 010），参数为 (jh, rq)
+ROLLUP_REFRESH = {
+    "drilling_daily": "SELECT refresh_drilling_daily_monthly(%s, %s::date)",
+}
+
+def _refresh_rollup(cursor, table: str, fields: dict):
+    """重算写入行所在的汇总；汇总函数不存在（未执行迁移）时只记录警告，不影响日报写入"""
+    query = ROLLUP_REFRESH.get(table)
+    if not query:
+        return
+    cursor.execute("SAVEPOINT rollup_refresh")
+    try:
+        cursor.execute(query, (fields["jh"], fields["rq"]))
+    except Exception as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT rollup_refresh")
+        logger.warning(f"⚠️  {table} 汇总更新失败，可执行 rebuild_drilling_daily_monthly() 重建: {e}")
+    else:
+        cursor.execute("RELEASE SAVEPOINT rollup_refresh")
+
+
 def _upsert(table: str, key_cols: list[str], fields: dict, user_email: str) -> str:
     """Generic UPDATE-then-INSERT upsert returning a status string."""
     update_cols = [c for c in fields if c not in key_cols]
+    _ensure_partition_for(table, fields)
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
@@ -746,7 +1252,9 @@ def _upsert(table: str, key_cols: list[str], fields: dict, user_email: str) -> s
 
         row = cursor.fetchone()
         if row:
+            _refresh_rollup(cursor, table, fields)
             conn.commit()
+            note_daily_write(table, fields.get("jh"), fields.get("rq"))
             logger.info(f"✅ {table} 更新 by {user_email}")
             return f"✅ 数据已更新（ID: {row['id']}）：{table}，写入字段 {len(update_cols)}。"
 
@@ -757,7 +1265,9 @@ def _upsert(table: str, key_cols: list[str], fields: dict, user_email: str) -> s
             list(fields.values()),
         )
         inserted = cursor.fetchone()
+        _refresh_rollup(cursor, table, fields)
         conn.commit()
+        note_daily_write(table, fields.get("jh"), fields.get("rq"))
         logger.info(f"✅ {table} 新增 by {user_email}")
         return f"✅ 数据已新增（ID: {inserted['id'] if inserted else '?'}）：{table}，写入字段 {len(fields)}。"
     except Exception as e:
@@ -18,7 +18,11 @@ from pydantic import BaseModel
 from contextvars import ContextVar
 import uvicorn
 
-from common.db import get_db_connection, test_db_connection, DB_CONFIG
+from common.db import (
+    get_db_connection, test_db_connection, close_pool, run_db_call, DB_CONFIG,
+    start_health_prober, stop_health_prober, get_health_status,
+    query_scope, cancel_on_disconnect, QueryCancelledError,
+)
 from common.permissions import DEV_MODE
 from common.audit import AuditLog
 
@@ -66,7 +70,10 @@ async def lifespan(app: FastAPI):
         logger.info("✅ 数据库连接正常")
     else:
         logger.warning("⚠️  数据库连接失败")
+    start_health_prober()
     yield
+    stop_health_prober()
+    close_pool()
     logger.info("👋 MCP Server 关闭")
 
 app = FastAPI(
@@ -94,8 +101,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    db_ok = test_db_connection()
-    return {"status": "healthy" if db_ok else "degraded", "database": "connected" if db_ok else "disconnected"}
+    return get_health_status()
 
 # ==========================================
 # SSE Endpoints
@@ -150,7 +156,13 @@ async def handle_sse_post(request: Request):
             })
         elif method == "tools/call":
             params = body_json.get("params", {})
-            result = await handle_call_tool(params.get("name"), params.get("arguments", {}))
+            # 客户端断开时取消仍在执行的后端查询
+            with query_scope() as scope:
+                result = await cancel_on_disconnect(
+                    handle_call_tool(params.get("name"), params.get("arguments", {})),
+                    request.is_disconnected,
+                    scope,
+                )
             return JSONResponse(content={
                 "jsonrpc": "2.0",
                 "id": body_json.get("id"),
@@ -162,6 +174,9 @@ async def handle_sse_post(request: Request):
                 "id": body_json.get("id"),
                 "error": {"code": -32601, "message": f"Method not found: {method}"}
             })
+    except QueryCancelledError as e:
+        logger.warning(f"🔌 {e}")
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"❌ SSE POST错误: {e}", exc_info=True)
         return JSONResponse(status_code=500, content={"jsonrpc": "2.0", "error": {"code": -32603, "message": str(e)}})
@@ -379,36 +394,51 @@ async def handle_list_tools():
         ),
     ]
 
+# 各工具的查询时间预算（毫秒），未列出的工具使用 DB_STATEMENT_TIMEOUT_MS
+TOOL_TIMEOUTS_MS = {
+    "save_well_analysis": 10000,
+    "save_workover_record": 10000,
+    "save_perforation_record": 10000,
+    "save_wellbore_diagram": 10000,
+    "save_perforation_records_batch": 60000,
+    "save_workover_records_batch": 60000,
+    "save_well_analyses_batch": 60000,
+}
+
 @mcp_server.call_tool()
 async def handle_call_tool(name: str, arguments: dict):
     logger.info(f"🔧 工具调用: {name}")
     user_ctx = current_user_context.get()
     try:
-        if name == "save_well_analysis":
-            result = save_well_analysis(data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
-        elif name == "save_workover_record":
-            result = save_workover_record(data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
-        elif name == "save_perforation_record":
-            result = save_perforation_record(data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
-        elif name == "save_wellbore_diagram":
-            result = save_wellbore_diagram(data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
-        elif name == "save_perforation_records_batch":
-            result = save_perforation_records_batch(
-                records_json=arguments.get("records_json", "[]"),
-                user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
-            )
-        elif name == "save_workover_records_batch":
-            result = save_workover_records_batch(
-                records_json=arguments.get("records_json", "[]"),
-                user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
-            )
-        elif name == "save_well_analyses_batch":
-            result = save_well_analyses_batch(
-                records_json=arguments.get("records_json", "[]"),
-                user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
-            )
-        else:
-            raise ValueError(f"未知工具: {name}")
+        with query_scope(TOOL_TIMEOUTS_MS.get(name)):
+            if name == "save_well_analysis":
+                result = await run_db_call(save_well_analysis, data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
+            elif name == "save_workover_record":
+                result = await run_db_call(save_workover_record, data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
+            elif name == "save_perforation_record":
+                result = await run_db_call(save_perforation_record, data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
+            elif name == "save_wellbore_diagram":
+                result = await run_db_call(save_wellbore_diagram, data=arguments, user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email)
+            elif name == "save_perforation_records_batch":
+                result = await run_db_call(
+                    save_perforation_records_batch,
+                    records_json=arguments.get("records_json", "[]"),
+                    user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
+                )
+            elif name == "save_workover_records_batch":
+                result = await run_db_call(
+                    save_workover_records_batch,
+                    records_json=arguments.get("records_json", "[]"),
+                    user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
+                )
+            elif name == "save_well_analyses_batch":
+                result = await run_db_call(
+                    save_well_analyses_batch,
+                    records_json=arguments.get("records_json", "[]"),
+                    user_role=user_ctx.role, user_id=user_ctx.user_id, user_email=user_ctx.email,
+                )
+            else:
+                raise ValueError(f"未知工具: {name}")
         logger.info(f"✅ 工具执行成功: {name}")
         return [TextContent(type="text", text=result)]
     except Exception as e:
@@ -12,6 +12,7 @@ import json
 import logging
 import pandas as pd
 from typing import Optional, List
+from datetime import datetime
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Header, Request
@@ -21,9 +22,24 @@ from pydantic import BaseModel
 import uvicorn
 
 # 导入共享模块
-from common.db import get_db_connection, test_db_connection, execute_write, DB_CONFIG
+from common.db import (
+    get_db_connection, test_db_connection, close_pool, run_db_call, execute_write, DB_CONFIG,
+    start_health_prober, stop_health_prober, get_health_status,
+    query_scope, cancel_on_disconnect, QueryCancelledError,
+    register_statement, execute_prepared, get_prepared_statement_stats, get_replica_status,
+    fetch_columns, execute_batch, execute_query,
+)
+from common.catalog import start_well_catalog, stop_well_catalog, get_well_catalog, request_catalog_refresh, get_catalog_status
+from common.aliases import load_well_aliases, invalidate_well_aliases, get_alias_status
+from common.stats_views import (
+    STATS_VIEWS, start_stats_view_refresher, stop_stats_view_refresher,
+    request_stats_view_refresh, get_stats_view_status,
+)
 from common.permissions import PermissionService, filter_wells_by_permission, DEV_MODE
-from common.utils import df_to_markdown, normalize_well_id
+from common.utils import (
+    df_to_markdown, normalize_well_id, well_name_suggestions, ngram_tsquery,
+    encode_page_token, decode_page_token, NULL_CREATED_AT,
+)
 from common.audit import AuditLog
 
 # ==========================================
@@ -73,7 +89,15 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("⚠️  数据库连接失败")
     
+    start_health_prober()
+    start_well_catalog()
+    load_well_aliases()
+    start_stats_view_refresher()
     yield
+    stop_stats_view_refresher()
+    stop_well_catalog()
+    stop_health_prober()
+    close_pool()
     logger.info("👋 MCP Server 关闭")
 
 app = FastAPI(
@@ -106,10 +130,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    db_ok = test_db_connection()
+    return get_health_status()
+
+@app.get("/stats")
+async def db_stats():
     return {
-        "status": "healthy" if db_ok else "degraded",
-        "database": "connected" if db_ok else "disconnected"
+        "prepared_statements": get_prepared_statement_stats(),
+        "replicas": get_replica_status(),
+        "well_catalog": get_catalog_status(),
+        "well_aliases": get_alias_status(),
+        "stats_views": get_stats_view_status(),
     }
 
 # ==========================================
@@ -182,7 +212,13 @@ async def handle_sse_post(request: Request):
         
         elif method == "tools/call":
             params = body_json.get("params", {})
-            result = await handle_call_tool(params.get("name"), params.get("arguments", {}))
+            # 客户端断开时取消仍在执行的后端查询
+            with query_scope() as scope:
+                result = await cancel_on_disconnect(
+                    handle_call_tool(params.get("name"), params.get("arguments", {})),
+                    request.is_disconnected,
+                    scope,
+                )
             # 将 TextContent 对象转换为可序列化的字典
             serializable_result = [
                 {"type": item.type, "text": item.text}
@@ -201,6 +237,9 @@ async def handle_sse_post(request: Request):
                 "error": {"code": -32601, "message": f"Method not found: {method}"}
             })
     
+    except QueryCancelledError as e:
+        logger.warning(f"🔌 {e}")
+        return Response(status_code=499)
     except Exception as e:
         logger.error(f"❌ SSE POST错误: {e}", exc_info=True)
         return JSONResponse(status_code=500, content={
@@ -225,16 +264,25 @@ async def handle_list_tools():
                     "keywords": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "搜索关键词列表。留空返回所有油井"
+                        "description": "搜索关键词列表。留空返回所有油井；以*结尾的关键词按前缀匹配（如'HH1*'）"
                     },
                     "keyword": {
                         "type": "string",
-                        "description": "单个搜索关键词（井号、区块等）。空字符串''返回所有油井"
+                        "description": "单个搜索关键词（井号、区块等）。空字符串''返回所有油井；以*结尾时按前缀匹配"
                     },
                     "limit": {
                         "type": "integer",
                         "default": 500,
                         "description": "返回结果数量限制（默认500，最大10000）"
+                    },
+                    "ranked": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "按相关度排序（井名 > 区块/项目 > 子项目 > 目的层/钻探目的），只返回最相关的前 limit 口井"
+                    },
+                    "page_token": {
+                        "type": "string",
+                        "description": "续页令牌：上一页结果末尾给出的 page_token，其余参数保持不变"
                     }
                 },
                 "required": []
@@ -273,6 +321,10 @@ async def handle_list_tools():
                         "type": "integer",
                         "default": 50,
                         "description": "返回结果数量限制"
+                    },
+                    "page_token": {
+                        "type": "string",
+                        "description": "续页令牌：上一页结果末尾给出的 page_token，其余参数保持不变"
                     }
                 },
                 "required": ["block"]
@@ -292,6 +344,10 @@ async def handle_list_tools():
                         "type": "integer",
                         "default": 50,
                         "description": "返回结果数量限制"
+                    },
+                    "page_token": {
+                        "type": "string",
+                        "description": "续页令牌：上一页结果末尾给出的 page_token，其余参数保持不变"
                     }
                 },
                 "required": ["project"]
@@ -405,6 +461,16 @@ async def handle_list_tools():
         )
     ]
 
+# 各工具的查询时间预算（毫秒），未列出的工具使用 DB_STATEMENT_TIMEOUT_MS
+TOOL_TIMEOUTS_MS = {
+    "search_wells": 10000,
+    "get_well_details": 5000,
+    "get_wells_by_block": 5000,
+    "get_wells_by_project": 5000,
+    "get_statistics": 15000,
+    "save_well_data": 10000,
+}
+
 @mcp_server.call_tool()
 async def handle_call_tool(name: str, arguments: dict):
     """处理工具调用"""
@@ -418,55 +484,66 @@ async def handle_call_tool(name: str, arguments: dict):
     try:
         result = None
         
-        if name == "search_wells":
-            result = search_wells(
-                keywords=arguments.get('keywords'),
-                keyword=arguments.get('keyword', ''),
-                limit=arguments.get('limit', 500),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_well_details":
-            result = get_well_details(
-                well_ids=arguments.get('well_ids'),
-                well_id=arguments.get('well_id', ''),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_wells_by_block":
-            result = get_wells_by_block(
-                block=arguments.get('block', ''),
-                limit=arguments.get('limit', 50),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_wells_by_project":
-            result = get_wells_by_project(
-                project=arguments.get('project', ''),
-                limit=arguments.get('limit', 50),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "get_statistics":
-            result = get_statistics(
-                group_by=arguments.get('group_by', 'block'),
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        elif name == "save_well_data":
-            result = save_well_data(
-                data=arguments,
-                user_role=user_role,
-                user_id=user_id,
-                user_email=user_email
-            )
-        else:
-            raise ValueError(f"未知工具: {name}")
+        with query_scope(TOOL_TIMEOUTS_MS.get(name)):
+            if name == "search_wells":
+                result = await run_db_call(
+                    search_wells,
+                    keywords=arguments.get('keywords'),
+                    keyword=arguments.get('keyword', ''),
+                    limit=arguments.get('limit', 500),
+                    ranked=arguments.get('ranked', False),
+                    page_token=arguments.get('page_token', ''),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_well_details":
+                result = await run_db_call(
+                    get_well_details,
+                    well_ids=arguments.get('well_ids'),
+                    well_id=arguments.get('well_id', ''),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_wells_by_block":
+                result = await run_db_call(
+                    get_wells_by_block,
+                    block=arguments.get('block', ''),
+                    limit=arguments.get('limit', 50),
+                    page_token=arguments.get('page_token', ''),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_wells_by_project":
+                result = await run_db_call(
+                    get_wells_by_project,
+                    project=arguments.get('project', ''),
+                    limit=arguments.get('limit', 50),
+                    page_token=arguments.get('page_token', ''),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "get_statistics":
+                result = await run_db_call(
+                    get_statistics,
+                    group_by=arguments.get('group_by', 'block'),
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            elif name == "save_well_data":
+                result = await run_db_call(
+                    save_well_data,
+                    data=arguments,
+                    user_role=user_role,
+                    user_id=user_id,
+                    user_email=user_email
+                )
+            else:
+                raise ValueError(f"未知工具: {name}")
         
         logger.info(f"✅ 工具执行成功: {name}")
         return [TextContent(type="text", text=result)]
@@ -479,8 +556,140 @@ async def handle_call_tool(name: str, arguments: dict):
 # 业务逻辑函数
 # ==========================================
 
+# search_wells 的关键词匹配列（均有 pg_trgm GIN 索引，见 database/migrations/001_oil_wells_trgm_indexes.sql）
+WELL_SEARCH_COLUMNS = ("well_name", "qk", "ktxm")
+
+# 键集分页条件：(created_at, id) 排在上一页最后一行之后。
+# created_at 为 NULL 的行按 NULL_CREATED_AT 比较（与 ORDER BY created_at DESC 中 NULL 排在最前一致），
+# 参数为 keyset_params(after)
+KEYSET_CONDITION = "(COALESCE(created_at, %s), id) < (%s, %s)"
+# 从第一页开始分页时令牌中使用的 id（与 datetime.max 组合，排在所有行之前）
+PAGE_START_ID = 2 ** 62
+
+def keyset_params(after) -> tuple:
+    """KEYSET_CONDITION 的参数：NULL 的取值和上一页最后一行的 (created_at, id)"""
+    return (NULL_CREATED_AT, *after)
+
+def _search_wells_from_catalog(catalog, keywords: List[str], is_query_all: bool, limit: int, after=None):
+    """在内存油井目录中检索，返回 (总井数, 区块统计, 结果行)"""
+    if is_query_all and after is None:
+        total_count = catalog.size
+        if total_count > 200:
+            block_stats = [
+                {"区块": block, "井数": count, "平均井深(m)": avg_depth}
+                for block, count, avg_depth in catalog.block_summary(10)
+            ]
+            return total_count, block_stats, []
+        return total_count, None, catalog.latest(limit)
+    
+    active = [k for k in keywords if k and k.rstrip("*")]
+    if active:
+        return None, None, catalog.search(active, WELL_SEARCH_COLUMNS, limit, after=after)
+    return None, None, catalog.latest(limit, after=after)
+
+def _search_wells_from_db(keywords: List[str], is_query_all: bool, limit: int, after=None):
+    """目录不可用时直接查询数据库，返回 (总井数, 区块统计, 结果行)"""
+    conn = get_db_connection(readonly=True)
+    cursor = conn.cursor()
+    
+    try:
+        if is_query_all and after is None:
+            # 总数、区块分布和井列表在一次往返中取回。
+            # 总数与区块分布读取触发器维护的汇总表（迁移 006），只需扫描 O(区块数) 行；
+            # 总数不超过 200 时才会输出列表，因此列表最多取 201 行（多出的一行用于判断是否有下一页）
+            count_rows, block_stats, results = execute_batch(conn, [
+                ("SELECT COALESCE(SUM(well_count), 0)::bigint AS count FROM oil_well_block_stats", None),
+                ("""
+                    SELECT qk AS "区块",
+                           well_count AS "井数",
+                           COALESCE(ROUND(sjjs_sum / NULLIF(sjjs_count, 0), 2), 0)::float8 AS "平均井深(m)"
+                    FROM oil_well_block_stats
+                    WHERE qk != '' AND well_count > 0
+                    ORDER BY well_count DESC
+                    LIMIT 10
+                """, None),
+                ("""
+                    SELECT id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at
+                    FROM oil_wells 
+                    WHERE is_deleted = false
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (min(limit, 201),)),
+            ])
+            return count_rows[0]['count'], block_stats, results
+        
+        # 有关键词的搜索：每个 (关键词, 列) 单独探测，各自走该列的 trigram 索引，UNION 去重后再排序
+        probes = []
+        params = []
+        
+        for kw in keywords:
+            if not kw or not kw.rstrip("*"):
+                continue
+            # 以 * 结尾的关键词按前缀匹配，与内存目录的前缀索引语义一致
+            like_pattern = f"{kw.rstrip('*')}%" if kw.endswith("*") else f"%{kw}%"
+            for column in WELL_SEARCH_COLUMNS:
+                probes.append(f"SELECT id FROM oil_wells WHERE is_deleted = false AND {column} ILIKE %s")
+                params.append(like_pattern)
+        
+        conditions = ["is_deleted = false"]
+        if probes:
+            union_sql = "\n                    UNION\n                    ".join(probes)
+            conditions.append(f"""id IN (
+                    {union_sql}
+                )""")
+        if after is not None:
+            conditions.append(KEYSET_CONDITION)
+            params.extend(keyset_params(after))
+        
+        query = f"""
+            SELECT id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at
+            FROM oil_wells 
+            WHERE {' AND '.join(conditions)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        cursor.execute(query, params)
+        
+        results = cursor.fetchall()
+        return None, None, results
+    
+    finally:
+        cursor.close()
+        conn.close()
+
+def _paginate(results, limit: int, scope: str):
+    """截取一页结果；多取的一行说明还有下一页，此时返回续页令牌"""
+    results = list(results)
+    if len(results) <= limit:
+        return results, ""
+    last = results[limit - 1]
+    return results[:limit], encode_page_token(last['created_at'], last['id'], scope)
+
+def _page_footer(next_token: str) -> str:
+    if not next_token:
+        return ""
+    return f"\n\n➡️ 还有更多结果，传入 `page_token=\"{next_token}\"`（其余参数不变）获取下一页。"
+
+def _ranked_search_wells(keywords: List[str], limit: int):
+    """n-gram 全文索引检索，按相关度返回前 limit 行"""
+    tsquery = ngram_tsquery([k.rstrip("*") for k in keywords if k])
+    if not tsquery:
+        return []
+    
+    query = """
+        SELECT well_name, qk, jx, sjjs, sjrq, ktxm,
+               ts_rank_cd(search_tsv, q) AS rank
+        FROM oil_wells, CAST(%s AS tsquery) AS q
+        WHERE is_deleted = false AND search_tsv @@ q
+        ORDER BY rank DESC, created_at DESC
+        LIMIT %s
+    """
+    return execute_query(query, (tsquery, limit))
+
 @AuditLog.trace("search_wells")
-def search_wells(keywords: List[str] = None, keyword: str = None, limit: int = 500, 
+def search_wells(keywords: List[str] = None, keyword: str = None, limit: int = 500, ranked: bool = False,
+                 page_token: str = "",
                  user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """搜索油井"""
     # 兼容旧接口
@@ -490,35 +699,37 @@ def search_wells(keywords: List[str] = None, keyword: str = None, limit: int = 5
         else:
             keywords = []
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # 判断是否为"查询所有"
+    is_query_all = not keywords or (len(keywords) == 1 and not keywords[0])
     
-    try:
-        # 判断是否为"查询所有"
-        is_query_all = not keywords or (len(keywords) == 1 and not keywords[0])
+    page_scope = "search_wells|" + "|".join(k for k in keywords if k)
+    after = None
+    if page_token:
+        if ranked:
+            return "❌ 相关度排序模式不支持分页，请缩小关键词范围或调整 limit"
+        try:
+            after = decode_page_token(page_token, page_scope)
+        except ValueError as e:
+            return f"❌ {e}"
+    
+    # 相关度模式走全文索引；否则优先使用内存油井目录，目录不可用时查询数据库（多取一行判断是否有下一页）
+    catalog = get_well_catalog()
+    next_token = ""
+    if ranked and not is_query_all:
+        total_count, block_stats, results = None, None, _ranked_search_wells(keywords, limit)
+    else:
+        if catalog is not None:
+            total_count, block_stats, results = _search_wells_from_catalog(catalog, keywords, is_query_all, limit + 1, after)
+        else:
+            total_count, block_stats, results = _search_wells_from_db(keywords, is_query_all, limit + 1, after)
+        results, next_token = _paginate(results, limit, page_scope)
+    
+    # 如果总数超过200，返回统计摘要
+    if total_count is not None and total_count > 200:
+        logger.info(f"📊 数据量较大({total_count}口井)，返回统计摘要")
         
-        # 如果是查询所有，先检查总数
-        if is_query_all:
-            cursor.execute("SELECT COUNT(*) as count FROM oil_wells WHERE is_deleted = false")
-            total_count = cursor.fetchone()['count']
-            
-            # 如果总数超过200，返回统计摘要
-            if total_count > 200:
-                logger.info(f"📊 数据量较大({total_count}口井)，返回统计摘要")
-                
-                # 按区块统计
-                cursor.execute("""
-                    SELECT qk, COUNT(*) as count, AVG(sjjs) as avg_depth
-                    FROM oil_wells 
-                    WHERE is_deleted = false AND qk IS NOT NULL AND qk != ''
-                    GROUP BY qk
-                    ORDER BY count DESC
-                    LIMIT 10
-                """)
-                block_stats = cursor.fetchall()
-                
-                # 构建统计报告
-                report = f"""### 📊 油井数据统计摘要
+        # 构建统计报告
+        report = f"""### 📊 油井数据统计摘要
 
 **💡 提示**：由于数据量较大（共 **{total_count}** 口井），为提高查询效率，这里展示统计摘要。如需查看详细列表，请使用更具体的查询条件。
 
@@ -527,17 +738,10 @@ def search_wells(keywords: List[str] = None, keyword: str = None, limit: int = 5
 #### 🗺️ 区块分布（前10名）
 
 """
-                if block_stats:
-                    block_data = []
-                    for row in block_stats:
-                        block_data.append({
-                            "区块": row['qk'],
-                            "井数": row['count'],
-                            "平均井深(m)": round(float(row['avg_depth']), 2) if row['avg_depth'] else 0
-                        })
-                    report += df_to_markdown(pd.DataFrame(block_data))
-                
-                report += """
+        if block_stats:
+            report += df_to_markdown(pd.DataFrame(block_stats))
+        
+        report += f"""
 
 ---
 
@@ -547,79 +751,40 @@ def search_wells(keywords: List[str] = None, keyword: str = None, limit: int = 5
 - **按区块查询**：使用 `get_wells_by_block` 工具
 - **按项目查询**：使用 `get_wells_by_project` 工具
 - **按井号搜索**：使用 `search_wells` 并指定井号关键词
+- **分页浏览全部油井**：使用 `search_wells` 并传入 `page_token="{encode_page_token(datetime.max, PAGE_START_ID, page_scope)}"`
 """
-                return report
-        
-        # 正常查询流程
-        if is_query_all:
-            query = """
-                SELECT well_name, qk, jx, sjjs, sjrq, ktxm
-                FROM oil_wells 
-                WHERE is_deleted = false
-                ORDER BY created_at DESC
-                LIMIT %s
-            """
-            cursor.execute(query, (limit,))
-        else:
-            # 有关键词的搜索
-            conditions = []
-            params = []
-            
-            for kw in keywords:
-                if not kw:
-                    continue
-                conditions.append("(well_name ILIKE %s OR qk ILIKE %s OR ktxm ILIKE %s)")
-                like_pattern = f"%{kw}%"
-                params.extend([like_pattern, like_pattern, like_pattern])
-            
-            if not conditions:
-                query = """
-                    SELECT well_name, qk, jx, sjjs, sjrq, ktxm
-                    FROM oil_wells 
-                    WHERE is_deleted = false
-                    ORDER BY created_at DESC
-                    LIMIT %s
-                """
-                cursor.execute(query, (limit,))
-            else:
-                query = f"""
-                    SELECT well_name, qk, jx, sjjs, sjrq, ktxm
-                    FROM oil_wells 
-                    WHERE is_deleted = false AND ({' OR '.join(conditions)})
-                    ORDER BY created_at DESC
-                    LIMIT %s
-                """
-                params.append(limit)
-                cursor.execute(query, params)
-        
-        results = cursor.fetchall()
-        wells = [dict(row) for row in results]
-        
-        # 权限过滤
-        wells = filter_wells_by_permission(wells, user_role, user_id, user_email)
-        
-        if not wells:
-            keywords_str = "、".join([k for k in keywords if k]) if keywords else "全部"
-            return f"未找到匹配关键词 '{keywords_str}' 的井。"
-        
-        # 格式化输出
-        data = []
-        for w in wells:
-            data.append({
-                "井名": w.get('well_name', ''),
-                "区块": w.get('qk', ''),
-                "井型": w.get('jx', ''),
-                "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
-                "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
-                "项目": w.get('ktxm', '')
-            })
-        
+        return report
+    
+    # 权限过滤（RealDictRow 可直接按 dict 使用，无需逐行复制）
+    wells = filter_wells_by_permission(results, user_role, user_id, user_email)
+    
+    if not wells:
         keywords_str = "、".join([k for k in keywords if k]) if keywords else "全部"
-        return f"### 🔍 搜索结果（关键词：{keywords_str}，共 {len(wells)} 口井）\n\n{df_to_markdown(pd.DataFrame(data))}"
+        return f"未找到匹配关键词 '{keywords_str}' 的井。"
     
-    finally:
-        cursor.close()
-        conn.close()
+    # 格式化输出
+    data = []
+    for w in wells:
+        row = {
+            "井名": w.get('well_name', ''),
+            "区块": w.get('qk', ''),
+            "井型": w.get('jx', ''),
+            "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
+            "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
+            "项目": w.get('ktxm', '')
+        }
+        if 'rank' in w:
+            row["相关度"] = round(float(w['rank']), 4)
+        data.append(row)
+    
+    keywords_str = "、".join([k for k in keywords if k]) if keywords else "全部"
+    return f"### 🔍 搜索结果（关键词：{keywords_str}，共 {len(wells)} 口井）\n\n{df_to_markdown(pd.DataFrame(data))}{_page_footer(next_token)}"
+
+# 只取详情页展示的列（id 用于权限过滤）
+register_statement("well_details_by_names", """
+    SELECT id, well_name, qk, jx, jb, cw, ktxm, ktzxm, sjrq, sjjs, sjmdc, sjwzcw, dmhb, ss, sywz
+    FROM oil_wells WHERE well_name = ANY(%s) AND is_deleted = false
+""")
 
 @AuditLog.trace("get_well_details")
 def get_well_details(well_ids: List[str] = None, well_id: str = None, 
@@ -631,28 +796,38 @@ def get_well_details(well_ids: List[str] = None, well_id: str = None,
         else:
             return "❌ 请提供井名"
     
-    well_ids = [normalize_well_id(wid) for wid in well_ids]
+    well_ids = [normalize_well_id(wid) for wid in well_ids if wid]
+    if not well_ids:
+        return "❌ 请提供井名"
     
-    conn = get_db_connection()
+    conn = get_db_connection(readonly=True)
     cursor = conn.cursor()
     
     try:
+        # 一次查询取回所有井，再统一做权限过滤
+        execute_prepared(conn, cursor, "well_details_by_names", (list(dict.fromkeys(well_ids)),))
+        found = {}
+        for row in cursor.fetchall():
+            found.setdefault(row['well_name'], dict(row))
+        allowed = {w['well_name'] for w in filter_wells_by_permission(list(found.values()), user_role, user_id, user_email)}
+        
+        def permitted(names):
+            # 纠错提示与井详情使用同一可见规则
+            rows = filter_wells_by_permission([{"well_name": name} for name in names], user_role, user_id, user_email)
+            return [row['well_name'] for row in rows]
+        
         results = []
         
+        # 按输入顺序输出
         for wid in well_ids:
-            query = "SELECT * FROM oil_wells WHERE well_name = %s AND is_deleted = false"
-            cursor.execute(query, (wid,))
-            result = cursor.fetchone()
+            well = found.get(wid)
             
-            if not result:
-                results.append(f"❌ 未找到井名: {wid}")
+            if not well:
+                results.append(f"❌ 未找到井名: {wid}{well_name_suggestions(wid, permitted)}")
                 continue
             
-            well = dict(result)
-            
             # 权限检查
-            filtered = filter_wells_by_permission([well], user_role, user_id, user_email)
-            if not filtered:
+            if wid not in allowed:
                 results.append(f"🚫 权限拒绝：无权访问井名 {wid}。")
                 continue
             
@@ -689,164 +864,185 @@ def get_well_details(well_ids: List[str] = None, well_id: str = None,
         cursor.close()
         conn.close()
 
+# 同 KEYSET_CONDITION，NULL 的 created_at 按 NULL_CREATED_AT 比较；未分页时与 ('infinity', 0) 比较，对所有行成立
+register_statement("wells_by_block", """
+    SELECT id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at
+    FROM oil_wells 
+    WHERE qk ILIKE %s AND is_deleted = false
+      AND (COALESCE(created_at, %s::timestamp), id)
+          < (COALESCE(%s::timestamp, 'infinity'::timestamp), COALESCE(%s::integer, 0))
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
+""")
+
 @AuditLog.trace("get_wells_by_block")
-def get_wells_by_block(block: str, limit: int = 50, 
+def get_wells_by_block(block: str, limit: int = 50, page_token: str = "",
                        user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """按区块查询油井"""
     if not block:
         return "❌ 请提供区块名称"
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    page_scope = f"block|{block}"
+    after = None
+    if page_token:
+        try:
+            after = decode_page_token(page_token, page_scope)
+        except ValueError as e:
+            return f"❌ {e}"
     
-    try:
-        query = """
-            SELECT well_name, qk, jx, sjjs, sjrq, ktxm
-            FROM oil_wells 
-            WHERE qk ILIKE %s AND is_deleted = false
-            ORDER BY created_at DESC
-            LIMIT %s
-        """
-        cursor.execute(query, (f"%{block}%", limit))
-        results = cursor.fetchall()
-        
-        wells = [dict(row) for row in results]
-        wells = filter_wells_by_permission(wells, user_role, user_id, user_email)
-        
-        if not wells:
-            return f"未找到区块 '{block}' 的油井。"
-        
-        data = []
-        for w in wells:
-            data.append({
-                "井名": w.get('well_name', ''),
-                "区块": w.get('qk', ''),
-                "井型": w.get('jx', ''),
-                "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
-                "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
-                "项目": w.get('ktxm', '')
-            })
-        
-        return f"### 🔍 区块 '{block}' 的油井（共 {len(wells)} 口）\n\n{df_to_markdown(pd.DataFrame(data))}"
+    # 多取一行判断是否有下一页
+    catalog = get_well_catalog()
+    if catalog is not None:
+        results = catalog.search([block], ("qk",), limit + 1, after=after)
+    else:
+        conn = get_db_connection(readonly=True)
+        cursor = conn.cursor()
+        try:
+            created_after, id_after = after or (None, None)
+            execute_prepared(conn, cursor, "wells_by_block",
+                             (f"%{block}%", NULL_CREATED_AT, created_after, id_after, limit + 1))
+            results = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
     
-    finally:
-        cursor.close()
-        conn.close()
+    results, next_token = _paginate(results, limit, page_scope)
+    wells = filter_wells_by_permission(results, user_role, user_id, user_email)
+    
+    if not wells:
+        return f"未找到区块 '{block}' 的油井。"
+    
+    data = []
+    for w in wells:
+        data.append({
+            "井名": w.get('well_name', ''),
+            "区块": w.get('qk', ''),
+            "井型": w.get('jx', ''),
+            "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
+            "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
+            "项目": w.get('ktxm', '')
+        })
+    
+    return f"### 🔍 区块 '{block}' 的油井（共 {len(wells)} 口）\n\n{df_to_markdown(pd.DataFrame(data))}{_page_footer(next_token)}"
 
 @AuditLog.trace("get_wells_by_project")
-def get_wells_by_project(project: str, limit: int = 50, 
+def get_wells_by_project(project: str, limit: int = 50, page_token: str = "",
                          user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """按项目查询油井"""
     if not project:
         return "❌ 请提供项目名称"
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    page_scope = f"project|{project}"
+    after = None
+    if page_token:
+        try:
+            after = decode_page_token(page_token, page_scope)
+        except ValueError as e:
+            return f"❌ {e}"
     
-    try:
-        query = """
-            SELECT well_name, qk, jx, sjjs, sjrq, ktxm
-            FROM oil_wells 
-            WHERE ktxm ILIKE %s AND is_deleted = false
-            ORDER BY created_at DESC
-            LIMIT %s
-        """
-        cursor.execute(query, (f"%{project}%", limit))
-        results = cursor.fetchall()
-        
-        wells = [dict(row) for row in results]
-        wells = filter_wells_by_permission(wells, user_role, user_id, user_email)
-        
-        if not wells:
-            return f"未找到项目 '{project}' 的油井。"
-        
-        data = []
-        for w in wells:
-            data.append({
-                "井名": w.get('well_name', ''),
-                "区块": w.get('qk', ''),
-                "井型": w.get('jx', ''),
-                "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
-                "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
-                "项目": w.get('ktxm', '')
-            })
-        
-        return f"### 🔍 项目 '{project}' 的油井（共 {len(wells)} 口）\n\n{df_to_markdown(pd.DataFrame(data))}"
+    # 多取一行判断是否有下一页
+    catalog = get_well_catalog()
+    if catalog is not None:
+        results = catalog.search([project], ("ktxm",), limit + 1, after=after)
+    else:
+        conn = get_db_connection(readonly=True)
+        cursor = conn.cursor()
+        try:
+            conditions = ["ktxm ILIKE %s", "is_deleted = false"]
+            params = [f"%{project}%"]
+            if after is not None:
+                conditions.append(KEYSET_CONDITION)
+                params.extend(keyset_params(after))
+            query = f"""
+                SELECT id, well_name, qk, jx, sjjs, sjrq, ktxm, created_at
+                FROM oil_wells 
+                WHERE {' AND '.join(conditions)}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """
+            params.append(limit + 1)
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
     
-    finally:
-        cursor.close()
-        conn.close()
+    results, next_token = _paginate(results, limit, page_scope)
+    wells = filter_wells_by_permission(results, user_role, user_id, user_email)
+    
+    if not wells:
+        return f"未找到项目 '{project}' 的油井。"
+    
+    data = []
+    for w in wells:
+        data.append({
+            "井名": w.get('well_name', ''),
+            "区块": w.get('qk', ''),
+            "井型": w.get('jx', ''),
+            "设计井深(m)": float(w.get('sjjs', 0)) if w.get('sjjs') else 0,
+            "设计日期": str(w.get('sjrq', '')) if w.get('sjrq') else '',
+            "项目": w.get('ktxm', '')
+        })
+    
+    return f"### 🔍 项目 '{project}' 的油井（共 {len(wells)} 口）\n\n{df_to_markdown(pd.DataFrame(data))}{_page_footer(next_token)}"
+
+def _staleness_note(refreshed_at, age_seconds) -> str:
+    """统计数据时效说明（距今时长由数据库端计算，不受应用主机时区影响）"""
+    if refreshed_at is None:
+        return "🕒 统计数据刷新时间未知（物化视图尚未通过 refresh_well_stats_views() 刷新）"
+    minutes = int(age_seconds // 60)
+    age = "不到 1 分钟前" if minutes < 1 else f"约 {minutes} 分钟前"
+    return f"🕒 统计数据更新于 {refreshed_at}（{age}），油井数据写入后会自动刷新"
 
 @AuditLog.trace("get_statistics")
 def get_statistics(group_by: str = "block", 
                    user_role: str = "GUEST", user_id: str = "unknown", user_email: str = "unknown") -> str:
     """获取统计信息"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    if group_by not in STATS_VIEWS:
+        return "❌ 不支持的分组方式"
     
-    try:
-        if group_by == "block":
-            query = """
-                SELECT qk as name, COUNT(*) as count, AVG(sjjs) as avg_depth
-                FROM oil_wells 
-                WHERE is_deleted = false AND qk IS NOT NULL
-                GROUP BY qk
-                ORDER BY count DESC
-            """
-        elif group_by == "project":
-            query = """
-                SELECT ktxm as name, COUNT(*) as count, AVG(sjjs) as avg_depth
-                FROM oil_wells 
-                WHERE is_deleted = false AND ktxm IS NOT NULL
-                GROUP BY ktxm
-                ORDER BY count DESC
-            """
-        elif group_by == "well_type":
-            query = """
-                SELECT jx as name, COUNT(*) as count, AVG(sjjs) as avg_depth
-                FROM oil_wells 
-                WHERE is_deleted = false AND jx IS NOT NULL
-                GROUP BY jx
-                ORDER BY count DESC
-            """
-        else:
-            return "❌ 不支持的分组方式"
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        
-        if not results:
-            return f"暂无统计数据（按{group_by}分组）"
-        
-        data = []
-        for row in results:
-            data.append({
-                "名称": row['name'],
-                "井数": row['count'],
-                "平均设计井深(m)": round(float(row['avg_depth']), 2) if row['avg_depth'] else 0
-            })
-        
-        group_name_map = {"block": "区块", "project": "项目", "well_type": "井型"}
-        
-        # 判断最佳图表类型
-        data_count = len(data)
-        if group_by == "well_type" and data_count <= 6:
-            chart_type = "饼图"
-            chart_description = "适合展示各井型的占比分布"
-        else:
-            chart_type = "柱状图"
-            chart_description = f"适合对比不同{group_name_map.get(group_by)}的油井数量"
-        
-        return f"""### 📊 油井统计（按{group_name_map.get(group_by, group_by)}分组）
+    # 读取定时刷新的物化视图（迁移 007），附带该视图最近一次刷新时间及距今秒数（迁移 011）
+    query = f"""
+        SELECT name AS "名称",
+               well_count AS "井数",
+               avg_sjjs AS "平均设计井深(m)",
+               log.refreshed_at, log.refreshed_age
+        FROM {STATS_VIEWS[group_by]}
+        LEFT JOIN (
+            SELECT to_char(refreshed_at, 'YYYY-MM-DD HH24:MI:SS') AS refreshed_at,
+                   EXTRACT(EPOCH FROM now() - refreshed_at)::float8 AS refreshed_age
+            FROM well_stats_refresh_log WHERE view_name = %s
+        ) log ON true
+        ORDER BY 2 DESC
+    """
+    
+    # 按列读取聚合结果，跳过逐行 dict 构造
+    data = fetch_columns(query, (STATS_VIEWS[group_by],), readonly=True, numeric_arrays=True)
+    refreshed = data.pop("refreshed_at")
+    refreshed_age = data.pop("refreshed_age")
+    
+    if not len(data["名称"]):
+        return f"暂无统计数据（按{group_by}分组）"
+    
+    group_name_map = {"block": "区块", "project": "项目", "well_type": "井型"}
+    
+    # 判断最佳图表类型
+    data_count = len(data["名称"])
+    if group_by == "well_type" and data_count <= 6:
+        chart_type = "饼图"
+        chart_description = "适合展示各井型的占比分布"
+    else:
+        chart_type = "柱状图"
+        chart_description = f"适合对比不同{group_name_map.get(group_by)}的油井数量"
+    
+    return f"""### 📊 油井统计（按{group_name_map.get(group_by, group_by)}分组）
 
 {df_to_markdown(pd.DataFrame(data))}
 
+{_staleness_note(refreshed[0], refreshed_age[0])}
+
 ---
 💡 **可视化建议**：此数据适合用 **{chart_type}** 展示，可以更直观地{chart_description}。"""
-    
-    finally:
-        cursor.close()
-        conn.close()
 
 WRITE_ALLOWED_ROLES = {"ADMIN", "ENGINEER"}
 
@@ -1002,6 +1198,9 @@ def save_well_data(data: dict, user_role: str = "GUEST",
         existing_row = cursor.fetchone()
         if existing_row:
             conn.commit()
+            request_catalog_refresh()
+            request_stats_view_refresh()
+            invalidate_well_aliases()
             existing_id = existing_row.get("id")
             id_info = f"（ID: {existing_id}）" if existing_id else ""
             logger.info(f"✅ save_well_data: 更新 井 '{well_name}' by {user_email}")
@@ -1020,6 +1219,9 @@ def save_well_data(data: dict, user_role: str = "GUEST",
         cursor.execute(insert_query, tuple(values))
         inserted_row = cursor.fetchone()
         conn.commit()
+        request_catalog_refresh()
+        request_stats_view_refresh()
+        invalidate_well_aliases()
 
         inserted_id = inserted_row.get("id") if inserted_row else ""
         id_info = f"（ID: {inserted_id}）" if inserted_id else ""